@@ -18,11 +18,7 @@ create table users (
                                                    1 ) )
 );
 
--- Create index on username for faster lookups
-create index idx_users_username on
-   users (
-      username
-   );
+-- username lookups use the index behind the UNIQUE constraint
 
 -- Create audit log table for login attempts
 create table login_attempts (
@@ -35,11 +31,13 @@ create table login_attempts (
                                                1 ) )
 );
 
--- Create index for recent login attempts lookup
+-- Create index for recent failed login attempts lookup
+-- (covers username = :u and success = 0 and attempt_time > :t without touching the table)
 create index idx_login_attempts_user_time on
    login_attempts (
       username,
-      attempt_time
+      success,
+      attempt_time desc
    );
 
 -- Comments for documentation
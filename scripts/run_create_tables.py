@@ -33,8 +33,11 @@ def run_sql_file():
         
         executed = 0
         for stmt in statements:
+            # Drop leading comment lines so the statement itself is checked
+            stmt = '\n'.join(line for line in stmt.splitlines() if not line.strip().startswith('--')).strip()
+            
             # Skip comments and grant statements
-            if stmt.startswith('--') or stmt.upper().startswith('COMMENT') or stmt.upper().startswith('GRANT'):
+            if not stmt or stmt.upper().startswith('COMMENT') or stmt.upper().startswith('GRANT'):
                 continue
             
             try:
@@ -38,7 +38,7 @@ logger = logging.getLogger(__name__)
 
 # Import authentication utilities
 try:
-    from auth_utils import User, authenticate_user, get_user_by_id, verify_password, update_user_password, create_user
+    from auth_utils import User, authenticate_user, get_user_by_id, verify_password, update_user_password, create_user, invalidate_user, PasswordHashBusy
     AUTH_AVAILABLE = True
     logger.info("✅ Authentication utilities imported successfully")
 except Exception as e:
@@ -473,6 +473,20 @@ def load_user(user_id):
         return get_user_by_id(int(user_id))
     return None
 
+# Static body for permission denials raised by the RBAC decorators (abort(403))
+FORBIDDEN_HTML = (
+    '<!doctype html><title>403 Forbidden</title>'
+    '<h1>Access denied</h1><p>You do not have permission to access this page.</p>'
+    '<p><a href="/">Back to home</a></p>'
+)
+
+@app.errorhandler(403)
+def forbidden(error):
+    """Answer permission denials without a redirect or template render"""
+    if request.path.startswith('/api/') or request.accept_mimetypes.best == 'application/json':
+        return jsonify({'error': 'Access denied'}), 403
+    return FORBIDDEN_HTML, 403
+
 # Make permission functions available in templates
 @app.context_processor
 def inject_permissions():
@@ -600,7 +614,11 @@ def login():
         ip_address = request.headers.get('X-Forwarded-For', request.remote_addr)
         
         # Authenticate user
-        user = authenticate_user(username, password, ip_address)
+        try:
+            user = authenticate_user(username, password, ip_address)
+        except PasswordHashBusy:
+            logger.warning(f"⚠️ Login not checked, server busy: {username} (IP: {ip_address})")
+            return render_template('login.html', error='Server is busy, please try again in a moment'), 503
         
         if user:
             # Login user with proper session configuration
@@ -690,6 +708,9 @@ def change_password():
             logger.error(f"Password update failed in database for user: {current_user.username}")
             flash('Failed to update password. Please try again.', 'error')
             
+    except PasswordHashBusy:
+        logger.warning(f"Password change not checked, server busy, for user: {current_user.username}")
+        flash('Server is busy, please try again in a moment', 'error')
     except Exception as e:
         logger.error(f"Error changing password for user {current_user.username}: {e}")
         flash('An error occurred while updating password', 'error')
@@ -821,6 +842,7 @@ def admin_toggle_user(user_id):
                 WHERE id = :user_id
             """, {"user_id": user_id})
             conn.commit()
+            invalidate_user(user_id)
             
             # Get updated status
             cursor.execute("SELECT username, is_active FROM users WHERE id = :user_id", {"user_id": user_id})
@@ -906,6 +928,7 @@ def admin_delete_user(user_id):
             # Delete user
             cursor.execute("DELETE FROM users WHERE id = :user_id", {"user_id": user_id})
             conn.commit()
+            invalidate_user(user_id)
             
             logger.info(f"✅ Admin {current_user.username} deleted user: {username}")
             flash(f'User {username} deleted', 'success')
@@ -972,6 +995,7 @@ def admin_edit_user(user_id):
                 "user_id": user_id
             })
             conn.commit()
+            invalidate_user(user_id)
             
             logger.info(f"✅ Admin {current_user.username} updated user {old_username} → {username} (role: {role})")
             flash(f'User {username} updated successfully', 'success')
@@ -2639,8 +2663,9 @@ def delete_album(album_name):
             
             # Check ownership of all media (admin can delete anything)
             if current_user.role != 'admin':
+                user = current_user._get_current_object()
                 for media_id, _, _, _, owner_user_id in media_items:
-                    if not can_access_resource(current_user, owner_user_id):
+                    if not can_access_resource(user, owner_user_id):
                         logger.warning(f"🚫 User {current_user.id} attempted to delete album '{album_name}' containing media owned by user {owner_user_id}")
                         return jsonify({'error': 'Permission denied: Album contains content you do not own'}), 403
             
@@ -4,17 +4,25 @@ import sys
 import json
 import re
 import io
+import math
 import time
 import logging
+import threading
+import multiprocessing
+import atexit
+import queue
 from query_video_embeddings import query_video_embeddings_multiple, query_video_embeddings
 from store_video_embeddings import store_video_embeddings, create_video_embeddings, store_embeddings_in_db
 from utils.oci_utils import load_par_cache, save_par_cache, get_par_url_for_oci as utils_get_par_url_for_oci
 from utils.ffmpeg_utils import cut_segment as utils_cut_segment, concat_segments as utils_concat_segments, extract_frame_bytes as utils_extract_frame_bytes
 from utils.http_utils import download_url_to_file as utils_download_url_to_file
+from utils.db_utils_vector import pooled_connection
 import uuid
+import functools
 import os
 import base64
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from collections import deque
 import subprocess
 import tempfile
 import shutil
@@ -26,12 +34,13 @@ from twelvelabs import TwelveLabs
 
 # Import unified album manager with error handling
 try:
-    from unified_album_manager import album_manager, create_unified_embedding
+    from unified_album_manager import album_manager, create_unified_embedding, create_unified_embeddings_batch
     UNIFIED_ALBUM_AVAILABLE = True
 except Exception as e:
     print(f"Warning: Could not import unified_album_manager: {e}")
     album_manager = None
     create_unified_embedding = None
+    create_unified_embeddings_batch = None
     UNIFIED_ALBUM_AVAILABLE = False
 
 try:
@@ -45,19 +54,80 @@ except Exception:
     normalize_plan = None
     validate_edit_plan = None
 
+# Whitespace splitter for expanding a search phrase into per-word queries
+_WS_RE = re.compile(r'\s+')
+# Pre-authenticated request URLs served by OCI Object Storage
+_PAR_URL_RE = re.compile(r'https://objectstorage\.[^/]+\.oraclecloud\.com/p/')
+
 # Security: simple API key protection for upload/proxy endpoints
 UPLOAD_API_KEY = os.getenv('UPLOAD_API_KEY')
 MULTIPART_THRESHOLD = int(os.getenv('MULTIPART_THRESHOLD', str(50 * 1024 * 1024)))  # 50MB
+MULTIPART_PART_SIZE = 10 * 1024 * 1024  # 10MB parts
 
 # Task registry for background jobs
 _upload_tasks = {}
 UPLOAD_TASKS_FILE = os.path.join(os.path.dirname(__file__), '..', 'upload_tasks.json')
+# Live progress for /progress/<task_id> (SSE): task_id -> one queue of status
+# deltas per connected listener; listeners register and remove their own queue
+_task_listeners = {}
+_task_listeners_lock = threading.Lock()
+# save_upload_tasks() is debounced: the registry is written at most this often
+UPLOAD_TASKS_FLUSH_SECONDS = float(os.getenv('UPLOAD_TASKS_FLUSH_SECONDS', '0.5'))
+_upload_tasks_dirty = threading.Event()
+# Delay before a summary/plan working directory is removed
+TMP_CLEANUP_DELAY_SECONDS = float(os.getenv('TMP_CLEANUP_DELAY_SECONDS', '30'))
 # Summary task registry
 _summary_tasks = {}
 SUMMARY_TASKS_FILE = os.path.join(os.path.dirname(__file__), '..', 'summary_tasks.json')
 
 # Thread pool for background processing
 EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv('UPLOAD_WORKERS', '2')))
+# Separate pool for concurrent multipart part uploads so they never starve EXECUTOR
+PART_UPLOAD_WORKERS = int(os.getenv('PART_UPLOAD_WORKERS', '8'))
+PART_UPLOAD_EXECUTOR = ThreadPoolExecutor(max_workers=PART_UPLOAD_WORKERS, thread_name_prefix='part_upload')
+# Small pool for resolving many PAR URLs at once (album listings)
+PAR_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv('PAR_WORKERS', '8')), thread_name_prefix='par')
+# Dedicated pool for auto-embedding jobs; EMBED_SEM caps how many are queued/running,
+# anything beyond that waits in _embed_backlog instead of piling onto the executor
+EMBED_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv('EMBED_WORKERS', '4')), thread_name_prefix='embed')
+EMBED_SEM = threading.BoundedSemaphore(int(os.getenv('EMBED_MAX_PENDING', '8')))
+_embed_backlog = deque()
+_embed_lock = threading.Lock()
+# Per-batch fan-out for /create_unified_embeddings; progress is persisted every N items
+UNIFIED_EMBED_WORKERS = int(os.getenv('UNIFIED_EMBED_WORKERS', '8'))
+UNIFIED_EMBED_SAVE_EVERY = int(os.getenv('UNIFIED_EMBED_SAVE_EVERY', '10'))
+# Upper bound on items embedded and stored together by one worker
+UNIFIED_EMBED_BATCH = int(os.getenv('UNIFIED_EMBED_BATCH', '16'))
+
+
+def _submit_embedding(fn, *args, task_id=None):
+    """Submit an embedding job, deferring it when EMBED_SEM is exhausted.
+
+    A deferred job's task_id record is marked 'queued' under _embed_lock,
+    before a finishing job can pick it up and mark it 'running'.
+    Returns True if the job went to EMBED_EXECUTOR, False if it was deferred.
+    """
+    with _embed_lock:
+        if not EMBED_SEM.acquire(blocking=False):
+            if task_id is not None:
+                _upload_tasks[task_id]['status'] = 'queued'
+            _embed_backlog.append((fn, args))
+            return False
+    EMBED_EXECUTOR.submit(_run_embedding_job, fn, args)
+    return True
+
+
+def _run_embedding_job(fn, args):
+    try:
+        fn(*args)
+    finally:
+        # Hand the slot straight to the next deferred job, or give it back
+        with _embed_lock:
+            next_job = _embed_backlog.popleft() if _embed_backlog else None
+            if next_job is None:
+                EMBED_SEM.release()
+        if next_job is not None:
+            EMBED_EXECUTOR.submit(_run_embedding_job, *next_job)
 
 
 def load_upload_tasks():
@@ -116,17 +186,50 @@ def _update_summary_task(task_id, **kwargs):
         logger.exception('Failed to persist summary tasks')
 
 
-def save_upload_tasks():
+def _write_upload_tasks():
     try:
         path = os.path.abspath(UPLOAD_TASKS_FILE)
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, 'w') as f:
-            json.dump(_upload_tasks, f)
+        data = json.dumps(_upload_tasks)
+        # Write then rename so a crash mid-write never leaves a truncated file
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', buffering=256 * 1024) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
         logger.debug('Saved upload tasks: %d', len(_upload_tasks))
+    except RuntimeError:
+        # A task changed while it was being serialized; try again on the next flush
+        _upload_tasks_dirty.set()
     except Exception:
         logger.exception('Failed to save upload tasks')
 
 
+def _flush_upload_tasks_loop():
+    while True:
+        _upload_tasks_dirty.wait()
+        time.sleep(UPLOAD_TASKS_FLUSH_SECONDS)
+        _upload_tasks_dirty.clear()
+        _write_upload_tasks()
+
+
+def _flush_upload_tasks_at_exit():
+    if _upload_tasks_dirty.is_set():
+        _write_upload_tasks()
+
+
+def save_upload_tasks():
+    """Mark the upload task registry dirty; a background thread persists it.
+
+    Writes are coalesced to at most one per UPLOAD_TASKS_FLUSH_SECONDS, so a crash
+    can lose up to that much recent progress (pending changes are flushed at exit).
+    """
+    _upload_tasks_dirty.set()
+
+
+threading.Thread(target=_flush_upload_tasks_loop, name='upload_tasks_flush', daemon=True).start()
+atexit.register(_flush_upload_tasks_at_exit)
+
+
 # load_upload_tasks() is called after logger and PAR cache are initialized below
 
 try:
@@ -137,6 +240,11 @@ try:
     from oci_config import load_oci_config as _central_load_oci_config
 except Exception:
     _central_load_oci_config = None
+try:
+    # Optional: faster JSON encoding with native datetime support for large listings
+    import orjson
+except Exception:
+    orjson = None
 
 # Configure logging
 logging.basicConfig(level=os.getenv('APP_LOG_LEVEL', 'INFO'))
@@ -155,6 +263,14 @@ _par_cache = {}
 PAR_CACHE_FILE = os.path.join(os.path.dirname(__file__), '..', '.par_cache.json')
 # Default PAR TTL in seconds (can be set via env)
 PAR_TTL_SECONDS = int(os.getenv('PAR_TTL_SECONDS', '3600'))
+# list_albums_endpoint result cache: (albums, expiry_ts); cleared when photos are added
+ALBUMS_CACHE_TTL_SECONDS = int(os.getenv('ALBUMS_CACHE_TTL_SECONDS', '30'))
+_albums_cache = None
+# search_unified_album response cache: (query, album, file_type, top_k) -> (payload, expiry_ts);
+# cleared when a unified embedding batch finishes
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv('SEARCH_CACHE_TTL_SECONDS', '60'))
+SEARCH_CACHE_MAX = int(os.getenv('SEARCH_CACHE_MAX', '512'))
+_search_unified_cache = {}
 # Optional local media root (only serve files under this directory if configured)
 MEDIA_ROOT = os.getenv('MEDIA_ROOT')  # e.g. /path/to/media
 
@@ -237,10 +353,65 @@ def _load_oci_config():
     if _central_load_oci_config:
         return _central_load_oci_config(oci)
     return oci.config.from_file()
+
+
+@functools.lru_cache(maxsize=1)
+def _oci_client():
+    """Return a process-wide (ObjectStorageClient, namespace) pair.
+
+    Building the client parses config and constructs signers, and the namespace
+    lookup is a network round trip, so both are done once and reused.
+    """
+    config = _load_oci_config()
+    obj_client = oci.object_storage.ObjectStorageClient(config)
+    namespace = obj_client.get_namespace().data
+    return obj_client, namespace
+
+
+def _get_namespace():
+    """Return the tenancy Object Storage namespace, resolving it on first use."""
+    return _oci_client()[1]
+
+
+def _json_default(o):
+    if hasattr(o, 'isoformat'):
+        return o.isoformat()
+    return str(o)
+
+
+def _json_response(payload, status=200):
+    """Serialize a large payload with orjson when available (datetimes become ISO 8601)."""
+    if orjson is not None:
+        body = orjson.dumps(payload, default=_json_default)
+    else:
+        body = json.dumps(payload, default=_json_default)
+    return Response(body, status=status, mimetype='application/json')
+
+
+def _invalidate_albums_cache():
+    global _albums_cache
+    _albums_cache = None
+
+
+def _invalidate_search_cache():
+    _search_unified_cache.clear()
 # The main HTML UI has been moved to a template file under `templates/index.html`
 
 
+@functools.lru_cache(maxsize=4096)
+def _expand_query(q):
+    """Expand a search phrase into (phrase, word1, word2, ...) without duplicates.
+
+    The original phrase stays first; order is preserved. Returns a tuple so the
+    result is safe to share from the cache.
+    """
+    return tuple(dict.fromkeys([q, *(w for w in _WS_RE.split(q.strip()) if w)]))
+
+
 def _get_par_url_for_oci(vf):
+    # Already a pre-authenticated URL: nothing to sign
+    if isinstance(vf, str) and _PAR_URL_RE.match(vf):
+        return vf
     # delegate to utils
     try:
         return utils_get_par_url_for_oci(vf)
@@ -248,6 +419,16 @@ def _get_par_url_for_oci(vf):
         return f'/object_proxy?path={vf}'
 
 
+def _batch_par_urls(paths):
+    """Resolve the distinct oci:// paths among `paths` to browser URLs concurrently.
+
+    Cold PAR cache misses overlap on PAR_EXECUTOR instead of signing one at a time;
+    the PAR cache in utils.oci_utils keeps repeat lookups local.
+    """
+    oci_paths = list({p for p in paths if p and p.startswith('oci://')})
+    return dict(zip(oci_paths, PAR_EXECUTOR.map(_get_par_url_for_oci, oci_paths)))
+
+
 def normalize_video_entry(r):
     """Normalize a video entry's video_file into a browser-accessible URL."""
     vf = r.get('video_file')
@@ -497,19 +678,7 @@ def search():
         if not q:
             return jsonify({'error': 'No queries provided'}), 400
         # Build multiple prompts: full phrase + individual words
-        words = [w for w in re.split(r'\s+', q.strip()) if w]
-        # Keep original phrase first, then unique words
-        # Normalize to preserve order and avoid duplicates
-        seen = set()
-        combined = []
-        if q not in seen:
-            combined.append(q)
-            seen.add(q)
-        for w in words:
-            if w not in seen:
-                combined.append(w)
-                seen.add(w)
-        queries = combined
+        queries = list(_expand_query(q))
 
     # Use existing module to query DB for all queries
     try:
@@ -557,10 +726,9 @@ def object_proxy():
     path_body = path[len('oci://'):]
     parts = path_body.split('/', 2)
     try:
-        config = _load_oci_config()
-        obj_client = oci.object_storage.ObjectStorageClient(config)
+        obj_client, default_namespace = _oci_client()
         if len(parts) == 2:
-            namespace = obj_client.get_namespace().data
+            namespace = default_namespace
             bucket = parts[0]
             object_name = parts[1]
         elif len(parts) == 3:
@@ -772,9 +940,7 @@ def upload():
             return jsonify({'error': 'unauthorized'}), 401
 
     try:
-        config = _load_oci_config()
-        obj_client = oci.object_storage.ObjectStorageClient(config)
-        namespace = obj_client.get_namespace().data
+        obj_client, namespace = _oci_client()
 
         # If no bucket provided, user must specify; otherwise pick default from env
         if not bucket:
@@ -800,11 +966,12 @@ def upload():
             upload_id = mpu.data.upload_id
             part_num = 1
             parts = []
+            part_buf = memoryview(bytearray(MULTIPART_PART_SIZE))
             while True:
-                chunk = file.stream.read(10 * 1024 * 1024)  # 10MB parts
-                if not chunk:
+                n = _read_part(file.stream, part_buf)
+                if not n:
                     break
-                resp = obj_client.upload_part(namespace, bucket, filename, upload_id, part_num, chunk)
+                resp = obj_client.upload_part(namespace, bucket, filename, upload_id, part_num, bytes(part_buf[:n]))
                 etag = None
                 try:
                     etag = (resp.headers.get('etag') if resp and hasattr(resp, 'headers') else None)
@@ -842,6 +1009,23 @@ def upload():
         return jsonify({'error': str(e)}), 500
 
 
+def _read_part(stream, buf):
+    """Fill memoryview `buf` from `stream` (reusing its storage); returns bytes read, 0 at EOF."""
+    readinto = getattr(stream, 'readinto', None)
+    filled = 0
+    while filled < len(buf):
+        if readinto is not None:
+            n = readinto(buf[filled:])
+        else:
+            data = stream.read(len(buf) - filled)
+            n = len(data)
+            buf[filled:filled + n] = data
+        if not n:
+            break
+        filled += n
+    return filled
+
+
 def start_embedding_background(namespace, bucket, filename, par_url):
     """Start the background embedding + DB storage task and return the task_id."""
     task_id = str(uuid.uuid4())
@@ -858,8 +1042,13 @@ def start_embedding_background(namespace, bucket, filename, par_url):
             get_obj = None
             if oci:
                 try:
-                    config = _load_oci_config()
-                    obj_client = oci.object_storage.ObjectStorageClient(config)
+                    # Namespace may be deferred by the request handler; resolve it here,
+                    # off the request path (a failure falls back to the PAR URL below)
+                    if namespace is None:
+                        namespace = _get_namespace()
+                        _upload_tasks[tid]['namespace'] = namespace
+                        save_upload_tasks()
+                    obj_client = _oci_client()[0]
                     get_obj = obj_client.get_object(namespace, bucket, filename)
                 except Exception:
                     # If object download fails, we still attempt embedding via PAR URL
@@ -948,15 +1137,7 @@ def create_embedding():
     if not par_url and oci_path and oci:
         par_url = _get_par_url_for_oci(oci_path)
 
-    # If we don't have namespace yet, try to get from PAR or resolve via OCI
-    if not namespace and oci and oci_path and '/' in oci_path[len('oci://'):]:
-        # Try resolving namespace via client
-        try:
-            config = _load_oci_config()
-            obj_client = oci.object_storage.ObjectStorageClient(config)
-            namespace = obj_client.get_namespace().data
-        except Exception:
-            namespace = None
+    # A missing namespace is left as None; the background task resolves it
 
     if not bucket or not filename:
         return jsonify({'error': 'Could not determine bucket/filename from oci_path'}), 400
@@ -995,14 +1176,6 @@ def create_embedding_marengo():
     if not par_url and oci_path and oci:
         par_url = _get_par_url_for_oci(oci_path)
 
-    if not namespace and oci and oci_path and '/' in oci_path[len('oci://'):]:
-        try:
-            config = _load_oci_config()
-            obj_client = oci.object_storage.ObjectStorageClient(config)
-            namespace = obj_client.get_namespace().data
-        except Exception:
-            namespace = None
-
     if not bucket or not filename:
         return jsonify({'error': 'Could not determine bucket/filename from oci_path'}), 400
 
@@ -1022,6 +1195,57 @@ def task_status(task_id):
     return jsonify(task)
 
 
+def _publish_task_progress(task_id, **msg):
+    """Push a status delta to every /progress/<task_id> listener."""
+    with _task_listeners_lock:
+        listeners = list(_task_listeners.get(task_id, ()))
+    for q in listeners:
+        try:
+            q.put_nowait(msg)
+        except queue.Full:
+            pass
+
+
+@app.route('/progress/<task_id>')
+def task_progress(task_id):
+    """Stream a background task's progress as server-sent events.
+
+    Sends the current task record first, then each delta pushed by the worker;
+    the stream ends once the task reaches 'done' or 'failed'. Each listener
+    gets its own queue, so concurrent listeners all see every delta.
+    """
+    if task_id not in _upload_tasks:
+        return jsonify({'error': 'task not found'}), 404
+
+    def gen():
+        q = queue.Queue(maxsize=1024)
+        with _task_listeners_lock:
+            _task_listeners.setdefault(task_id, set()).add(q)
+        try:
+            # Read the record only after registering: workers update it before
+            # publishing, so a terminal status is seen one way or the other
+            msg = dict(_upload_tasks.get(task_id, {}))
+            while True:
+                yield f"data: {json.dumps(msg)}\n\n"
+                if msg.get('status') in ('done', 'failed'):
+                    return
+                try:
+                    msg = q.get(timeout=120)
+                except queue.Empty:
+                    # Keep idle proxies from closing the connection
+                    yield ": keepalive\n\n"
+                    msg = dict(_upload_tasks.get(task_id, {}))
+        finally:
+            with _task_listeners_lock:
+                listeners = _task_listeners.get(task_id)
+                if listeners is not None:
+                    listeners.discard(q)
+                    if not listeners:
+                        del _task_listeners[task_id]
+
+    return Response(gen(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
 @app.route('/create_embedding_from_upload', methods=['POST'])
 def create_embedding_from_upload():
     """Create embeddings for a previously uploaded file.
@@ -1234,9 +1458,7 @@ def build_summary():
                 if not oci:
                     _update_summary_task(tid, status='failed', error='OCI SDK not available on server')
                     return
-                config = _load_oci_config()
-                obj_client = oci.object_storage.ObjectStorageClient(config)
-                namespace = obj_client.get_namespace().data
+                obj_client, namespace = _oci_client()
                 bucket = os.getenv('DEFAULT_OCI_BUCKET') or 'Media'
                 object_name = f'summary_{uuid.uuid4().hex}.mp4'
                 with open(out_path, 'rb') as f:
@@ -1252,7 +1474,8 @@ def build_summary():
             _update_summary_task(tid, status='failed', error=str(e))
         finally:
             try:
-                EXECUTOR.submit(lambda p: shutil.rmtree(p), tmp_dir)
+                # cleanup in background after a small delay to allow downloads
+                threading.Timer(TMP_CLEANUP_DELAY_SECONDS, shutil.rmtree, args=(tmp_dir,), kwargs={'ignore_errors': True}).start()
             except Exception:
                 pass
 
@@ -1438,9 +1661,7 @@ def execute_plan():
                     _update_summary_task(tid, status='failed', error='OCI SDK not available')
                     return
                 try:
-                    config = _load_oci_config()
-                    obj_client = oci.object_storage.ObjectStorageClient(config)
-                    namespace = obj_client.get_namespace().data
+                    obj_client, namespace = _oci_client()
                     bucket = os.getenv('DEFAULT_OCI_BUCKET') or 'Media'
                     object_name = f'pegasus_summary_{uuid.uuid4().hex}.mp4'
                     with open(out_path, 'rb') as f:
@@ -1459,10 +1680,7 @@ def execute_plan():
         finally:
             try:
                 # cleanup in background after a small delay to allow downloads
-                def _cleanup(p):
-                    try: shutil.rmtree(p)
-                    except Exception: pass
-                EXECUTOR.submit(lambda p: shutil.rmtree(p), tmp_dir)
+                threading.Timer(TMP_CLEANUP_DELAY_SECONDS, shutil.rmtree, args=(tmp_dir,), kwargs={'ignore_errors': True}).start()
             except Exception:
                 pass
 
@@ -1472,10 +1690,11 @@ def execute_plan():
 
 @app.route('/thumbnail_preview')
 def thumbnail_preview():
-    """Return a base64 JPEG data URL for a single frame from the provided video path.
+    """Return a single frame from the provided video path.
 
-    Query params: path (oci:// or http/https or local), time (seconds, optional)
-    Returns JSON: { data_url: 'data:image/jpeg;base64,...' }
+    Query params: path (oci:// or http/https or local), time (seconds, optional),
+    format (optional: 'jpeg' returns the raw image/jpeg bytes for use as an <img> src)
+    Returns JSON: { data_url: 'data:image/jpeg;base64,...' } by default
     """
     path = request.args.get('path')
     time_s = float(request.args.get('time', '0.5'))
@@ -1490,8 +1709,10 @@ def thumbnail_preview():
         data, err = _extract_frame_to_bytes(path, time_s)
         if err:
             return jsonify({'error': err}), 500
-        b64 = base64.b64encode(data).decode('ascii')
-        data_url = 'data:image/jpeg;base64,' + b64
+        if request.args.get('format') == 'jpeg':
+            # Raw bytes: no base64 expansion or JSON escaping
+            return Response(data, mimetype='image/jpeg')
+        data_url = b''.join((b'data:image/jpeg;base64,', base64.b64encode(data))).decode('ascii')
         return jsonify({'data_url': data_url})
     except Exception as e:
         logger.exception('thumbnail_preview error')
@@ -1500,6 +1721,23 @@ def thumbnail_preview():
 
 # ==================== PHOTO ALBUM ENDPOINTS ====================
 
+@functools.lru_cache(maxsize=1)
+def _pil_pool():
+    """Process pool for CPU-bound Pillow work, created on first use.
+
+    Created lazily from a multithreaded process, so workers come from a
+    forkserver (spawn where unavailable) rather than a plain fork that could
+    inherit a lock held by another thread. Workers run resize_to_jpeg_bytes
+    from the import-light utils.image_resizer, which the forkserver preloads.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('forkserver')
+        ctx.set_forkserver_preload(['utils.image_resizer'])
+    else:
+        ctx = multiprocessing.get_context('spawn')
+    return ProcessPoolExecutor(max_workers=int(os.getenv('PIL_WORKERS', str(os.cpu_count() or 1))), mp_context=ctx)
+
+
 @app.route('/upload_photo', methods=['POST'])
 def upload_photo():
     """Upload a photo to OCI for later embedding creation
@@ -1509,7 +1747,7 @@ def upload_photo():
     """
     try:
         from store_photo_embeddings import create_photo_embedding, store_photo_embedding_in_db
-        from PIL import Image
+        from utils.image_resizer import resize_to_jpeg_bytes
     except Exception as e:
         return jsonify({'error': f'Photo module not available: {e}'}), 500
     
@@ -1527,74 +1765,66 @@ def upload_photo():
         return jsonify({'error': 'OCI SDK not available'}), 500
     
     try:
-        config = _load_oci_config()
-        obj_client = oci.object_storage.ObjectStorageClient(config)
-        namespace = obj_client.get_namespace().data
+        obj_client, namespace = _oci_client()
         bucket = os.getenv('OCI_BUCKET', 'Media')
         
-        # Save to temp file first
+        # Resize image if too large for TwelveLabs (5.2 MB limit)
+        max_size_mb = 5.0  # Use 5 MB to have some buffer under the 5.2 MB limit
+        
+        # The request body is an upper bound on the photo size, so a small
+        # request can be streamed straight to OCI without touching disk
+        if request.content_length and request.content_length <= max_size_mb * 1024 * 1024:
+            object_name = f"photos/{album_name}/{photo.filename}"
+            obj_client.put_object(namespace, bucket, object_name, photo.stream)
+            _invalidate_albums_cache()
+            oci_path = f"oci://{namespace}/{bucket}/{object_name}"
+            return jsonify({
+                'photo_url': _get_par_url_for_oci(oci_path),
+                'oci_path': oci_path,
+                'album_name': album_name,
+                'filename': photo.filename
+            })
+        
+        # Size unknown or possibly too large: spill to a temp file so it can be measured/resized
         with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(photo.filename)[1]) as tmp:
             photo.save(tmp.name)
             tmp_path = tmp.name
         
-        # Resize image if too large for TwelveLabs (5.2 MB limit)
-        max_size_mb = 5.0  # Use 5 MB to have some buffer under the 5.2 MB limit
-        
+        resized_buf = None
         if os.path.getsize(tmp_path) > max_size_mb * 1024 * 1024:
             logger.info(f"Resizing large image: {photo.filename} ({os.path.getsize(tmp_path) / (1024*1024):.1f} MB)")
             
-            # Open and resize image
-            with Image.open(tmp_path) as img:
-                # Convert to RGB if necessary (for PNG with alpha channel, etc.)
-                if img.mode in ('RGBA', 'P'):
-                    img = img.convert('RGB')
-                
-                # Calculate new size maintaining aspect ratio
-                original_size = img.size
-                quality = 85
-                scale_factor = 0.8
-                
-                # Try progressively smaller sizes until under limit
-                for attempt in range(5):
-                    new_width = int(original_size[0] * scale_factor)
-                    new_height = int(original_size[1] * scale_factor)
-                    
-                    resized_img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                    
-                    # Save to temp file and check size
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp_resized:
-                        resized_img.save(tmp_resized.name, 'JPEG', quality=quality, optimize=True)
-                        tmp_resized_path = tmp_resized.name
-                    
-                    new_size = os.path.getsize(tmp_resized_path)
-                    logger.info(f"Attempt {attempt+1}: {new_width}x{new_height}, quality={quality}, size={new_size/(1024*1024):.1f}MB")
-                    
-                    if new_size <= max_size_mb * 1024 * 1024:
-                        # Size is good, replace original
-                        os.unlink(tmp_path)
-                        tmp_path = tmp_resized_path
-                        # Update filename to .jpg
-                        base_name = os.path.splitext(photo.filename)[0]
-                        photo.filename = f"{base_name}_resized.jpg"
-                        logger.info(f"Image resized successfully to {new_size/(1024*1024):.1f}MB")
-                        break
-                    else:
-                        # Too large still, try smaller
-                        os.unlink(tmp_resized_path)
-                        scale_factor *= 0.8
-                        quality = max(60, quality - 10)
-                else:
-                    # If we couldn't get it small enough after 5 attempts
-                    logger.warning(f"Could not resize image {photo.filename} to under {max_size_mb}MB")
-                    return jsonify({'error': f'Image too large and could not be resized to under {max_size_mb}MB'}), 400
+            # Pixel work runs in a worker process so it does not hold this thread's GIL
+            max_bytes = max_size_mb * 1024 * 1024
+            try:
+                data, (new_width, new_height), quality = _pil_pool().submit(resize_to_jpeg_bytes, tmp_path, max_bytes).result()
+            finally:
+                # Only the resized bytes are uploaded from here on
+                os.unlink(tmp_path)
+            if data is None:
+                logger.warning(f"Could not resize image {photo.filename} to under {max_size_mb}MB")
+                return jsonify({'error': f'Image too large and could not be resized to under {max_size_mb}MB'}), 400
+            
+            # Size is good, upload the encoded bytes instead of the original
+            resized_buf = io.BytesIO(data)
+            # Update filename to .jpg
+            base_name = os.path.splitext(photo.filename)[0]
+            photo.filename = f"{base_name}_resized.jpg"
+            logger.info(f"Image resized successfully to {new_width}x{new_height}, quality={quality}, size={len(data)/(1024*1024):.1f}MB")
         
         # Upload to OCI
         object_name = f"photos/{album_name}/{photo.filename}"
-        with open(tmp_path, 'rb') as f:
-            obj_client.put_object(namespace, bucket, object_name, f)
+        if resized_buf is not None:
+            obj_client.put_object(namespace, bucket, object_name, resized_buf)
+        else:
+            try:
+                with open(tmp_path, 'rb') as f:
+                    obj_client.put_object(namespace, bucket, object_name, f)
+            finally:
+                # Clean up temp file
+                os.unlink(tmp_path)
         
-        # Clean up temp file
-        os.unlink(tmp_path)
+        _invalidate_albums_cache()
         
         # Create PAR URL
         oci_path = f"oci://{namespace}/{bucket}/{object_name}"
@@ -1645,12 +1875,7 @@ def create_photo_embeddings_endpoint():
     
     try:
         # Convert oci:// paths to PAR URLs
-        resolved_urls = []
-        for url in photo_urls:
-            if url.startswith('oci://'):
-                resolved_urls.append(_get_par_url_for_oci(url))
-            else:
-                resolved_urls.append(url)
+        resolved_urls = [_get_par_url_for_oci(u) if u.startswith('oci://') else u for u in photo_urls]
 
         # Use enhanced VECTOR embeddings if available
         if 'create_photo_embeddings_for_album_enhanced' in locals():
@@ -1661,9 +1886,10 @@ def create_photo_embeddings_endpoint():
             # Fallback to original embeddings
             results = create_photo_embeddings_for_album(album_name, resolved_urls)
         
+        _invalidate_albums_cache()
+        
         # Include mapping of original -> resolved URL for visibility
-        mapping = {orig: resolved for orig, resolved in zip(photo_urls, resolved_urls)}
-        results['resolved_urls'] = mapping
+        results['resolved_urls'] = dict(zip(photo_urls, resolved_urls))
         return jsonify(results)
 
     except Exception as e:
@@ -1701,15 +1927,7 @@ def search_photos_endpoint():
         if not q:
             return jsonify({'error': 'query required'}), 400
         # Full phrase + individual words
-        words = [w for w in re.split(r'\s+', q.strip()) if w]
-        seen = set()
-        combined = []
-        if q not in seen:
-            combined.append(q); seen.add(q)
-        for w in words:
-            if w not in seen:
-                combined.append(w); seen.add(w)
-        queries = combined
+        queries = list(_expand_query(q))
 
     album_name = payload.get('album_name')
     top_k = payload.get('top_k', 10)
@@ -1719,18 +1937,14 @@ def search_photos_endpoint():
     try:
         # Use enhanced VECTOR search if available
         if 'search_photos_multiple_enhanced' in locals():
+            # Cosine similarity threshold is applied as a distance cutoff in SQL
+            max_distance = None
+            if min_similarity is not None and similarity_type == 'COSINE':
+                max_distance = 1.0 - min_similarity
             results_by_query = search_photos_multiple_enhanced(
-                queries, album_name=album_name, top_k=top_k, similarity_type=similarity_type
+                queries, album_name=album_name, top_k=top_k, similarity_type=similarity_type,
+                max_distance=max_distance
             )
-            
-            # Apply similarity threshold if specified
-            if min_similarity is not None:
-                for query in results_by_query:
-                    if similarity_type == 'COSINE':
-                        results_by_query[query] = [
-                            r for r in results_by_query[query] 
-                            if r['similarity_score'] <= (1.0 - min_similarity)
-                        ]
         else:
             # Fallback to original search
             results_by_query = {}
@@ -1786,14 +2000,7 @@ def search_unified_endpoint():
         q = payload.get('query')
         if not q:
             return jsonify({'error': 'queries required'}), 400
-        words = [w for w in re.split(r'\s+', q.strip()) if w]
-        seen = set(); combined = []
-        if q not in seen:
-            combined.append(q); seen.add(q)
-        for w in words:
-            if w not in seen:
-                combined.append(w); seen.add(w)
-        queries = combined
+        queries = list(_expand_query(q))
 
     top_k_photos = payload.get('top_k_photos', 10)
     top_k_videos = payload.get('top_k_videos', 10)
@@ -1890,29 +2097,28 @@ def list_albums_endpoint():
         user = os.getenv('ORACLE_DB_USERNAME')
         pwd = os.getenv('ORACLE_DB_PASSWORD')
         dsn = os.getenv('ORACLE_DB_CONNECT_STRING')
-        wallet = os.getenv('ORACLE_DB_WALLET_PATH')
-        wallet_pw = os.getenv('ORACLE_DB_WALLET_PASSWORD')
 
         if not (user and pwd and dsn):
             logger.warning('Oracle DB not fully configured (ORACLE_DB_USERNAME/ORACLE_DB_PASSWORD/ORACLE_DB_CONNECT_STRING missing)')
             return jsonify({'albums': [], 'count': 0, 'warning': 'Oracle DB not configured (set ORACLE_DB_USERNAME, ORACLE_DB_PASSWORD and ORACLE_DB_CONNECT_STRING)'}), 200
 
-        try:
-            connection = oracledb.connect(
-                user=user,
-                password=pwd,
-                dsn=dsn,
-                wallet_location=wallet,
-                wallet_password=wallet_pw
-            )
-
-            cursor = connection.cursor()
-            cursor.execute("SELECT DISTINCT album_name FROM photo_embeddings ORDER BY album_name")
-            albums = [row[0] for row in cursor]
-
-            cursor.close()
-            connection.close()
+        global _albums_cache
+        cached = _albums_cache
+        if cached and cached[1] > time.time():
+            return jsonify({'albums': cached[0], 'count': len(cached[0])})
 
+        try:
+            with pooled_connection() as connection:
+                cursor = connection.cursor()
+                # Fetch every album name in a single round trip, as scalars rather than 1-tuples
+                cursor.arraysize = 1000
+                cursor.prefetchrows = 1001
+                cursor.execute("SELECT DISTINCT album_name FROM photo_embeddings ORDER BY album_name")
+                cursor.rowfactory = lambda name: name
+                albums = cursor.fetchall()
+                cursor.close()
+
+            _albums_cache = (albums, time.time() + ALBUMS_CACHE_TTL_SECONDS)
             return jsonify({'albums': albums, 'count': len(albums)})
         except Exception as e:
             # Handle common Oracle client errors like missing wallet/config (DPY-4027) gracefully
@@ -1939,14 +2145,25 @@ def upload_unified():
     
     Returns: { media_id, album_name, file_type, oci_path, par_url, task_id }
     """
-    # Debug logging
-    logger.info(f"Upload request - Files: {list(request.files.keys())}")
-    logger.info(f"Upload request - Form: {dict(request.form)}")
-    
+    # Cheap checks from headers/config first; touching request.files/form parses the whole body
     if not UNIFIED_ALBUM_AVAILABLE or album_manager is None:
         return jsonify({'error': 'Unified album module not available'}), 500
     
+    if not oci:
+        return jsonify({'error': 'OCI SDK not configured on server'}), 500
+    
+    # Only the mimetype is checked here: chunked uploads carry no Content-Length,
+    # and a missing file is reported by the request.files check below
+    if request.mimetype != 'multipart/form-data':
+        return jsonify({'error': 'mediaFile is required'}), 400
+    
+    # Debug logging
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Upload request - Files: {list(request.files.keys())}")
+        logger.debug(f"Upload request - Form: {dict(request.form)}")
+    
     if 'mediaFile' not in request.files:
+        logger.info(f"Upload rejected - Files: {list(request.files.keys())}")
         return jsonify({'error': 'mediaFile is required'}), 400
     
     file = request.files['mediaFile']
@@ -1958,18 +2175,13 @@ def upload_unified():
     if not album_name:
         return jsonify({'error': 'album_name is required'}), 400
     
-    if not oci:
-        return jsonify({'error': 'OCI SDK not configured on server'}), 500
+    # Detect file type before any OCI work
+    file_type, mime_type = album_manager.detect_file_type(file.filename)
+    if file_type == 'unknown':
+        return jsonify({'error': f'Unsupported file type: {mime_type}'}), 400
 
     try:
-        # Detect file type
-        file_type, mime_type = album_manager.detect_file_type(file.filename)
-        if file_type == 'unknown':
-            return jsonify({'error': f'Unsupported file type: {mime_type}'}), 400
-        
-        config = _load_oci_config()
-        obj_client = oci.object_storage.ObjectStorageClient(config)
-        namespace = obj_client.get_namespace().data
+        obj_client, namespace = _oci_client()
         bucket = os.getenv('DEFAULT_OCI_BUCKET', 'Media')
         
         # Create album-specific object path
@@ -1984,22 +2196,34 @@ def upload_unified():
             mpu = obj_client.create_multipart_upload(namespace, bucket, create_details)
             upload_id = mpu.data.upload_id
             part_num = 1
-            parts = []
+            # Upload parts concurrently; at most PART_UPLOAD_WORKERS chunks are held in memory at once
+            in_flight = deque()
+            futures = []
+            part_buf = memoryview(bytearray(MULTIPART_PART_SIZE))
             while True:
-                chunk = file.stream.read(10 * 1024 * 1024)  # 10MB parts
-                if not chunk:
+                n = _read_part(file.stream, part_buf)
+                if not n:
                     break
-                resp = obj_client.upload_part(namespace, bucket, object_name, upload_id, part_num, chunk)
-                etag = resp.headers.get('etag') if resp and hasattr(resp, 'headers') else None
-                part_detail = oci.object_storage.models.CommitMultipartUploadPartDetails(part_num=part_num, etag=etag)
-                parts.append(part_detail)
+                chunk = bytes(part_buf[:n])
+                if len(in_flight) >= PART_UPLOAD_WORKERS:
+                    in_flight.popleft().result()
+                fut = PART_UPLOAD_EXECUTOR.submit(obj_client.upload_part, namespace, bucket, object_name, upload_id, part_num, chunk)
+                in_flight.append(fut)
+                futures.append((part_num, fut))
                 part_num += 1
+            parts = []
+            for num, fut in futures:
+                resp = fut.result()
+                etag = resp.headers.get('etag') if resp and hasattr(resp, 'headers') else None
+                parts.append(oci.object_storage.models.CommitMultipartUploadPartDetails(part_num=num, etag=etag))
             commit_details = oci.object_storage.models.CommitMultipartUploadDetails(parts_to_commit=parts)
             obj_client.commit_multipart_upload(namespace, bucket, object_name, upload_id, commit_details)
         else:
             logger.info('Using single PUT for %s (size=%s)', file.filename, str(file_size))
             obj_client.put_object(namespace, bucket, object_name, file.stream)
         
+        _invalidate_albums_cache()
+        
         # Create OCI path and PAR URL
         oci_path = f'oci://{namespace}/{bucket}/{object_name}'
         par_url = _get_par_url_for_oci(oci_path)
@@ -2059,6 +2283,9 @@ def upload_unified():
                             _upload_tasks[tid]['error'] = 'Photo embedding creation failed'
                     
                     save_upload_tasks()
+                    if _upload_tasks[tid]['status'] == 'done':
+                        # The new embedding must show up in cached album searches
+                        _invalidate_search_cache()
                     logger.info('Background unified embedding task %s completed', tid)
                     
                 except Exception as e:
@@ -2067,7 +2294,9 @@ def upload_unified():
                     _upload_tasks[tid]['error'] = str(e)
                     save_upload_tasks()
             
-            EXECUTOR.submit(run_unified_embedding_task, task_id, media_id, oci_path, file_type, album_name)
+            if not _submit_embedding(run_unified_embedding_task, task_id, media_id, oci_path, file_type, album_name,
+                                     task_id=task_id):
+                save_upload_tasks()
         
         return jsonify({
             'media_id': media_id,
@@ -2101,19 +2330,10 @@ def list_unified_albums():
         albums = album_manager.list_albums()
         logger.info(f"✅ Found {len(albums)} albums")
         
-        # Convert datetime objects to strings for JSON serialization
-        albums_serializable = []
-        for album in albums:
-            album_copy = album.copy()
-            if 'created_at' in album_copy and album_copy['created_at']:
-                album_copy['created_at'] = album_copy['created_at'].isoformat()
-            if 'updated_at' in album_copy and album_copy['updated_at']:
-                album_copy['updated_at'] = album_copy['updated_at'].isoformat()
-            albums_serializable.append(album_copy)
-        
-        response_data = {'albums': albums_serializable, 'count': len(albums_serializable)}
-        logger.info(f"📤 Returning {len(albums_serializable)} albums")
-        return jsonify(response_data)
+        # datetime values are serialized as ISO 8601 by _json_response
+        response_data = {'albums': albums, 'count': len(albums)}
+        logger.info(f"📤 Returning {len(albums)} albums")
+        return _json_response(response_data)
         
     except Exception as e:
         logger.exception('❌ Failed to list unified albums')
@@ -2132,17 +2352,16 @@ def get_album_contents(album_name):
             
         contents = album_manager.get_album_contents(album_name)
         
+        par_urls = _batch_par_urls(item.get('file_path') for item in contents)
+        
         # Normalize file paths to browser-accessible URLs
         for item in contents:
             if item.get('file_path') and item['file_path'].startswith('oci://'):
-                try:
-                    item['browser_url'] = _get_par_url_for_oci(item['file_path'])
-                except Exception:
-                    item['browser_url'] = f"/object_proxy?path={item['file_path']}"
+                item['browser_url'] = par_urls[item['file_path']]
             else:
                 item['browser_url'] = item.get('file_path', '')
         
-        return jsonify({'contents': contents, 'album_name': album_name, 'count': len(contents)})
+        return _json_response({'contents': contents, 'album_name': album_name, 'count': len(contents)})
     except Exception as e:
         logger.exception('Failed to get album contents')
         return jsonify({'error': str(e)}), 500
@@ -2170,7 +2389,21 @@ def search_unified_album():
     
     album_name = payload.get('album_name')
     file_type = payload.get('file_type')
-    top_k = payload.get('top_k', 10)
+    # Validated up front: the values form the (hashable) cache key below
+    if not all(isinstance(v, str) or v is None for v in (query, album_name, file_type)):
+        return jsonify({'error': 'query, album_name and file_type must be strings'}), 400
+    try:
+        top_k = int(payload.get('top_k', 10))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'top_k must be an integer'}), 400
+    
+    # Repeat searches (refresh, pagination) are served from a short-lived cache
+    cache_key = (query, album_name, file_type, top_k)
+    use_cache = not app.debug
+    if use_cache:
+        cached = _search_unified_cache.get(cache_key)
+        if cached and cached[1] > time.time():
+            return jsonify(cached[0])
     
     try:
         results = album_manager.search_unified_album(
@@ -2181,16 +2414,19 @@ def search_unified_album():
         )
         
         # Normalize file paths to browser-accessible URLs
+        par_urls = _batch_par_urls(result.get('file_path') for result in results)
         for result in results:
             if result.get('file_path') and result['file_path'].startswith('oci://'):
-                try:
-                    result['browser_url'] = _get_par_url_for_oci(result['file_path'])
-                except Exception:
-                    result['browser_url'] = f"/object_proxy?path={result['file_path']}"
+                result['browser_url'] = par_urls[result['file_path']]
             else:
                 result['browser_url'] = result.get('file_path', '')
         
-        return jsonify({'results': results, 'query': query, 'count': len(results)})
+        response_payload = {'results': results, 'query': query, 'count': len(results)}
+        if use_cache:
+            if len(_search_unified_cache) >= SEARCH_CACHE_MAX:
+                _search_unified_cache.clear()
+            _search_unified_cache[cache_key] = (response_payload, time.time() + SEARCH_CACHE_TTL_SECONDS)
+        return jsonify(response_payload)
     except Exception as e:
         logger.exception('Failed to search unified album')
         return jsonify({'error': str(e)}), 500
@@ -2221,10 +2457,8 @@ def create_unified_embeddings():
     try:
         # If album_name provided, get all media in that album
         if album_name and not media_ids:
-            contents = album_manager.get_album_contents(album_name)
-            media_items = contents
-            if file_type:
-                media_items = [item for item in media_items if item['file_type'] == file_type]
+            # Only fetch media that still needs an embedding
+            media_items = album_manager.get_album_contents(album_name, file_type=file_type, pending_only=True)
         else:
             # Get specific media items by ID
             media_items = []
@@ -2249,34 +2483,61 @@ def create_unified_embeddings():
             _upload_tasks[tid]['status'] = 'running'
             save_upload_tasks()
             
+            def _process_chunk(chunk):
+                """Embed a chunk of items; returns a success flag per item."""
+                try:
+                    return [bool(r) for r in create_unified_embeddings_batch(chunk)]
+                except Exception:
+                    # Fall back to embedding the chunk one item at a time
+                    logger.exception('Batch embedding failed for %d items; retrying individually', len(chunk))
+                    flags = []
+                    for item in chunk:
+                        try:
+                            flags.append(bool(create_unified_embedding(item['file_path'], item['file_type'], item['album_name'])))
+                        except Exception:
+                            logger.exception(f"Failed to create embedding for {item.get('file_name', 'unknown')}")
+                            flags.append(False)
+                    return flags
+            
             try:
                 successful = 0
                 failed = 0
                 
+                pending = []
                 for item in media_items:
-                    try:
-                        file_path = item['file_path']
-                        file_type = item['file_type']
-                        album_name = item['album_name']
-                        
-                        if item.get('has_embedding') == 'Y':
-                            logger.info(f"Skipping {item['file_name']} - already has embedding")
-                            continue
-                        
-                        result = create_unified_embedding(file_path, file_type, album_name)
-                        if result:
-                            successful += 1
-                        else:
-                            failed += 1
-                            
-                    except Exception as e:
-                        logger.exception(f"Failed to create embedding for {item.get('file_name', 'unknown')}")
-                        failed += 1
+                    if item.get('has_embedding') == 'Y':
+                        logger.info(f"Skipping {item['file_name']} - already has embedding")
+                    else:
+                        pending.append(item)
+                
+                # Embedding is HTTP + DB bound, so fan chunks out over a bounded pool; each
+                # chunk's rows are stored in one insert. Chunks are sized so every worker
+                # gets work. Counters are only updated here on the collecting thread
+                chunk_size = max(1, min(UNIFIED_EMBED_BATCH, math.ceil(len(pending) / UNIFIED_EMBED_WORKERS)))
+                chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+                done = 0
+                last_saved = 0
+                with ThreadPoolExecutor(max_workers=UNIFIED_EMBED_WORKERS, thread_name_prefix='unified_embed') as tp:
+                    futures = [tp.submit(_process_chunk, chunk) for chunk in chunks]
+                    for future in as_completed(futures):
+                        flags = future.result()
+                        successful += sum(flags)
+                        failed += len(flags) - sum(flags)
+                        done += len(flags)
+                        _publish_task_progress(tid, status='running', done=done, total=len(pending),
+                                               successful=successful, failed=failed)
+                        if done - last_saved >= UNIFIED_EMBED_SAVE_EVERY:
+                            last_saved = done
+                            _upload_tasks[tid]['completed'] = done
+                            save_upload_tasks()
                 
                 _upload_tasks[tid]['status'] = 'done'
                 _upload_tasks[tid]['successful'] = successful
                 _upload_tasks[tid]['failed'] = failed
                 save_upload_tasks()
+                _invalidate_search_cache()
+                _publish_task_progress(tid, status='done', done=done, total=len(pending),
+                                       successful=successful, failed=failed)
                 logger.info('Background unified embedding batch %s completed: %d successful, %d failed', tid, successful, failed)
                 
             except Exception as e:
@@ -2284,6 +2545,7 @@ def create_unified_embeddings():
                 _upload_tasks[tid]['status'] = 'failed'
                 _upload_tasks[tid]['error'] = str(e)
                 save_upload_tasks()
+                _publish_task_progress(tid, status='failed', error=str(e))
         
         EXECUTOR.submit(run_unified_embedding_batch, task_id, media_items)
         
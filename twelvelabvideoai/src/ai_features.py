@@ -9,11 +9,15 @@ This module provides advanced AI features including:
 """
 
 import os
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
-import httpx
-from utils.db_utils_vector import get_db_connection
+from utils.db_utils_vector import pooled_connection, ALBUM_VECTORS_INT8, ALBUM_VECTORS_NORMALIZED
+from utils.http_utils import get_async_client, close_async_client
 
 load_dotenv()
 
@@ -23,6 +27,299 @@ logger = logging.getLogger(__name__)
 TWELVE_LABS_API_KEY = os.getenv('TWELVE_LABS_API_KEY')
 TWELVE_LABS_API_URL = "https://api.twelvelabs.io/v1.2"
 
+try:
+    from aiolimiter import AsyncLimiter
+except ImportError:
+    AsyncLimiter = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+
+# Generate results are stable for a video, so they are kept in an LRU with a
+# TTL, keyed by (API URL, video_id, sorted types) - the versioned URL makes a
+# TwelveLabs API upgrade start from a clean cache. With diskcache installed and
+# GENERATE_CACHE_DIR set, results also persist across restarts.
+GENERATE_CACHE_MAX = int(os.getenv('GENERATE_CACHE_MAX', '10000'))
+GENERATE_CACHE_TTL_SECONDS = int(os.getenv('GENERATE_CACHE_TTL_SECONDS', '86400'))
+GENERATE_CACHE_DIR = os.getenv('GENERATE_CACHE_DIR')
+_generate_cache = OrderedDict()
+# Shared by every request thread: guards each check-and-update of _generate_cache
+_generate_cache_lock = threading.Lock()
+_generate_disk_cache = (
+    diskcache.Cache(GENERATE_CACHE_DIR)
+    if diskcache is not None and GENERATE_CACHE_DIR else None
+)
+
+# Combined request used by analyze_video_full, and the per-feature type
+# sets its response also answers
+FULL_GENERATE_TYPES = ["highlight", "chapter", "title", "topic", "hashtag", "summary"]
+_FEATURE_TYPES = (
+    ("highlight",),
+    ("chapter",),
+    ("title", "topic", "hashtag"),
+    ("summary", "topic"),
+)
+
+
+def _generate_key(base_url: str, video_id: str, types) -> Tuple:
+    return (base_url, video_id, tuple(sorted(set(types))))
+
+
+def _remember_generate(key: Tuple, data: Dict[str, Any], expires: float = None):
+    if expires is None:
+        expires = time.time() + GENERATE_CACHE_TTL_SECONDS
+    with _generate_cache_lock:
+        _generate_cache[key] = (data, expires)
+        _generate_cache.move_to_end(key)
+        while len(_generate_cache) > GENERATE_CACHE_MAX:
+            _generate_cache.popitem(last=False)
+
+
+def _cache_generate(base_url: str, video_id: str, types, data: Dict[str, Any]):
+    key = _generate_key(base_url, video_id, types)
+    _remember_generate(key, data)
+    if _generate_disk_cache is not None:
+        _generate_disk_cache.set(key, data, expire=GENERATE_CACHE_TTL_SECONDS)
+
+
+def _cached_generate(base_url: str, video_id: str, types) -> Optional[Dict[str, Any]]:
+    key = _generate_key(base_url, video_id, types)
+    with _generate_cache_lock:
+        cached = _generate_cache.get(key)
+        if cached is not None:
+            if cached[1] > time.time():
+                _generate_cache.move_to_end(key)
+                return cached[0]
+            _generate_cache.pop(key, None)
+    if _generate_disk_cache is not None:
+        data, expires = _generate_disk_cache.get(key, expire_time=True)
+        if data is not None:
+            # Keep the disk entry's remaining lifetime rather than a fresh TTL
+            _remember_generate(key, data, expires)
+            return data
+    return None
+
+
+async def _generate(api_key: str, base_url: str, video_id: str,
+                    types: List[str]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """POST /generate once for the given types
+    
+    Returns:
+        (response data, None) on success or (None, error text) on failure
+    """
+    data = _cached_generate(base_url, video_id, types)
+    if data is not None:
+        return data, None
+    
+    response = await get_async_client().post(
+        f"{base_url}/generate",
+        headers={
+            "x-api-key": api_key,
+            "Content-Type": "application/json"
+        },
+        json={
+            "video_id": video_id,
+            "types": types
+        }
+    )
+    
+    if response.status_code != 200:
+        return None, response.text
+    
+    data = response.json()
+    _cache_generate(base_url, video_id, types, data)
+    return data, None
+
+
+# album_media embeddings are L2-normalized when written. Once existing rows are
+# normalized too (migrate_normalize_album_vectors.py, which also rebuilds the
+# vector index for DOT), set ALBUM_VECTORS_NORMALIZED=true: on unit vectors DOT
+# ranks exactly like COSINE without recomputing norms per candidate. Oracle's
+# DOT distance is the negated dot product, i.e. -cosine similarity.
+# With ALBUM_VECTORS_INT8 the searches scan the quarter-size embedding_int8 copy
+# (always with COSINE, as those vectors are scaled independently) and re-rank the
+# candidates on the FP32 embedding_vector
+VECTOR_COLUMN = 'embedding_int8' if ALBUM_VECTORS_INT8 else 'embedding_vector'
+SIMILARITY_METRIC = 'DOT' if ALBUM_VECTORS_NORMALIZED and not ALBUM_VECTORS_INT8 else 'COSINE'
+
+
+# INT8 ANN candidates re-ranked on the FP32 embedding_vector, per result wanted
+INT8_RERANK_FACTOR = int(os.getenv('INT8_RERANK_FACTOR', '10'))
+
+
+def _similar_media_sql(file_type: str, src_columns: str, exclusion: str) -> str:
+    """SQL for the top :top_k album_media rows of file_type nearest to :media_id
+    
+    With ALBUM_VECTORS_INT8 the approximate search runs on embedding_int8 for
+    :candidates rows, which are then re-ranked and filtered exactly on the FP32
+    embedding_vector; otherwise VECTOR_COLUMN is searched directly. Rows the
+    main app wrote without an INT8 copy (or all rows, when the source row has
+    none) get their candidates from an FP32 search instead.
+    """
+    if not ALBUM_VECTORS_INT8:
+        return f"""
+            WITH src AS (
+                SELECT {VECTOR_COLUMN}{src_columns}
+                FROM album_media
+                WHERE id = :media_id AND file_type = '{file_type}'
+                FETCH FIRST 1 ROWS ONLY
+            )
+            SELECT 
+                m.id,
+                m.album_name,
+                m.file_name,
+                VECTOR_DISTANCE(m.{VECTOR_COLUMN}, src.{VECTOR_COLUMN}, {SIMILARITY_METRIC}) as distance
+            FROM album_media m CROSS JOIN src
+            WHERE m.file_type = '{file_type}'
+              AND {exclusion}
+              AND VECTOR_DISTANCE(m.{VECTOR_COLUMN}, src.{VECTOR_COLUMN}, {SIMILARITY_METRIC}) <= :max_distance
+            ORDER BY distance ASC
+            FETCH APPROX FIRST :top_k ROWS ONLY
+        """
+    return f"""
+        WITH src AS (
+            SELECT embedding_int8, embedding_vector{src_columns}
+            FROM album_media
+            WHERE id = :media_id AND file_type = '{file_type}'
+            FETCH FIRST 1 ROWS ONLY
+        ),
+        int8_candidates AS (
+            SELECT m.id, m.album_name, m.file_name, m.embedding_vector
+            FROM album_media m CROSS JOIN src
+            WHERE src.embedding_int8 IS NOT NULL
+              AND m.embedding_int8 IS NOT NULL
+              AND m.file_type = '{file_type}'
+              AND {exclusion}
+            ORDER BY VECTOR_DISTANCE(m.embedding_int8, src.embedding_int8, COSINE)
+            FETCH APPROX FIRST :candidates ROWS ONLY
+        ),
+        fp32_candidates AS (
+            SELECT m.id, m.album_name, m.file_name, m.embedding_vector
+            FROM album_media m CROSS JOIN src
+            WHERE (src.embedding_int8 IS NULL OR m.embedding_int8 IS NULL)
+              AND m.file_type = '{file_type}'
+              AND {exclusion}
+            ORDER BY VECTOR_DISTANCE(m.embedding_vector, src.embedding_vector, {SIMILARITY_METRIC})
+            FETCH APPROX FIRST :candidates ROWS ONLY
+        ),
+        candidates AS (
+            SELECT * FROM int8_candidates
+            UNION ALL
+            SELECT * FROM fp32_candidates
+        )
+        SELECT 
+            c.id,
+            c.album_name,
+            c.file_name,
+            VECTOR_DISTANCE(c.embedding_vector, src.embedding_vector, {SIMILARITY_METRIC}) as distance
+        FROM candidates c CROSS JOIN src
+        WHERE VECTOR_DISTANCE(c.embedding_vector, src.embedding_vector, {SIMILARITY_METRIC}) <= :max_distance
+        ORDER BY distance ASC
+        FETCH FIRST :top_k ROWS ONLY
+    """
+
+
+def _similar_media_binds(media_id: int, top_k: int, min_similarity: float) -> Dict[str, Any]:
+    binds = {
+        "media_id": media_id,
+        "top_k": top_k,
+        "max_distance": _similarity_to_distance(min_similarity)
+    }
+    if ALBUM_VECTORS_INT8:
+        binds["candidates"] = top_k * INT8_RERANK_FACTOR
+    return binds
+
+
+def _distance_to_similarity(distance: float) -> float:
+    return -distance if SIMILARITY_METRIC == 'DOT' else 1.0 - distance
+
+
+def _similarity_to_distance(similarity: float) -> float:
+    return -similarity if SIMILARITY_METRIC == 'DOT' else 1.0 - similarity
+
+
+# Fan-out limits for the bulk_* coroutines
+BULK_CONCURRENCY = int(os.getenv('TWELVE_LABS_BULK_CONCURRENCY', '10'))
+BULK_RATE_PER_SECOND = float(os.getenv('TWELVE_LABS_RATE_PER_SECOND', '0'))
+
+
+async def _gather_bounded(func, video_ids: List[str], concurrency: int = None) -> List[Any]:
+    """Run func(video_id) for every video concurrently, at most `concurrency` at a time
+    
+    When aiolimiter is installed and TWELVE_LABS_RATE_PER_SECOND is set, calls
+    are also rate limited. Exceptions are returned in place of results.
+    """
+    sem = asyncio.Semaphore(concurrency or BULK_CONCURRENCY)
+    limiter = None
+    if AsyncLimiter is not None and BULK_RATE_PER_SECOND > 0:
+        limiter = AsyncLimiter(BULK_RATE_PER_SECOND, 1)
+    
+    async def _one(video_id):
+        async with sem:
+            if limiter is not None:
+                async with limiter:
+                    return await func(video_id)
+            return await func(video_id)
+    
+    return await asyncio.gather(*(_one(v) for v in video_ids), return_exceptions=True)
+
+
+# Simple keyword-based moderation (can be enhanced with ML models)
+SENSITIVE_KEYWORDS = (
+    "violence", "violent", "graphic", "explicit",
+    "weapon", "blood", "injury", "accident"
+)
+
+_keyword_automaton = None
+if ahocorasick is not None:
+    _keyword_automaton = ahocorasick.Automaton()
+    for _keyword in SENSITIVE_KEYWORDS:
+        _keyword_automaton.add_word(_keyword, _keyword)
+    _keyword_automaton.make_automaton()
+
+
+def _find_sensitive_keywords(summary: str, topics: List[str]) -> List[str]:
+    """Return the sensitive keywords found in the summary or topics, in keyword order"""
+    # Newline-joined so no keyword can match across two fields
+    text = "\n".join([summary, *topics]).lower()
+    if _keyword_automaton is not None:
+        found = {keyword for _, keyword in _keyword_automaton.iter(text)}
+        return [k for k in SENSITIVE_KEYWORDS if k in found]
+    return [k for k in SENSITIVE_KEYWORDS if k in text]
+
+
+_media_tags_ready = False
+_media_tags_lock = threading.Lock()
+
+
+def _ensure_media_tags_table(cursor):
+    """Create the media_tags table once per process"""
+    global _media_tags_ready
+    if _media_tags_ready:
+        return
+    with _media_tags_lock:
+        if _media_tags_ready:
+            return
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS media_tags (
+                id NUMBER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+                media_id NUMBER NOT NULL,
+                media_type VARCHAR2(20) NOT NULL,
+                tag VARCHAR2(200) NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                CONSTRAINT uk_media_tag UNIQUE (media_id, media_type, tag)
+            )
+        """)
+        _media_tags_ready = True
+
 
 class VideoHighlightsExtractor:
     """Extract key moments and highlights from videos using TwelveLabs"""
@@ -42,36 +339,40 @@ class VideoHighlightsExtractor:
             Dict containing highlights with timestamps and descriptions
         """
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                # Use TwelveLabs generate API to create highlights
-                response = await client.post(
-                    f"{self.base_url}/generate",
-                    headers={
-                        "x-api-key": self.api_key,
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "video_id": video_id,
-                        "types": ["highlight"]
-                    }
-                )
+            # Use TwelveLabs generate API to create highlights
+            data, error = await _generate(self.api_key, self.base_url, video_id, ["highlight"])
+            
+            if data is not None:
+                logger.info(f"✅ Extracted highlights for video {video_id}")
+                return {
+                    "success": True,
+                    "video_id": video_id,
+                    "highlights": data.get("highlights", [])[:max_highlights]
+                }
+            else:
+                logger.error(f"❌ Failed to extract highlights: {error}")
+                return {"success": False, "error": error}
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    logger.info(f"✅ Extracted highlights for video {video_id}")
-                    return {
-                        "success": True,
-                        "video_id": video_id,
-                        "highlights": data.get("highlights", [])[:max_highlights]
-                    }
-                else:
-                    logger.error(f"❌ Failed to extract highlights: {response.text}")
-                    return {"success": False, "error": response.text}
-                    
         except Exception as e:
             logger.error(f"❌ Error extracting highlights: {str(e)}")
             return {"success": False, "error": str(e)}
     
+    async def bulk_extract_highlights(self, video_ids: List[str], max_highlights: int = 5,
+                                      concurrency: int = None) -> List[Dict[str, Any]]:
+        """Extract highlights for many videos concurrently
+        
+        Args:
+            video_ids: TwelveLabs video IDs
+            max_highlights: Maximum number of highlights per video
+            concurrency: Maximum requests in flight
+            
+        Returns:
+            List of highlight results (or exceptions), in input order
+        """
+        return await _gather_bounded(
+            lambda vid: self.extract_highlights(vid, max_highlights), video_ids, concurrency
+        )
+    
     async def get_video_chapters(self, video_id: str) -> Dict[str, Any]:
         """Get video chapters with timestamps
         
@@ -82,31 +383,19 @@ class VideoHighlightsExtractor:
             Dict containing chapters with timestamps and descriptions
         """
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/generate",
-                    headers={
-                        "x-api-key": self.api_key,
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "video_id": video_id,
-                        "types": ["chapter"]
-                    }
-                )
+            data, error = await _generate(self.api_key, self.base_url, video_id, ["chapter"])
+            
+            if data is not None:
+                logger.info(f"✅ Got chapters for video {video_id}")
+                return {
+                    "success": True,
+                    "video_id": video_id,
+                    "chapters": data.get("chapters", [])
+                }
+            else:
+                logger.error(f"❌ Failed to get chapters: {error}")
+                return {"success": False, "error": error}
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    logger.info(f"✅ Got chapters for video {video_id}")
-                    return {
-                        "success": True,
-                        "video_id": video_id,
-                        "chapters": data.get("chapters", [])
-                    }
-                else:
-                    logger.error(f"❌ Failed to get chapters: {response.text}")
-                    return {"success": False, "error": response.text}
-                    
         except Exception as e:
             logger.error(f"❌ Error getting chapters: {str(e)}")
             return {"success": False, "error": str(e)}
@@ -129,40 +418,41 @@ class AutoTagger:
             Dict containing generated tags, topics, hashtags, and title
         """
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                # Generate title, topics, and hashtags
-                response = await client.post(
-                    f"{self.base_url}/generate",
-                    headers={
-                        "x-api-key": self.api_key,
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "video_id": video_id,
-                        "types": ["title", "topic", "hashtag"]
-                    }
-                )
+            # Generate title, topics, and hashtags
+            data, error = await _generate(self.api_key, self.base_url, video_id, ["title", "topic", "hashtag"])
+            
+            if data is not None:
+                logger.info(f"✅ Generated tags for video {video_id}")
+                
+                return {
+                    "success": True,
+                    "video_id": video_id,
+                    "title": data.get("title", ""),
+                    "topics": data.get("topics", []),
+                    "hashtags": data.get("hashtags", []),
+                    "tags": data.get("topics", []) + data.get("hashtags", [])
+                }
+            else:
+                logger.error(f"❌ Failed to generate tags: {error}")
+                return {"success": False, "error": error}
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    logger.info(f"✅ Generated tags for video {video_id}")
-                    
-                    return {
-                        "success": True,
-                        "video_id": video_id,
-                        "title": data.get("title", ""),
-                        "topics": data.get("topics", []),
-                        "hashtags": data.get("hashtags", []),
-                        "tags": data.get("topics", []) + data.get("hashtags", [])
-                    }
-                else:
-                    logger.error(f"❌ Failed to generate tags: {response.text}")
-                    return {"success": False, "error": response.text}
-                    
         except Exception as e:
             logger.error(f"❌ Error generating tags: {str(e)}")
             return {"success": False, "error": str(e)}
     
+    async def bulk_generate_tags(self, video_ids: List[str],
+                                 concurrency: int = None) -> List[Dict[str, Any]]:
+        """Generate tags for many videos concurrently
+        
+        Args:
+            video_ids: TwelveLabs video IDs
+            concurrency: Maximum requests in flight
+            
+        Returns:
+            List of tag results (or exceptions), in input order
+        """
+        return await _gather_bounded(self.generate_tags, video_ids, concurrency)
+    
     def save_tags_to_db(self, media_id: int, tags: List[str], media_type: str = "video"):
         """Save generated tags to database
         
@@ -172,39 +462,27 @@ class AutoTagger:
             media_type: Type of media (video or photo)
         """
         try:
-            connection = get_db_connection()
-            cursor = connection.cursor()
+            with pooled_connection() as connection:
+                cursor = connection.cursor()
             
-            # Create tags table if it doesn't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS media_tags (
-                    id NUMBER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
-                    media_id NUMBER NOT NULL,
-                    media_type VARCHAR2(20) NOT NULL,
-                    tag VARCHAR2(200) NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    CONSTRAINT uk_media_tag UNIQUE (media_id, media_type, tag)
-                )
-            """)
+                _ensure_media_tags_table(cursor)
             
-            # Insert tags
-            for tag in tags:
-                try:
-                    cursor.execute("""
+                # Insert all tags in one round trip; duplicates come back as batch errors
+                rows = [
+                    {"media_id": media_id, "media_type": media_type, "tag": tag}
+                    for tag in tags
+                ]
+                if rows:
+                    cursor.executemany("""
                         INSERT INTO media_tags (media_id, media_type, tag)
                         VALUES (:media_id, :media_type, :tag)
-                    """, {
-                        "media_id": media_id,
-                        "media_type": media_type,
-                        "tag": tag
-                    })
-                except Exception as e:
-                    # Skip duplicates
-                    logger.debug(f"Tag '{tag}' already exists for media {media_id}")
+                    """, rows, batcherrors=True)
+                
+                    for error in cursor.getbatcherrors():
+                        # Skip duplicates
+                        logger.debug(f"Tag '{rows[error.offset]['tag']}' already exists for media {media_id}")
                     
-            connection.commit()
-            cursor.close()
-            connection.close()
+                connection.commit()
             
             logger.info(f"✅ Saved {len(tags)} tags for media {media_id}")
             return True
@@ -214,6 +492,41 @@ class AutoTagger:
             return False
 
 
+# Backwards-compatible aliases, resolved on lookup rather than stored (or serialized)
+_LEGACY_RESULT_KEYS = {"id": "media_id", "similarity": "score", "type": "file_type"}
+
+
+class SimilarMediaResult(dict):
+    """Similar-media result holding only canonical keys
+    
+    Legacy callers can still read result["id"], result["similarity"] and
+    result["type"]; they map to media_id, score and file_type.
+    """
+    
+    def __missing__(self, key):
+        if key in _LEGACY_RESULT_KEYS:
+            return self[_LEGACY_RESULT_KEYS[key]]
+        raise KeyError(key)
+    
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+def _similar_media_result(row, file_type: str) -> SimilarMediaResult:
+    return SimilarMediaResult(
+        media_id=row[0],
+        album_name=row[1],
+        file_name=row[2],
+        score=_distance_to_similarity(float(row[3])),
+        file_type=file_type,
+        segment_start=None,
+        segment_end=None
+    )
+
+
 class SimilarMediaFinder:
     """Find similar photos and videos using vector similarity"""
     
@@ -230,60 +543,21 @@ class SimilarMediaFinder:
             List of similar photos with similarity scores
         """
         try:
-            connection = get_db_connection()
-            cursor = connection.cursor()
-            
-            # Get the embedding of the source photo
-            cursor.execute("""
-                SELECT embedding_vector
-                FROM album_media
-                WHERE id = :photo_id AND file_type = 'photo'
-            """, {"photo_id": photo_id})
-            
-            row = cursor.fetchone()
-            if not row:
-                logger.error(f"❌ Photo {photo_id} not found")
-                return []
-            
-            source_embedding = row[0]
-            
-            # Find similar photos using VECTOR_DISTANCE
-            cursor.execute("""
-                SELECT 
-                    id,
-                    album_name,
-                    file_name,
-                    VECTOR_DISTANCE(embedding_vector, :source_embedding, COSINE) as distance
-                FROM album_media
-                WHERE file_type = 'photo'
-                  AND id != :photo_id
-                ORDER BY distance ASC
-                FETCH FIRST :top_k ROWS ONLY
-            """, {
-                "source_embedding": source_embedding,
-                "photo_id": photo_id,
-                "top_k": top_k
-            })
+            with pooled_connection() as connection:
+                cursor = connection.cursor()
+                # Fetch all top_k rows in the execute round trip
+                cursor.arraysize = top_k
+                cursor.prefetchrows = top_k + 1
             
-            results = []
-            for row in cursor.fetchall():
-                similarity = 1.0 - float(row[3])  # Convert distance to similarity
-                if similarity >= min_similarity:
-                    results.append({
-                        "media_id": row[0],
-                        "id": row[0],  # Keep for backwards compatibility
-                        "album_name": row[1],
-                        "file_name": row[2],
-                        "score": similarity,
-                        "similarity": similarity,  # Keep for backwards compatibility
-                        "file_type": "photo",
-                        "type": "photo",  # Keep for backwards compatibility
-                        "segment_start": None,
-                        "segment_end": None
-                    })
+                # Find similar photos using VECTOR_DISTANCE against the source
+                # photo's embedding, resolved server-side in the same statement.
+                # APPROX lets Oracle serve this from the album_media vector index
+                cursor.execute(
+                    _similar_media_sql('photo', '', 'm.id != :media_id'),
+                    _similar_media_binds(photo_id, top_k, min_similarity)
+                )
             
-            cursor.close()
-            connection.close()
+                results = [_similar_media_result(row, "photo") for row in cursor]
             
             logger.info(f"✅ Found {len(results)} similar photos to {photo_id}")
             return results
@@ -305,63 +579,22 @@ class SimilarMediaFinder:
             List of similar videos with similarity scores
         """
         try:
-            connection = get_db_connection()
-            cursor = connection.cursor()
+            with pooled_connection() as connection:
+                cursor = connection.cursor()
+                # Fetch all top_k rows in the execute round trip
+                cursor.arraysize = top_k
+                cursor.prefetchrows = top_k + 1
             
-            # Get the embedding of the source video (average of all segments)
-            cursor.execute("""
-                SELECT embedding_vector
-                FROM album_media
-                WHERE id = :video_id AND file_type = 'video'
-                FETCH FIRST 1 ROWS ONLY
-            """, {"video_id": video_id})
-            
-            row = cursor.fetchone()
-            if not row:
-                logger.error(f"❌ Video {video_id} not found")
-                return []
-            
-            source_embedding = row[0]
-            
-            # Find similar videos using VECTOR_DISTANCE
-            # Group by parent video (same file_name) and use min distance
-            cursor.execute("""
-                SELECT 
-                    id,
-                    album_name,
-                    file_name,
-                    MIN(VECTOR_DISTANCE(embedding_vector, :source_embedding, COSINE)) as distance
-                FROM album_media
-                WHERE file_type = 'video'
-                  AND file_name != (SELECT file_name FROM album_media WHERE id = :video_id)
-                GROUP BY id, album_name, file_name
-                ORDER BY distance ASC
-                FETCH FIRST :top_k ROWS ONLY
-            """, {
-                "source_embedding": source_embedding,
-                "video_id": video_id,
-                "top_k": top_k
-            })
-            
-            results = []
-            for row in cursor.fetchall():
-                similarity = 1.0 - float(row[3])  # Convert distance to similarity
-                if similarity >= min_similarity:
-                    results.append({
-                        "media_id": row[0],
-                        "id": row[0],  # Keep for backwards compatibility
-                        "album_name": row[1],
-                        "file_name": row[2],
-                        "score": similarity,
-                        "similarity": similarity,  # Keep for backwards compatibility
-                        "file_type": "video",
-                        "type": "video",  # Keep for backwards compatibility
-                        "segment_start": None,
-                        "segment_end": None
-                    })
+                # Find similar videos using VECTOR_DISTANCE against the source
+                # video's embedding, excluding other segments of the same file.
+                # id is the primary key, so there is one distance per row and no
+                # aggregate is needed - that keeps the approximate index usable
+                cursor.execute(
+                    _similar_media_sql('video', ', file_name', 'm.file_name != src.file_name'),
+                    _similar_media_binds(video_id, top_k, min_similarity)
+                )
             
-            cursor.close()
-            connection.close()
+                results = [_similar_media_result(row, "video") for row in cursor]
             
             logger.info(f"✅ Found {len(results)} similar videos to {video_id}")
             return results
@@ -388,55 +621,47 @@ class ContentModerator:
             Dict containing moderation analysis results
         """
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                # Use TwelveLabs to generate summary which can indicate content type
-                response = await client.post(
-                    f"{self.base_url}/generate",
-                    headers={
-                        "x-api-key": self.api_key,
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "video_id": video_id,
-                        "types": ["summary", "topic"]
-                    }
-                )
+            # Use TwelveLabs to generate summary which can indicate content type
+            data, error = await _generate(self.api_key, self.base_url, video_id, ["summary", "topic"])
+            
+            if data is not None:
+                summary = data.get("summary", "")
+                topics = data.get("topics", [])
+                
+                flags = _find_sensitive_keywords(summary, topics)
+                
+                result = {
+                    "success": True,
+                    "video_id": video_id,
+                    "is_safe": len(flags) == 0,
+                    "flags": flags,
+                    "confidence": 1.0 - (len(flags) * 0.2),  # Simple confidence score
+                    "summary": summary,
+                    "topics": topics
+                }
+                
+                logger.info(f"✅ Content analysis for {video_id}: {'Safe' if result['is_safe'] else 'Flagged'}")
+                return result
+            else:
+                logger.error(f"❌ Failed content analysis: {error}")
+                return {"success": False, "error": error}
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    summary = data.get("summary", "")
-                    topics = data.get("topics", [])
-                    
-                    # Simple keyword-based moderation (can be enhanced with ML models)
-                    sensitive_keywords = [
-                        "violence", "violent", "graphic", "explicit",
-                        "weapon", "blood", "injury", "accident"
-                    ]
-                    
-                    flags = []
-                    for keyword in sensitive_keywords:
-                        if keyword in summary.lower() or any(keyword in t.lower() for t in topics):
-                            flags.append(keyword)
-                    
-                    result = {
-                        "success": True,
-                        "video_id": video_id,
-                        "is_safe": len(flags) == 0,
-                        "flags": flags,
-                        "confidence": 1.0 - (len(flags) * 0.2),  # Simple confidence score
-                        "summary": summary,
-                        "topics": topics
-                    }
-                    
-                    logger.info(f"✅ Content analysis for {video_id}: {'Safe' if result['is_safe'] else 'Flagged'}")
-                    return result
-                else:
-                    logger.error(f"❌ Failed content analysis: {response.text}")
-                    return {"success": False, "error": response.text}
-                    
         except Exception as e:
             logger.error(f"❌ Error analyzing content: {str(e)}")
             return {"success": False, "error": str(e)}
+    
+    async def bulk_analyze_content(self, video_ids: List[str],
+                                   concurrency: int = None) -> List[Dict[str, Any]]:
+        """Analyze many videos for moderation concurrently
+        
+        Args:
+            video_ids: TwelveLabs video IDs
+            concurrency: Maximum requests in flight
+            
+        Returns:
+            List of moderation results (or exceptions), in input order
+        """
+        return await _gather_bounded(self.analyze_content, video_ids, concurrency)
 
 
 # Convenience functions for easy imports
@@ -452,6 +677,44 @@ async def generate_auto_tags(video_id: str) -> Dict[str, Any]:
     return await tagger.generate_tags(video_id)
 
 
+async def analyze_video_full(video_id: str, api_key: str = None) -> Dict[str, Any]:
+    """Generate highlights, chapters, tags and summary in a single request
+    
+    Args:
+        video_id: TwelveLabs video ID
+        api_key: Optional API key override
+        
+    Returns:
+        Dict containing every generated feature keyed by name
+    """
+    try:
+        data, error = await _generate(api_key or TWELVE_LABS_API_KEY, TWELVE_LABS_API_URL,
+                                      video_id, FULL_GENERATE_TYPES)
+        if data is None:
+            logger.error(f"❌ Failed full video analysis: {error}")
+            return {"success": False, "error": error}
+        
+        # The combined response also answers each single-feature request
+        for types in _FEATURE_TYPES:
+            _cache_generate(TWELVE_LABS_API_URL, video_id, types, data)
+        
+        logger.info(f"✅ Full analysis for video {video_id}")
+        return {
+            "success": True,
+            "video_id": video_id,
+            "highlights": data.get("highlights", []),
+            "chapters": data.get("chapters", []),
+            "title": data.get("title", ""),
+            "topics": data.get("topics", []),
+            "hashtags": data.get("hashtags", []),
+            "summary": data.get("summary", "")
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error analyzing video: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+
 def find_similar_media(media_id: int, media_type: str = "photo", 
                       top_k: int = 10, min_similarity: float = 0.7) -> List[Dict[str, Any]]:
     """Find similar media items"""
@@ -469,8 +732,6 @@ async def moderate_content(video_id: str) -> Dict[str, Any]:
 
 
 if __name__ == "__main__":
-    import asyncio
-    
     # Example usage
     async def main():
         print("🎬 AI Features Module")
@@ -494,5 +755,7 @@ if __name__ == "__main__":
         print("\n4. Content moderation...")
         moderation = await moderate_content(video_id)
         print(f"Safe: {moderation.get('is_safe', 'Unknown')}")
+        
+        await close_async_client()
     
     asyncio.run(main())
@@ -4,8 +4,8 @@ Authorization and Role-Based Access Control (RBAC) for Data Guardian
 Defines permissions for different user roles and provides decorators for route protection
 """
 
-from functools import wraps
-from flask import redirect, url_for, flash, abort
+from functools import lru_cache, partial, wraps
+from flask import redirect, url_for, flash, abort, g, request
 from flask_login import current_user
 import logging
 
@@ -90,73 +90,61 @@ ROLE_PERMISSIONS = {
 
 # ==================== PERMISSION CHECKS ====================
 
-def has_permission(user, permission: str) -> bool:
-    """Check if user has a specific permission"""
-    if not user or not user.is_authenticated:
-        return False
-    
-    role_perms = ROLE_PERMISSIONS.get(user.role, {})
-    return role_perms.get(permission, False)
-
-
-def can_view_content(user) -> bool:
-    """Can view content"""
-    return has_permission(user, 'can_view')
-
-
-def can_search(user) -> bool:
-    """Can search content"""
-    return has_permission(user, 'can_search')
-
-
-def can_tag(user) -> bool:
-    """Can generate AI tags"""
-    return has_permission(user, 'can_tag')
-
-
-def can_upload(user) -> bool:
-    """Can upload new media"""
-    return has_permission(user, 'can_upload')
-
-
-def can_create_album(user) -> bool:
-    """Can create albums"""
-    return has_permission(user, 'can_create_album')
+# Granted permissions per role, flattened once so a check is a single set
+# membership test instead of two nested dict lookups.
+_PERM_SET = {
+    role: frozenset(p for p, v in perms.items() if v is True)
+    for role, perms in ROLE_PERMISSIONS.items()
+}
 
 
-def can_edit(user) -> bool:
-    """Can edit media"""
-    return has_permission(user, 'can_edit')
+def has_permission(user, permission: str, _perms=_PERM_SET) -> bool:
+    """Check if user has a specific permission"""
+    return bool(user) and user.is_authenticated and permission in _perms.get(user.role, ())
 
 
-def can_delete(user) -> bool:
-    """Can delete media"""
-    return has_permission(user, 'can_delete')
+# Per-permission helpers, pre-bound to their permission string
+can_view_content = partial(has_permission, permission='can_view')
+can_search = partial(has_permission, permission='can_search')
+can_tag = partial(has_permission, permission='can_tag')
+can_upload = partial(has_permission, permission='can_upload')
+can_create_album = partial(has_permission, permission='can_create_album')
+can_edit = partial(has_permission, permission='can_edit')
+can_delete = partial(has_permission, permission='can_delete')
+can_admin = partial(has_permission, permission='can_admin')
 
 
-def can_admin(user) -> bool:
-    """Can access admin functions"""
-    return has_permission(user, 'can_admin')
+def _cached_has_permission(permission: str, _g=g, _cu=current_user, _has=has_permission) -> bool:
+    """has_permission for current_user, memoized on flask.g for the request"""
+    cache = _g.setdefault('_perm_cache', {})
+    key = (getattr(_cu, 'id', None), permission)
+    if key not in cache:
+        cache[key] = _has(_cu, permission)
+    return cache[key]
 
 
 # ==================== DECORATORS ====================
+# Wrappers bind their globals as keyword-only defaults so the per-request
+# path uses fast locals; current_user is a LocalProxy, so binding it is safe.
+# Anonymous users are sent to login (and back via ?next=); authenticated users
+# without the permission get a bare 403 instead of a redirect and re-render.
 
 def permission_required(permission: str):
     """Decorator to require a specific permission"""
     def decorator(f):
         @wraps(f)
-        def decorated_function(*args, **kwargs):
-            if not current_user.is_authenticated:
-                flash('Please log in to access this page.', 'error')
-                return redirect(url_for('login'))
+        def decorated_function(*args, _cu=current_user, _check=_cached_has_permission,
+                               _flash=flash, _redirect=redirect, _url_for=url_for, **kwargs):
+            if not _cu.is_authenticated:
+                _flash('Please log in to access this page.', 'error')
+                return _redirect(_url_for('login', next=request.path))
             
-            if not has_permission(current_user, permission):
+            if not _check(permission):
                 logger.warning(
-                    f"Permission denied: User {current_user.username} "
-                    f"(role: {current_user.role}) tried to access {permission}"
+                    f"Permission denied: User {_cu.username} "
+                    f"(role: {_cu.role}) tried to access {permission}"
                 )
-                flash(f'Access denied. Required permission: {permission}', 'error')
-                return redirect(url_for('index'))
+                abort(403)
             
             return f(*args, **kwargs)
         return decorated_function
@@ -166,10 +154,11 @@ def permission_required(permission: str):
 def viewer_required(f):
     """Require at least viewer role (all authenticated users)"""
     @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated:
-            flash('Please log in to access this page.', 'error')
-            return redirect(url_for('login'))
+    def decorated_function(*args, _cu=current_user, _flash=flash, _redirect=redirect,
+                           _url_for=url_for, **kwargs):
+        if not _cu.is_authenticated:
+            _flash('Please log in to access this page.', 'error')
+            return _redirect(_url_for('login', next=request.path))
         return f(*args, **kwargs)
     return decorated_function
 
@@ -177,18 +166,18 @@ def viewer_required(f):
 def editor_required(f):
     """Require editor or admin role"""
     @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated:
-            flash('Please log in to access this page.', 'error')
-            return redirect(url_for('login'))
+    def decorated_function(*args, _cu=current_user, _check=_cached_has_permission,
+                           _flash=flash, _redirect=redirect, _url_for=url_for, **kwargs):
+        if not _cu.is_authenticated:
+            _flash('Please log in to access this page.', 'error')
+            return _redirect(_url_for('login', next=request.path))
         
-        if current_user.role not in ['editor', 'admin']:
+        if not _check('can_edit'):
             logger.warning(
-                f"Access denied: User {current_user.username} "
-                f"(role: {current_user.role}) tried to access editor function"
+                f"Access denied: User {_cu.username} "
+                f"(role: {_cu.role}) tried to access editor function"
             )
-            flash('Access denied. Editor or Admin role required.', 'error')
-            return redirect(url_for('index'))
+            abort(403)
         
         return f(*args, **kwargs)
     return decorated_function
@@ -197,18 +186,18 @@ def editor_required(f):
 def admin_required(f):
     """Require admin role"""
     @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated:
-            flash('Please log in to access this page.', 'error')
-            return redirect(url_for('login'))
+    def decorated_function(*args, _cu=current_user, _check=_cached_has_permission,
+                           _flash=flash, _redirect=redirect, _url_for=url_for, **kwargs):
+        if not _cu.is_authenticated:
+            _flash('Please log in to access this page.', 'error')
+            return _redirect(_url_for('login', next=request.path))
         
-        if current_user.role != 'admin':
+        if not _check('can_admin'):
             logger.warning(
-                f"Access denied: User {current_user.username} "
-                f"(role: {current_user.role}) tried to access admin function"
+                f"Access denied: User {_cu.username} "
+                f"(role: {_cu.role}) tried to access admin function"
             )
-            flash('Access denied. Admin privileges required.', 'error')
-            return redirect(url_for('index'))
+            abort(403)
         
         return f(*args, **kwargs)
     return decorated_function
@@ -221,21 +210,21 @@ def owns_resource(user_id: int, resource_user_id: int) -> bool:
     return user_id == resource_user_id
 
 
-def can_access_resource(user, resource_user_id: int) -> bool:
-    """Check if user can access a resource (owner or admin)"""
-    if not user or not user.is_authenticated:
-        return False
-    
-    # Admin can access all resources
-    if user.role == 'admin':
-        return True
+def can_access_resource(user, resource_user_id: int, _admins=frozenset(('admin',))) -> bool:
+    """Check if user can access a resource (owner or admin)
     
-    # User can access their own resources
-    return user.id == resource_user_id
+    Called per item in listings; pass current_user._get_current_object() from
+    outside the loop so the proxy is resolved once.
+    """
+    # Admin roles can access all resources; everyone else only their own
+    return bool(user) and user.is_authenticated and (
+        user.role in _admins or user.id == resource_user_id
+    )
 
 
 # ==================== HELPER FUNCTIONS ====================
 
+@lru_cache(maxsize=4096)
 def get_user_storage_path(user_id: int, username: str) -> str:
     """
     Get storage path for user's content
@@ -245,6 +234,8 @@ def get_user_storage_path(user_id: int, username: str) -> str:
     - Isolation between users
     - Easy identification
     - Consistent structure
+    
+    Cached per (user_id, username); the album/video/temp paths only append a leaf.
     """
     return f"users/{user_id}_{username}"
 
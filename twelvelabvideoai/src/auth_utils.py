@@ -4,16 +4,89 @@ Authentication Utilities for Data Guardian
 Provides user authentication, password hashing, and session management
 """
 
+import atexit
 import bcrypt
 import logging
+import oracledb
+import os
+import queue
+import threading
+import time
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
 from flask_login import UserMixin
-from utils.db_utils_vector import get_db_connection
+from utils.db_utils_vector import pooled_connection
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import VerificationError, InvalidHashError
+except ImportError:
+    PasswordHasher = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# New hashes use Argon2id when argon2-cffi is installed; existing bcrypt
+# hashes still verify and are upgraded on the next successful login.
+_argon2 = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1) if PasswordHasher else None
+
+# bcrypt and argon2-cffi release the GIL while hashing, so request threads
+# already hash in parallel; cap how many do so at once so a login storm
+# cannot take every core. Waiters give up after PASSWORD_HASH_WAIT_SECONDS.
+PASSWORD_HASH_CONCURRENCY = int(os.getenv('PASSWORD_HASH_CONCURRENCY', str(os.cpu_count() or 2)))
+PASSWORD_HASH_WAIT_SECONDS = float(os.getenv('PASSWORD_HASH_WAIT_SECONDS', '2'))
+_hash_slots = threading.BoundedSemaphore(PASSWORD_HASH_CONCURRENCY)
+
+
+class PasswordHashBusy(Exception):
+    """No hash slot became free within PASSWORD_HASH_WAIT_SECONDS"""
+
+# Flask-Login reloads the user on every request; keep loaded users briefly
+# as (User, expiry_ts) so bursts of requests share one lookup.
+USER_CACHE_TTL_SECONDS = int(os.getenv('USER_CACHE_TTL_SECONDS', '30'))
+USER_CACHE_MAX = int(os.getenv('USER_CACHE_MAX', '2048'))
+_user_cache = {}
+_user_cache_lock = threading.Lock()
+
+# Login attempts are written behind by a background thread in batches of up
+# to LOGIN_ATTEMPTS_BATCH rows, waiting at most LOGIN_ATTEMPTS_FLUSH_SECONDS.
+LOGIN_ATTEMPTS_BATCH = int(os.getenv('LOGIN_ATTEMPTS_BATCH', '100'))
+LOGIN_ATTEMPTS_FLUSH_SECONDS = float(os.getenv('LOGIN_ATTEMPTS_FLUSH_SECONDS', '1'))
+_login_attempts_queue = queue.Queue()
+_login_attempts_writer = None
+_login_attempts_lock = threading.Lock()
+
+# SQL kept as module constants so every call sends identical text and hits
+# the pooled connection's statement cache
+_SQL_SELECT_USER = "SELECT id, username, email, role, is_active, password_hash, created_at, last_login FROM users"
+_SQL_GET_USER_BY_ID = _SQL_SELECT_USER + " WHERE id = :user_id"
+_SQL_GET_USER_BY_USERNAME = _SQL_SELECT_USER + " WHERE username = :username"
+_SQL_RECORD_LOGIN = """
+    BEGIN
+        UPDATE users
+        SET last_login = CURRENT_TIMESTAMP
+        WHERE id = :user_id;
+        
+        INSERT INTO login_attempts (username, ip_address, success)
+        VALUES (:username, :ip_address, 1);
+        
+        COMMIT;
+    END;
+"""
+_SQL_INSERT_LOGIN_ATTEMPT = "INSERT INTO login_attempts (username, ip_address, success) VALUES (:1, :2, :3)"
+_SQL_COUNT_FAILED_ATTEMPTS = """
+    SELECT COUNT(*)
+    FROM login_attempts
+    WHERE username = :username
+      AND success = 0
+      AND attempt_time > CURRENT_TIMESTAMP - NUMTODSINTERVAL(:minutes, 'MINUTE')
+"""
+_SQL_INSERT_USER = """
+    INSERT INTO users (username, password_hash, email, role, is_active)
+    VALUES (:username, :password_hash, :email, :role, 1)
+"""
+_SQL_UPDATE_PASSWORD = "UPDATE users SET password_hash = :password_hash WHERE id = :user_id"
+
 
 class User(UserMixin):
     """User class for Flask-Login"""
@@ -56,49 +129,113 @@ class User(UserMixin):
         }
 
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+def hash_password(password: Union[str, bytes]) -> str:
+    """Hash a password (str or UTF-8 bytes) using Argon2id (bcrypt if argon2-cffi is unavailable)"""
+    if isinstance(password, str):
+        password = password.encode('utf-8')
+    # Hashing is rare (signup, password change, rehash); wait for a slot rather than fail
+    with _hash_slots:
+        if _argon2:
+            return _argon2.hash(password)
+        return bcrypt.hashpw(password, bcrypt.gensalt()).decode('utf-8')
 
 
 def verify_password(password: str, password_hash: str) -> bool:
-    """Verify a password against its hash"""
+    """Verify a password against its hash (Argon2 or legacy bcrypt)"""
+    return verify_password_bytes(password.encode('utf-8'), password_hash)
+
+
+def verify_password_bytes(password_bytes: bytes, password_hash: str) -> bool:
+    """verify_password for a password already encoded as UTF-8
+    
+    Raises:
+        PasswordHashBusy: Too many concurrent hash operations; the password
+            was not checked
+    """
+    # Dispatch on the hash prefix; anything unrecognised is rejected up front
+    if not password_hash:
+        return False
+    if password_hash.startswith('$argon2'):
+        if not _argon2:
+            logger.error("Argon2 hash found but argon2-cffi is not installed")
+            return False
+        if not _hash_slots.acquire(timeout=PASSWORD_HASH_WAIT_SECONDS):
+            raise PasswordHashBusy("too many concurrent hash operations")
+        try:
+            return _argon2.verify(password_hash, password_bytes)
+        except (VerificationError, InvalidHashError):
+            # argon2-cffi reports a mismatch by raising
+            return False
+        finally:
+            _hash_slots.release()
+    if not password_hash.startswith('$2'):
+        logger.error("Password verification error: unrecognised hash format")
+        return False
+    if not _hash_slots.acquire(timeout=PASSWORD_HASH_WAIT_SECONDS):
+        raise PasswordHashBusy("too many concurrent hash operations")
     try:
-        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
-    except Exception as e:
+        return bcrypt.checkpw(password_bytes, password_hash.encode('utf-8'))
+    except ValueError as e:
+        # Corrupt bcrypt hash (bad salt/length)
         logger.error(f"Password verification error: {e}")
         return False
+    finally:
+        _hash_slots.release()
+
+
+def password_needs_rehash(password_hash: str) -> bool:
+    """True if the hash is bcrypt or uses outdated Argon2 parameters"""
+    if not _argon2:
+        return False
+    if not password_hash.startswith('$argon2'):
+        return True
+    try:
+        return _argon2.check_needs_rehash(password_hash)
+    except Exception:
+        return False
+
+
+def invalidate_user(user_id: int = None):
+    """Drop a cached user (or every cached user when user_id is None)"""
+    with _user_cache_lock:
+        if user_id is None:
+            _user_cache.clear()
+        else:
+            _user_cache.pop(user_id, None)
+
+
+def _user_from_row(id, username, email, role, is_active, password_hash, created_at, last_login) -> User:
+    """Cursor rowfactory building a User straight from a users row"""
+    return User(id, username, email, role, bool(is_active), password_hash, created_at, last_login)
+
+
+def _fetch_user(cursor, sql: str, params: Dict[str, Any]) -> Optional[User]:
+    """Run a single-row users query and return it as a User (or None)"""
+    # Exactly one row is expected: fetch it (and detect end-of-data) in the execute round trip
+    cursor.prefetchrows = 2
+    cursor.arraysize = 1
+    cursor.execute(sql, params)
+    cursor.rowfactory = _user_from_row
+    return cursor.fetchone()
 
 
 def get_user_by_id(user_id: int) -> Optional[User]:
-    """Load user by ID"""
+    """Load user by ID (cached for USER_CACHE_TTL_SECONDS)"""
+    cached = _user_cache.get(user_id)
+    if cached and cached[1] > time.time():
+        return cached[0]
+    
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
+        with pooled_connection() as connection:
+            user = _fetch_user(connection.cursor(), _SQL_GET_USER_BY_ID, {"user_id": user_id})
         
-        cursor.execute("""
-            SELECT id, username, email, role, is_active, password_hash, created_at, last_login
-            FROM users
-            WHERE id = :user_id
-        """, {"user_id": user_id})
+        if user:
+            with _user_cache_lock:
+                if len(_user_cache) >= USER_CACHE_MAX:
+                    _user_cache.clear()
+                _user_cache[user_id] = (user, time.time() + USER_CACHE_TTL_SECONDS)
         
-        row = cursor.fetchone()
-        cursor.close()
-        connection.close()
-        
-        if row:
-            return User(
-                id=row[0],
-                username=row[1],
-                email=row[2],
-                role=row[3],
-                is_active=bool(row[4]),
-                password_hash=row[5],
-                created_at=row[6],
-                last_login=row[7]
-            )
-        
-        return None
+        return user
         
     except Exception as e:
         logger.error(f"Error loading user by ID: {e}")
@@ -108,32 +245,8 @@ def get_user_by_id(user_id: int) -> Optional[User]:
 def get_user_by_username(username: str) -> Optional[User]:
     """Load user by username"""
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        cursor.execute("""
-            SELECT id, username, email, role, is_active, password_hash, created_at, last_login
-            FROM users
-            WHERE username = :username
-        """, {"username": username})
-        
-        row = cursor.fetchone()
-        cursor.close()
-        connection.close()
-        
-        if row:
-            return User(
-                id=row[0],
-                username=row[1],
-                email=row[2],
-                role=row[3],
-                is_active=bool(row[4]),
-                password_hash=row[5],
-                created_at=row[6],
-                last_login=row[7]
-            )
-        
-        return None
+        with pooled_connection() as connection:
+            return _fetch_user(connection.cursor(), _SQL_GET_USER_BY_USERNAME, {"username": username})
         
     except Exception as e:
         logger.error(f"Error loading user by username: {e}")
@@ -141,62 +254,55 @@ def get_user_by_username(username: str) -> Optional[User]:
 
 
 def authenticate_user(username: str, password: str, ip_address: str = None) -> Optional[User]:
-    """Authenticate a user with username and password"""
+    """Authenticate a user with username and password
+    
+    Raises:
+        PasswordHashBusy: The password could not be checked under load; this
+            is not recorded as a failed login attempt
+    """
+    # Encode once; reused for verification and any rehash below
+    password_bytes = password.encode('utf-8')
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
         # Get user with password hash
-        cursor.execute("""
-            SELECT id, username, email, role, is_active, password_hash, created_at, last_login
-            FROM users
-            WHERE username = :username
-        """, {"username": username})
-        
-        row = cursor.fetchone()
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(_SQL_GET_USER_BY_USERNAME, {"username": username})
+            row = cursor.fetchone()
         
         if not row:
             # Log failed attempt (user not found)
             log_login_attempt(username, False, ip_address)
-            cursor.close()
-            connection.close()
             return None
         
         user_id, username, email, role, is_active, password_hash, created_at, last_login = row
         
-        # Verify password
-        if not verify_password(password, password_hash):
+        # Verify password with no connection held: waiting for a hash slot and
+        # hashing would otherwise pin pooled connections during a login storm
+        if not verify_password_bytes(password_bytes, password_hash):
             # Log failed attempt (wrong password)
             log_login_attempt(username, False, ip_address)
-            cursor.close()
-            connection.close()
             return None
         
         # Check if account is active
         if not is_active:
             logger.warning(f"Login attempt for disabled account: {username}")
             log_login_attempt(username, False, ip_address)
-            cursor.close()
-            connection.close()
             return None
         
-        # Update last login time
-        cursor.execute("""
-            UPDATE users
-            SET last_login = CURRENT_TIMESTAMP
-            WHERE id = :user_id
-        """, {"user_id": user_id})
-        
-        connection.commit()
-        
-        # Log successful attempt
-        log_login_attempt(username, True, ip_address)
-        
-        cursor.close()
-        connection.close()
+        # Update last login time and log the successful attempt in one round trip
+        with pooled_connection() as connection:
+            connection.cursor().execute(
+                _SQL_RECORD_LOGIN, {"user_id": user_id, "username": username, "ip_address": ip_address}
+            )
+        invalidate_user(user_id)
         
         logger.info(f"✅ User authenticated: {username} (role: {role})")
         
+        # Upgrade legacy bcrypt hashes now that we have the plain password
+        if password_needs_rehash(password_hash):
+            if update_user_password(user_id, password_bytes):
+                logger.info(f"🔐 Rehashed password for {username} with Argon2")
+        
         return User(
             id=user_id,
             username=username,
@@ -208,51 +314,84 @@ def authenticate_user(username: str, password: str, ip_address: str = None) -> O
             last_login=last_login
         )
         
+    except PasswordHashBusy:
+        logger.warning(f"Login for {username} not checked: too many concurrent hash operations")
+        raise
     except Exception as e:
         logger.error(f"Authentication error: {e}")
         return None
 
 
-def log_login_attempt(username: str, success: bool, ip_address: str = None):
-    """Log a login attempt to the audit table"""
+def _write_login_attempts(rows):
+    """Insert queued login attempts with one executemany and one commit"""
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        cursor.execute("""
-            INSERT INTO login_attempts (username, ip_address, success)
-            VALUES (:username, :ip_address, :success)
-        """, {
-            "username": username,
-            "ip_address": ip_address,
-            "success": 1 if success else 0
-        })
-        
-        connection.commit()
-        cursor.close()
-        connection.close()
-        
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.executemany(_SQL_INSERT_LOGIN_ATTEMPT, rows)
+            connection.commit()
     except Exception as e:
-        logger.error(f"Error logging login attempt: {e}")
+        logger.error(f"Error logging {len(rows)} login attempts: {e}")
+
+
+def _drain_login_attempts(block: bool):
+    """Take up to LOGIN_ATTEMPTS_BATCH queued rows (waiting briefly if block)"""
+    rows = []
+    deadline = time.time() + LOGIN_ATTEMPTS_FLUSH_SECONDS
+    while len(rows) < LOGIN_ATTEMPTS_BATCH:
+        try:
+            if block and not rows:
+                rows.append(_login_attempts_queue.get())
+                # The flush window starts with the first row, not before an idle wait
+                deadline = time.time() + LOGIN_ATTEMPTS_FLUSH_SECONDS
+            elif block:
+                rows.append(_login_attempts_queue.get(timeout=max(0, deadline - time.time())))
+            else:
+                rows.append(_login_attempts_queue.get_nowait())
+        except queue.Empty:
+            break
+    return rows
+
+
+def _login_attempts_loop():
+    while True:
+        rows = _drain_login_attempts(block=True)
+        if rows:
+            _write_login_attempts(rows)
+
+
+def flush_login_attempts():
+    """Synchronously write any queued login attempts"""
+    rows = _drain_login_attempts(block=False)
+    while rows:
+        _write_login_attempts(rows)
+        rows = _drain_login_attempts(block=False)
+
+
+def log_login_attempt(username: str, success: bool, ip_address: str = None):
+    """Queue a login attempt for the audit table (written in the background)"""
+    global _login_attempts_writer
+    if _login_attempts_writer is None:
+        with _login_attempts_lock:
+            if _login_attempts_writer is None:
+                _login_attempts_writer = threading.Thread(
+                    target=_login_attempts_loop, name='login_attempts_writer', daemon=True
+                )
+                _login_attempts_writer.start()
+                atexit.register(flush_login_attempts)
+    _login_attempts_queue.put((username, ip_address, 1 if success else 0))
 
 
 def get_recent_failed_attempts(username: str, minutes: int = 30) -> int:
     """Get count of recent failed login attempts"""
+    # Make this process's queued attempts visible to the count
+    flush_login_attempts()
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM login_attempts
-            WHERE username = :username
-              AND success = 0
-              AND attempt_time > CURRENT_TIMESTAMP - INTERVAL '{minutes}' MINUTE
-        """.format(minutes=minutes), {"username": username})
-        
-        count = cursor.fetchone()[0]
-        cursor.close()
-        connection.close()
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            
+            cursor.execute(_SQL_COUNT_FAILED_ATTEMPTS, {"username": username, "minutes": minutes})
+            
+            count = cursor.fetchone()[0]
         
         return count
         
@@ -264,33 +403,28 @@ def get_recent_failed_attempts(username: str, minutes: int = 30) -> int:
 def create_user(username: str, password: str, email: str = None, role: str = 'viewer') -> bool:
     """Create a new user (admin function)"""
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        # Check if username already exists
-        cursor.execute("SELECT COUNT(*) FROM users WHERE username = :username", {"username": username})
-        if cursor.fetchone()[0] > 0:
-            logger.warning(f"Username already exists: {username}")
-            cursor.close()
-            connection.close()
-            return False
-        
-        # Hash password and insert
+        # Hash password before taking a pooled connection
         password_hash = hash_password(password)
         
-        cursor.execute("""
-            INSERT INTO users (username, password_hash, email, role, is_active)
-            VALUES (:username, :password_hash, :email, :role, 1)
-        """, {
-            "username": username,
-            "password_hash": password_hash,
-            "email": email,
-            "role": role
-        })
-        
-        connection.commit()
-        cursor.close()
-        connection.close()
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            
+            # The UNIQUE constraint on users.username rejects duplicates in the
+            # same round trip (no check-then-insert race)
+            try:
+                cursor.execute(_SQL_INSERT_USER, {
+                    "username": username,
+                    "password_hash": password_hash,
+                    "email": email,
+                    "role": role
+                })
+            except oracledb.IntegrityError as e:
+                if 'ORA-00001' in str(e):
+                    logger.warning(f"Username already exists: {username}")
+                    return False
+                raise
+            
+            connection.commit()
         
         logger.info(f"✅ User created: {username} (role: {role})")
         return True
@@ -300,41 +434,32 @@ def create_user(username: str, password: str, email: str = None, role: str = 'vi
         return False
 
 
-def update_user_password(user_id: int, new_password: str) -> bool:
+def update_user_password(user_id: int, new_password: Union[str, bytes]) -> bool:
     """
     Update user's password
     
     Args:
         user_id: User ID
-        new_password: New plain text password
+        new_password: New plain text password (str or UTF-8 bytes)
         
     Returns:
         bool: True if password updated successfully
     """
     try:
-        connection = get_db_connection()
-        if not connection:
-            logger.error("Failed to connect to database")
-            return False
-        
-        cursor = connection.cursor()
-        
-        # Hash the new password
+        # Hash the new password before taking a pooled connection
         password_hash = hash_password(new_password)
         
-        # Update password
-        cursor.execute("""
-            UPDATE users 
-            SET password_hash = :password_hash
-            WHERE id = :user_id
-        """, {
-            "password_hash": password_hash,
-            "user_id": user_id
-        })
-        
-        connection.commit()
-        cursor.close()
-        connection.close()
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            
+            # Update password
+            cursor.execute(_SQL_UPDATE_PASSWORD, {
+                "password_hash": password_hash,
+                "user_id": user_id
+            })
+            
+            connection.commit()
+        invalidate_user(user_id)
         
         logger.info(f"✅ Password updated for user ID: {user_id}")
         return True
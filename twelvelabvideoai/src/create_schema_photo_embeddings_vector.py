@@ -4,19 +4,53 @@
 This script creates the photo_embeddings table with Oracle VECTOR type
 for improved search performance and native vector operations.
 """
+import argparse
+import oracledb
 import os
 import sys
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from utils.db_utils_vector import get_db_connection, validate_db_config
+from utils.db_utils_vector import get_db_connection, validate_db_config, PHOTO_VECTOR_FORMAT
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def create_photo_embeddings_table_vector():
-    """Create photo_embeddings table with Oracle VECTOR type"""
+# Hash-partition photo_embeddings by album_name into this many partitions
+# (0 = unpartitioned). Album-scoped searches then prune to one partition and
+# the vector index is built LOCAL, one partition at a time.
+PHOTO_EMBEDDINGS_PARTITIONS = int(os.getenv('PHOTO_EMBEDDINGS_PARTITIONS', '0'))
+
+# Columns added in place when missing from an existing table (name -> definition)
+_PHOTO_EMBEDDINGS_COLUMNS = {
+    'CREATED_AT': 'created_at TIMESTAMP DEFAULT SYSTIMESTAMP',
+    'UPDATED_AT': 'updated_at TIMESTAMP DEFAULT SYSTIMESTAMP',
+}
+
+
+def _photo_embeddings_indexes():
+    """(index name, DDL) for every secondary index on photo_embeddings"""
+    # album_name lookups use the uk_photo_embeddings (album_name, photo_file)
+    # index, so there is no separate album index, and nothing pages
+    # photo_embeddings by created_at.
+    return [
+        # Reference-photo lookup by file in get_similar_photos (no album given)
+        ('IDX_PHOTO_EMBEDDINGS_FILE',
+         "CREATE INDEX idx_photo_embeddings_file ON photo_embeddings(photo_file)"),
+        # Vector index for similarity search optimization (per partition when partitioned)
+        ('IDX_PHOTO_EMBEDDINGS_VECTOR',
+         "CREATE VECTOR INDEX idx_photo_embeddings_vector ON photo_embeddings(embedding_vector) "
+         "ORGANIZATION NEIGHBOR PARTITIONS DISTANCE COSINE WITH TARGET ACCURACY 95"
+         + (" LOCAL" if PHOTO_EMBEDDINGS_PARTITIONS > 0 else "")),
+    ]
+
+
+def create_photo_embeddings_table_vector(force: bool = False):
+    """Create photo_embeddings table with Oracle VECTOR type
+    
+    Idempotent: an existing table keeps its rows and vector index; only missing
+    columns and indexes are added. force=True drops and recreates the table.
+    """
     
     # Validate configuration first
     try:
@@ -29,58 +63,90 @@ def create_photo_embeddings_table_vector():
         connection = get_db_connection()
         cursor = connection.cursor()
         
-        # Drop existing table if it exists
-        try:
-            cursor.execute("DROP TABLE photo_embeddings")
-            logger.info("Dropped existing photo_embeddings table")
-        except Exception:
-            pass  # Table doesn't exist
+        if force:
+            # Drop existing table if it exists
+            try:
+                cursor.execute("DROP TABLE photo_embeddings")
+                logger.info("Dropped existing photo_embeddings table")
+            except Exception:
+                pass  # Table doesn't exist
+        
+        cursor.execute("SELECT COUNT(*) FROM user_tables WHERE table_name = 'PHOTO_EMBEDDINGS'")
+        table_exists = cursor.fetchone()[0] > 0
         
         # Create table with Oracle VECTOR type
-        # Using VECTOR(1024, FLOAT32) for TwelveLabs Marengo embeddings
-        create_table_sql = """
-        CREATE TABLE photo_embeddings (
-            id NUMBER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
-            album_name VARCHAR2(500) NOT NULL,
-            photo_file VARCHAR2(2000) NOT NULL,
-            embedding_vector VECTOR(1024, FLOAT32),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            CONSTRAINT uk_photo_embeddings UNIQUE (album_name, photo_file)
-        )
-        """
-        
-        cursor.execute(create_table_sql)
-        logger.info("Created photo_embeddings table with VECTOR type")
-        
-        # Create indexes for better performance
-        indexes = [
-            "CREATE INDEX idx_photo_embeddings_album ON photo_embeddings(album_name)",
-            "CREATE INDEX idx_photo_embeddings_file ON photo_embeddings(photo_file)",
-            "CREATE INDEX idx_photo_embeddings_created ON photo_embeddings(created_at)",
-            # Vector index for similarity search optimization
-            "CREATE VECTOR INDEX idx_photo_embeddings_vector ON photo_embeddings(embedding_vector) PARAMETERS('accuracy 0.95')"
-        ]
-        
-        for index_sql in indexes:
+        # Using VECTOR(1024, PHOTO_VECTOR_FORMAT) for TwelveLabs Marengo embeddings.
+        # INT8 stores 1KB instead of 4KB per row, so vector scans and index builds
+        # read a quarter of the bytes; writers quantize via photo_vector_bind()
+        # and searches must use COSINE (the per-vector scale is not stored).
+        if PHOTO_VECTOR_FORMAT not in ('FLOAT32', 'INT8'):
+            raise ValueError(f"Unsupported PHOTO_VECTOR_FORMAT: {PHOTO_VECTOR_FORMAT}")
+        
+        if not table_exists:
+            create_table_sql = f"""
+            CREATE TABLE photo_embeddings (
+                id NUMBER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+                album_name VARCHAR2(500) NOT NULL,
+                photo_file VARCHAR2(2000) NOT NULL,
+                embedding_vector VECTOR(1024, {PHOTO_VECTOR_FORMAT}),
+                created_at TIMESTAMP DEFAULT SYSTIMESTAMP,
+                updated_at TIMESTAMP DEFAULT SYSTIMESTAMP,
+                CONSTRAINT uk_photo_embeddings UNIQUE (album_name, photo_file)
+            )
+            """
+            if PHOTO_EMBEDDINGS_PARTITIONS > 0:
+                create_table_sql += f" PARTITION BY HASH (album_name) PARTITIONS {PHOTO_EMBEDDINGS_PARTITIONS}"
+            
+            cursor.execute(create_table_sql)
+            logger.info("Created photo_embeddings table with VECTOR type")
+        else:
+            logger.info("photo_embeddings already exists; applying missing columns and indexes only")
+            
+            cursor.execute("""
+                SELECT column_name, data_type
+                FROM user_tab_columns
+                WHERE table_name = 'PHOTO_EMBEDDINGS'
+            """)
+            existing_columns = dict(cursor.fetchall())
+            
+            for column_name, column_sql in _PHOTO_EMBEDDINGS_COLUMNS.items():
+                if column_name not in existing_columns:
+                    cursor.execute(f"ALTER TABLE photo_embeddings ADD {column_sql}")
+                    logger.info(f"Added column: {column_name.lower()}")
+            
+            # Tables created before the trigger was retired still carry it
+            try:
+                cursor.execute("DROP TRIGGER trg_photo_embeddings_updated_at")
+                logger.info("Dropped trigger: trg_photo_embeddings_updated_at")
+            except oracledb.DatabaseError as e:
+                error_obj, = e.args
+                if error_obj.code != 4080:  # ORA-04080: trigger does not exist
+                    raise
+            
+            # Changing the vector dimension means rewriting every row and the index
+            cursor.execute("SELECT embedding_vector FROM photo_embeddings WHERE 1 = 0")
+            dimensions = getattr(cursor.description[0], 'vector_dimensions', None)
+            if dimensions and dimensions != 1024:
+                logger.warning(
+                    f"embedding_vector has {dimensions} dimensions, expected 1024; "
+                    "re-run with --force to rebuild the table"
+                )
+        
+        cursor.execute("SELECT index_name FROM user_indexes WHERE table_name = 'PHOTO_EMBEDDINGS'")
+        existing_indexes = {name for (name,) in cursor.fetchall()}
+        
+        for index_name, index_sql in _photo_embeddings_indexes():
+            if index_name in existing_indexes:
+                continue
             try:
                 cursor.execute(index_sql)
-                logger.info(f"Created index: {index_sql.split()[2]}")
+                logger.info(f"Created index: {index_name.lower()}")
             except Exception as e:
                 logger.warning(f"Failed to create index: {e}")
         
-        # Create trigger for updated_at
-        trigger_sql = """
-        CREATE OR REPLACE TRIGGER trg_photo_embeddings_updated_at
-        BEFORE UPDATE ON photo_embeddings
-        FOR EACH ROW
-        BEGIN
-            :NEW.updated_at := CURRENT_TIMESTAMP;
-        END;
-        """
-        
-        cursor.execute(trigger_sql)
-        logger.info("Created update trigger for photo_embeddings")
+        # No BEFORE UPDATE trigger for updated_at: a per-row PL/SQL call slows bulk
+        # re-embeds, so statements that UPDATE photo_embeddings set
+        # updated_at = CURRENT_TIMESTAMP themselves (inserts use the column default).
         
         connection.commit()
         cursor.close()
@@ -135,9 +201,14 @@ def verify_table_structure():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Create or update the photo_embeddings table')
+    parser.add_argument('--force', action='store_true',
+                        help='Drop and recreate the table (deletes all photo embeddings)')
+    args = parser.parse_args()
+    
     print("Creating photo embeddings table with Oracle VECTOR support...")
     
-    if create_photo_embeddings_table_vector():
+    if create_photo_embeddings_table_vector(force=args.force):
         print("\n" + "="*60)
         print("✅ SUCCESS: Photo embeddings table created with VECTOR support")
         print("="*60)
@@ -146,10 +217,10 @@ if __name__ == "__main__":
             print("✅ Table structure verified successfully")
         
         print("\nFeatures enabled:")
-        print("• Oracle VECTOR(1024, FLOAT32) for embeddings")
+        print(f"• Oracle VECTOR(1024, {PHOTO_VECTOR_FORMAT}) for embeddings")
         print("• Vector similarity search with VECTOR_DISTANCE()")
         print("• Vector indexes for performance optimization")
-        print("• Automatic timestamps and triggers")
+        print("• Automatic timestamps (column defaults)")
         print("• Optimized indexes for common queries")
         print("• Unique constraint on album_name + photo_file")
         
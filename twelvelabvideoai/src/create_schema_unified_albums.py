@@ -4,19 +4,126 @@
 This script creates a unified album_media table that stores both photos and videos
 in the same album structure with Oracle VECTOR type for improved search performance.
 """
+import math
 import os
 import sys
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from utils.db_utils_vector import get_db_connection, validate_db_config
+from utils.db_utils_vector import (
+    pooled_connection, validate_db_config, recreate_table_plsql, execute_ddl_ignore_errors,
+    ALBUM_VECTORS_INT8, ALBUM_VECTORS_NORMALIZED
+)
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Degree of parallelism for index builds after the bulk load
+INDEX_BUILD_PARALLEL = int(os.getenv('INDEX_BUILD_PARALLEL', '8'))
+
+# Degree of parallelism for the photo/video -> album_media migration insert
+MIGRATION_PARALLEL = int(os.getenv('MIGRATION_PARALLEL', '8'))
+
+# Hash-partition album_media by album_name into this many partitions
+# (0 = unpartitioned). Per-album queries then prune to one partition and the
+# vector index is built LOCAL, one smaller index per partition.
+ALBUM_MEDIA_PARTITIONS = int(os.getenv('ALBUM_MEDIA_PARTITIONS', '0'))
+
+# Table compression clause for album_media ('' to disable). Album, file name,
+# path and type repeat heavily within an album; ADVANCED compresses both the
+# direct-path migration and conventional inserts. VECTOR columns are unaffected.
+ALBUM_MEDIA_COMPRESSION = os.getenv('ALBUM_MEDIA_COMPRESSION', 'ROW STORE COMPRESS ADVANCED')
+
+# album_media DDL. Using VECTOR(1024, FLOAT32) for TwelveLabs Marengo
+# embeddings; with ALBUM_VECTORS_INT8 an INT8 copy is searched and FP32 used
+# to re-rank.
+_INT8_COLUMN = "embedding_int8 VECTOR(1024, INT8)," if ALBUM_VECTORS_INT8 else ""
+CREATE_TABLE_SQL = f"""
+    CREATE TABLE album_media (
+        id NUMBER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+        album_name VARCHAR2(500) NOT NULL,
+        file_name VARCHAR2(2000) NOT NULL,
+        file_path VARCHAR2(4000) NOT NULL,
+        file_type VARCHAR2(50) NOT NULL CHECK (file_type IN ('photo', 'video')),
+        mime_type VARCHAR2(100),
+        file_size NUMBER,
+    
+        -- Video-specific fields (NULL for photos)
+        start_time NUMBER(10,2),
+        end_time NUMBER(10,2),
+        duration NUMBER(10,2),
+    
+        -- Photo-specific fields (NULL for videos) 
+        width NUMBER,
+        height NUMBER,
+    
+        -- Common metadata
+        embedding_model VARCHAR2(100) DEFAULT 'Marengo-retrieval-2.7',
+    
+        -- Object storage details
+        oci_namespace VARCHAR2(200),
+        oci_bucket VARCHAR2(200),
+        oci_object_path VARCHAR2(4000),
+    
+        -- Timestamps
+        created_at TIMESTAMP DEFAULT SYSTIMESTAMP,
+        updated_at TIMESTAMP DEFAULT SYSTIMESTAMP,
+    
+        -- Embeddings last, so metadata-only scans stop before the 4 KB
+        -- vector. Nullable: store_media_metadata() inserts rows first
+        -- and the embedding is filled in afterwards.
+        embedding_vector VECTOR(1024, FLOAT32),
+        {_INT8_COLUMN}
+    
+        -- Constraints
+        CONSTRAINT uk_album_media UNIQUE (album_name, file_name, file_type),
+        CONSTRAINT chk_video_fields CHECK (
+            (file_type = 'video' AND start_time IS NOT NULL AND end_time IS NOT NULL) OR
+            (file_type = 'photo' AND start_time IS NULL AND end_time IS NULL)
+        )
+    )
+    """
+if ALBUM_MEDIA_COMPRESSION:
+    CREATE_TABLE_SQL += f" {ALBUM_MEDIA_COMPRESSION}"
+if ALBUM_MEDIA_PARTITIONS > 0:
+    CREATE_TABLE_SQL += f" PARTITION BY HASH (album_name) PARTITIONS {ALBUM_MEDIA_PARTITIONS}"
+
+# Drop (if present) and create album_media in one round trip
+RECREATE_TABLE_PLSQL = recreate_table_plsql("album_media", CREATE_TABLE_SQL)
+
+# B-tree indexes on album_media (built after migration, see create_unified_album_indexes).
+# album_name-only lookups use the leading column of idx_album_media_album_type.
+ALBUM_MEDIA_INDEXES = [
+    ("idx_album_media_type", "CREATE INDEX idx_album_media_type ON album_media (file_type)"),
+    ("idx_album_media_album_type", "CREATE INDEX idx_album_media_album_type ON album_media (album_name, file_type)"),
+    ("idx_album_media_created", "CREATE INDEX idx_album_media_created ON album_media (created_at)"),
+]
+
+# Vector index; {parameters} sizes the IVF partitions to the loaded table.
+# With ALBUM_VECTORS_NORMALIZED the rows are unit-length, so DOT ranks like
+# COSINE without the two norms per comparison (and matches the queries).
+VECTOR_INDEX_SQL = f"""
+CREATE VECTOR INDEX idx_album_media_vector
+ON album_media (embedding_vector)
+ORGANIZATION NEIGHBOR PARTITIONS
+DISTANCE {"DOT" if ALBUM_VECTORS_NORMALIZED else "COSINE"}
+WITH TARGET ACCURACY 95
+{{parameters}}
+{"LOCAL" if ALBUM_MEDIA_PARTITIONS > 0 else ""}
+PARALLEL {INDEX_BUILD_PARALLEL}
+"""
+
+
 def create_unified_album_table():
-    """Create unified album_media table with Oracle VECTOR type for both photos and videos"""
+    """Create unified album_media table and its indexes (no data migration)"""
+    return create_unified_album_table_only() and create_unified_album_indexes()
+
+def create_unified_album_table_only():
+    """Create unified album_media table with Oracle VECTOR type for both photos and videos
+    
+    Indexes are left to create_unified_album_indexes() so a following bulk
+    migration does not maintain them row by row.
+    """
     
     # Validate configuration first
     try:
@@ -26,166 +133,148 @@ def create_unified_album_table():
         return False
     
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        # Drop existing table if it exists
-        try:
-            cursor.execute("DROP TABLE album_media")
-            logger.info("Dropped existing album_media table")
-        except Exception:
-            pass  # Table doesn't exist
-        
-        # Create unified table with Oracle VECTOR type
-        # Using VECTOR(1024, FLOAT32) for TwelveLabs Marengo embeddings
-        create_table_sql = """
-        CREATE TABLE album_media (
-            id NUMBER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
-            album_name VARCHAR2(500) NOT NULL,
-            file_name VARCHAR2(2000) NOT NULL,
-            file_path VARCHAR2(4000) NOT NULL,
-            file_type VARCHAR2(50) NOT NULL CHECK (file_type IN ('photo', 'video')),
-            mime_type VARCHAR2(100),
-            file_size NUMBER,
-            
-            -- Video-specific fields (NULL for photos)
-            start_time NUMBER(10,2),
-            end_time NUMBER(10,2),
-            duration NUMBER(10,2),
+        with pooled_connection() as connection, connection.cursor() as cursor:
+            # Drop any existing table and create the unified one with Oracle VECTOR type
+            cursor.execute(RECREATE_TABLE_PLSQL)
+            logger.info("✅ Created album_media table successfully")
             
-            -- Photo-specific fields (NULL for videos) 
-            width NUMBER,
-            height NUMBER,
-            
-            -- Common embedding and metadata
-            embedding_vector VECTOR(1024, FLOAT32),
-            embedding_model VARCHAR2(100) DEFAULT 'Marengo-retrieval-2.7',
-            
-            -- Object storage details
-            oci_namespace VARCHAR2(200),
-            oci_bucket VARCHAR2(200),
-            oci_object_path VARCHAR2(4000),
-            
-            -- Timestamps
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            
-            -- Constraints
-            CONSTRAINT uk_album_media UNIQUE (album_name, file_name, file_type),
-            CONSTRAINT chk_video_fields CHECK (
-                (file_type = 'video' AND start_time IS NOT NULL AND end_time IS NOT NULL) OR
-                (file_type = 'photo' AND start_time IS NULL AND end_time IS NULL)
-            )
-        )
-        """
+            # No BEFORE UPDATE trigger for updated_at: statements that UPDATE
+            # album_media set updated_at = CURRENT_TIMESTAMP themselves (as
+            # UnifiedAlbumManager does), inserts use the column default.
         
-        cursor.execute(create_table_sql)
-        logger.info("✅ Created album_media table successfully")
+            connection.commit()
         
-        # Create indexes for better performance
-        indexes = [
-            "CREATE INDEX idx_album_media_album ON album_media (album_name)",
-            "CREATE INDEX idx_album_media_type ON album_media (file_type)",
-            "CREATE INDEX idx_album_media_album_type ON album_media (album_name, file_type)",
-            "CREATE INDEX idx_album_media_created ON album_media (created_at)"
-        ]
+        logger.info("🎉 Unified album table created successfully!")
+        return True
         
-        for idx_sql in indexes:
-            try:
-                cursor.execute(idx_sql)
-                logger.info(f"✅ Created index: {idx_sql.split()[2]}")
-            except Exception as e:
-                logger.warning(f"⚠️ Index creation warning: {e}")
+    except Exception as e:
+        logger.error(f"❌ Error creating unified album schema: {e}")
+        return False
+
+def create_unified_album_indexes():
+    """Build album_media indexes in one pass over the (already loaded) table
+    
+    B-tree indexes are built NOLOGGING with INDEX_BUILD_PARALLEL slaves, then
+    switched back to LOGGING NOPARALLEL so normal DML is logged and serial.
+    """
+    try:
+        with pooled_connection() as connection, connection.cursor() as cursor:
+            index_ddl = [
+                sql
+                for idx_name, idx_sql in ALBUM_MEDIA_INDEXES
+                for sql in (f"{idx_sql} NOLOGGING PARALLEL {INDEX_BUILD_PARALLEL}",
+                            f"ALTER INDEX {idx_name} LOGGING NOPARALLEL")
+            ]
+            executed = execute_ddl_ignore_errors(cursor, index_ddl)
+            logger.info(f"✅ Ran {executed} of {len(index_ddl)} B-tree index statements")
         
-        # Create vector index for similarity search
-        try:
-            vector_index_sql = """
-            CREATE VECTOR INDEX idx_album_media_vector 
-            ON album_media (embedding_vector) 
-            ORGANIZATION NEIGHBOR PARTITIONS
-            WITH TARGET ACCURACY 95
-            """
-            cursor.execute(vector_index_sql)
-            logger.info("✅ Created vector index for similarity search")
-        except Exception as e:
-            logger.warning(f"⚠️ Vector index creation warning: {e}")
+            # Create vector index for similarity search. Size the IVF partition
+            # count to ~sqrt(rows) of the loaded table (Oracle's default when empty)
+            # and build it with the same parallelism as the B-tree indexes. A
+            # LOCAL index on a partitioned table is sized per table partition.
+            if ALBUM_VECTORS_NORMALIZED:
+                # Migrated photo/video embeddings are not unit-length
+                from migrate_normalize_album_vectors import normalize_vectors
+                logger.info(f"✅ Normalized {normalize_vectors()} embeddings")
+            
+            cursor.execute("SELECT COUNT(*) FROM album_media")
+            row_count = cursor.fetchone()[0]
+            rows_per_index = row_count / max(1, ALBUM_MEDIA_PARTITIONS)
+            parameters = ""
+            if row_count:
+                parameters = f"PARAMETERS (TYPE IVF, NEIGHBOR PARTITIONS {max(1, round(math.sqrt(rows_per_index)))})"
+            if execute_ddl_ignore_errors(cursor, [VECTOR_INDEX_SQL.format(parameters=parameters)]):
+                logger.info("✅ Created vector index for similarity search")
+        
+            if ALBUM_VECTORS_INT8:
+                # Migrated rows only carry FP32: quantize them before indexing INT8
+                from migrate_add_int8_vectors import backfill_int8, create_int8_index
+                logger.info(f"✅ Backfilled {backfill_int8()} INT8 embeddings")
+                create_int8_index()
         
-        connection.commit()
-        cursor.close()
-        connection.close()
         
-        logger.info("🎉 Unified album database schema created successfully!")
+        logger.info("🎉 Unified album indexes created successfully!")
         return True
         
     except Exception as e:
-        logger.error(f"❌ Error creating unified album schema: {e}")
+        logger.error(f"❌ Error creating unified album indexes: {e}")
         return False
 
 def migrate_existing_data():
     """Migrate existing photo and video data to unified schema"""
     
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
+        with pooled_connection() as connection, connection.cursor() as cursor:
+            logger.info("📦 Starting data migration...")
         
-        logger.info("📦 Starting data migration...")
+            # album_media is freshly created and empty: load it direct-path
+            # (APPEND) with minimal redo, then restore logging once loaded
+            cursor.execute("ALTER TABLE album_media NOLOGGING")
+            # Without PDML the insert side runs serially whatever the hints say
+            cursor.execute("ALTER SESSION ENABLE PARALLEL DML")
         
-        # Migrate photo embeddings
-        try:
-            migrate_photos_sql = """
-            INSERT INTO album_media (
-                album_name, file_name, file_path, file_type, mime_type,
-                embedding_vector, embedding_model, created_at, updated_at
-            )
-            SELECT 
-                album_name,
-                REGEXP_SUBSTR(photo_file, '[^/]+$') as file_name,
-                photo_file as file_path,
-                'photo' as file_type,
-                'image/jpeg' as mime_type,
-                embedding_vector,
-                'Marengo-retrieval-2.7' as embedding_model,
-                created_at,
-                updated_at
-            FROM photo_embeddings
-            """
-            cursor.execute(migrate_photos_sql)
-            photo_count = cursor.rowcount
-            logger.info(f"📷 Migrated {photo_count} photos")
-        except Exception as e:
-            logger.warning(f"⚠️ Photo migration warning: {e}")
-        
-        # Migrate video embeddings
-        try:
-            migrate_videos_sql = """
-            INSERT INTO album_media (
-                album_name, file_name, file_path, file_type, mime_type,
-                start_time, end_time, embedding_vector, embedding_model, created_at, updated_at
-            )
-            SELECT 
-                'default' as album_name,
-                REGEXP_SUBSTR(video_file, '[^/]+$') as file_name,
-                video_file as file_path,
-                'video' as file_type,
-                'video/mp4' as mime_type,
-                start_time,
-                end_time,
-                embedding_vector,
-                'Marengo-retrieval-2.7' as embedding_model,
-                created_at,
-                updated_at
-            FROM video_embeddings
-            """
-            cursor.execute(migrate_videos_sql)
-            video_count = cursor.rowcount
-            logger.info(f"🎬 Migrated {video_count} videos")
-        except Exception as e:
-            logger.warning(f"⚠️ Video migration warning: {e}")
+            # Photos and videos go in as one statement: one parse, one direct-path
+            # load and one commit. Photos have no segment times, so those are NULL.
+            # Every segment of a video shares its album/basename, so segment rows
+            # are named <stem>_seg_<start>_<end>.mp4 (as UnifiedAlbumManager names
+            # them) to keep uk_album_media unique.
+            migrated = False
+            try:
+                migrate_sql = f"""
+                INSERT /*+ APPEND PARALLEL(album_media, {MIGRATION_PARALLEL}) */ INTO album_media (
+                    album_name, file_name, file_path, file_type, mime_type,
+                    start_time, end_time, embedding_vector, embedding_model, created_at, updated_at
+                )
+                SELECT /*+ PARALLEL(photo_embeddings, {MIGRATION_PARALLEL}) */
+                    album_name,
+                    SUBSTR(photo_file, INSTR(photo_file, '/', -1) + 1) as file_name,
+                    photo_file as file_path,
+                    'photo' as file_type,
+                    'image/jpeg' as mime_type,
+                    NULL as start_time,
+                    NULL as end_time,
+                    embedding_vector,
+                    'Marengo-retrieval-2.7' as embedding_model,
+                    created_at,
+                    updated_at
+                FROM photo_embeddings
+                UNION ALL
+                SELECT /*+ PARALLEL(video_embeddings, {MIGRATION_PARALLEL}) */
+                    'default' as album_name,
+                    REGEXP_REPLACE(SUBSTR(video_file, INSTR(video_file, '/', -1) + 1), '\\.[^.]*$', '')
+                        || '_seg_' || TO_CHAR(start_time, 'FM9999999990.09')
+                        || '_' || TO_CHAR(end_time, 'FM9999999990.09') || '.mp4' as file_name,
+                    video_file as file_path,
+                    'video' as file_type,
+                    'video/mp4' as mime_type,
+                    start_time,
+                    end_time,
+                    embedding_vector,
+                    'Marengo-retrieval-2.7' as embedding_model,
+                    created_at,
+                    updated_at
+                FROM video_embeddings
+                """
+                cursor.execute(migrate_sql)
+                # A direct-path insert must commit before the table is touched again
+                connection.commit()
+            
+                cursor.execute("SELECT file_type, COUNT(*) FROM album_media GROUP BY file_type")
+                counts = dict(cursor.fetchall())
+                logger.info(f"📷 Migrated {counts.get('photo', 0)} photos")
+                logger.info(f"🎬 Migrated {counts.get('video', 0)} video segments")
+                migrated = True
+            except Exception as e:
+                # The single statement rolls back as a whole: nothing was migrated
+                connection.rollback()
+                logger.error(f"❌ Data migration failed, no rows loaded: {e}")
         
-        connection.commit()
-        cursor.close()
-        connection.close()
+            cursor.execute("ALTER TABLE album_media LOGGING")
+            # The session goes back to the pool; don't leave PDML enabled on it
+            cursor.execute("ALTER SESSION DISABLE PARALLEL DML")
         
+        if not migrated:
+            return False
         logger.info("✅ Data migration completed successfully!")
         return True
         
@@ -196,16 +285,21 @@ def migrate_existing_data():
 if __name__ == "__main__":
     print("🚀 Creating unified album schema...")
     
-    if create_unified_album_table():
+    if create_unified_album_table_only():
         print("✅ Schema creation successful!")
         
-        # Ask user if they want to migrate existing data
+        # Ask user if they want to migrate existing data (before indexes exist)
         migrate = input("🔄 Migrate existing photo/video data? (y/n): ").lower().strip()
         if migrate in ['y', 'yes']:
             if migrate_existing_data():
                 print("✅ Migration completed!")
             else:
                 print("❌ Migration failed!")
+        
+        print("🔧 Building indexes...")
+        if not create_unified_album_indexes():
+            print("❌ Index creation failed!")
+            sys.exit(1)
     else:
         print("❌ Schema creation failed!")
         sys.exit(1)
\ No newline at end of file
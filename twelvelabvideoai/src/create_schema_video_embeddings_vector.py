@@ -4,17 +4,45 @@
 This script creates the video_embeddings table with Oracle VECTOR type
 for improved search performance and native vector operations.
 """
-import os
 import sys
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from utils.db_utils_vector import get_db_connection, validate_db_config
+from utils.db_utils_vector import (
+    get_db_connection, validate_db_config, recreate_table_plsql, execute_ddl_ignore_errors
+)
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Using VECTOR(1024, FLOAT32) for TwelveLabs Marengo embeddings
+CREATE_TABLE_SQL = """
+    CREATE TABLE video_embeddings (
+        id NUMBER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+        video_file VARCHAR2(2000) NOT NULL,
+        start_time NUMBER(10,2) NOT NULL,
+        end_time NUMBER(10,2) NOT NULL,
+        created_at TIMESTAMP DEFAULT SYSTIMESTAMP,
+        updated_at TIMESTAMP DEFAULT SYSTIMESTAMP,
+        -- Last, so metadata-only scans stop before the 4 KB vector; every
+        -- writer stores a segment together with its embedding
+        embedding_vector VECTOR(1024, FLOAT32) NOT NULL
+    )
+    """
+
+# Drop (if present) and create video_embeddings in one round trip
+RECREATE_TABLE_PLSQL = recreate_table_plsql("video_embeddings", CREATE_TABLE_SQL)
+
+INDEX_SQLS = [
+    "CREATE INDEX idx_video_embeddings_file ON video_embeddings(video_file)",
+    "CREATE INDEX idx_video_embeddings_time ON video_embeddings(start_time, end_time)",
+    "CREATE INDEX idx_video_embeddings_created ON video_embeddings(created_at)",
+    # Vector index for similarity search optimization
+    "CREATE VECTOR INDEX idx_video_embeddings_vector ON video_embeddings(embedding_vector) "
+    "ORGANIZATION NEIGHBOR PARTITIONS DISTANCE COSINE WITH TARGET ACCURACY 95 PARALLEL 8",
+]
+
+
 def create_video_embeddings_table_vector():
     """Create video_embeddings table with Oracle VECTOR type"""
     
@@ -29,58 +57,17 @@ def create_video_embeddings_table_vector():
         connection = get_db_connection()
         cursor = connection.cursor()
         
-        # Drop existing table if it exists
-        try:
-            cursor.execute("DROP TABLE video_embeddings")
-            logger.info("Dropped existing video_embeddings table")
-        except Exception:
-            pass  # Table doesn't exist
-        
-        # Create table with Oracle VECTOR type
-        # Using VECTOR(1024, FLOAT32) for TwelveLabs Marengo embeddings
-        create_table_sql = """
-        CREATE TABLE video_embeddings (
-            id NUMBER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
-            video_file VARCHAR2(2000) NOT NULL,
-            start_time NUMBER(10,2) NOT NULL,
-            end_time NUMBER(10,2) NOT NULL,
-            embedding_vector VECTOR(1024, FLOAT32),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """
-        
-        cursor.execute(create_table_sql)
+        # Drop any existing table and create it with Oracle VECTOR type
+        cursor.execute(RECREATE_TABLE_PLSQL)
         logger.info("Created video_embeddings table with VECTOR type")
         
         # Create indexes for better performance
-        indexes = [
-            "CREATE INDEX idx_video_embeddings_file ON video_embeddings(video_file)",
-            "CREATE INDEX idx_video_embeddings_time ON video_embeddings(start_time, end_time)",
-            "CREATE INDEX idx_video_embeddings_created ON video_embeddings(created_at)",
-            # Vector index for similarity search optimization
-            "CREATE VECTOR INDEX idx_video_embeddings_vector ON video_embeddings(embedding_vector) PARAMETERS('accuracy 0.95')"
-        ]
-        
-        for index_sql in indexes:
-            try:
-                cursor.execute(index_sql)
-                logger.info(f"Created index: {index_sql.split()[2]}")
-            except Exception as e:
-                logger.warning(f"Failed to create index: {e}")
-        
-        # Create trigger for updated_at
-        trigger_sql = """
-        CREATE OR REPLACE TRIGGER trg_video_embeddings_updated_at
-        BEFORE UPDATE ON video_embeddings
-        FOR EACH ROW
-        BEGIN
-            :NEW.updated_at := CURRENT_TIMESTAMP;
-        END;
-        """
+        executed = execute_ddl_ignore_errors(cursor, INDEX_SQLS)
+        logger.info(f"Created {executed} of {len(INDEX_SQLS)} indexes")
         
-        cursor.execute(trigger_sql)
-        logger.info("Created update trigger for video_embeddings")
+        # No BEFORE UPDATE trigger for updated_at: a per-row PL/SQL call slows bulk
+        # re-embeds, so statements that UPDATE video_embeddings set
+        # updated_at = CURRENT_TIMESTAMP themselves (inserts use the column default).
         
         connection.commit()
         cursor.close()
@@ -100,30 +87,30 @@ def verify_table_structure():
         connection = get_db_connection()
         cursor = connection.cursor()
         
-        # Check table structure
+        # Columns and indexes in one round trip, split by kind below
+        cursor.arraysize = 500
+        cursor.prefetchrows = 500
         cursor.execute("""
-            SELECT column_name, data_type, data_length, data_precision, data_scale
+            SELECT 'C' kind, column_name, data_type, NULL, column_id
             FROM user_tab_columns 
             WHERE table_name = 'VIDEO_EMBEDDINGS'
-            ORDER BY column_id
-        """)
-        
-        columns = cursor.fetchall()
-        logger.info("Video embeddings table structure:")
-        for col in columns:
-            logger.info(f"  {col[0]}: {col[1]}")
-        
-        # Check indexes
-        cursor.execute("""
-            SELECT index_name, index_type, uniqueness
+            UNION ALL
+            SELECT 'I', index_name, index_type, uniqueness, NULL
             FROM user_indexes 
             WHERE table_name = 'VIDEO_EMBEDDINGS'
+            ORDER BY 1, 5
         """)
         
-        indexes = cursor.fetchall()
+        rows = cursor.fetchall()
+        logger.info("Video embeddings table structure:")
+        for kind, name, data_type, _, _ in rows:
+            if kind == 'C':
+                logger.info(f"  {name}: {data_type}")
+        
         logger.info("Indexes created:")
-        for idx in indexes:
-            logger.info(f"  {idx[0]}: {idx[1]} ({idx[2]})")
+        for kind, name, index_type, uniqueness, _ in rows:
+            if kind == 'I':
+                logger.info(f"  {name}: {index_type} ({uniqueness})")
         
         cursor.close()
         connection.close()
@@ -149,7 +136,7 @@ if __name__ == "__main__":
         print("• Oracle VECTOR(1024, FLOAT32) for embeddings")
         print("• Vector similarity search with VECTOR_DISTANCE()")
         print("• Vector indexes for performance optimization")
-        print("• Automatic timestamps and triggers")
+        print("• Automatic timestamps (column defaults)")
         print("• Optimized indexes for common queries")
         
     else:
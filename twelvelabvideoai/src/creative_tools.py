@@ -9,13 +9,20 @@ This module provides creative media tools including:
 """
 
 import os
+import shutil
+import asyncio
+import heapq
+import itertools
+import functools
 import subprocess
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 import tempfile
 from dotenv import load_dotenv
 from utils.db_utils_vector import get_db_connection
+from utils.http_utils import get_async_client
 import httpx
 
 load_dotenv()
@@ -26,6 +33,111 @@ logger = logging.getLogger(__name__)
 TWELVE_LABS_API_KEY = os.getenv('TWELVE_LABS_API_KEY')
 TWELVE_LABS_API_URL = "https://api.twelvelabs.io/v1.2"
 
+# Resolved once; every helper below runs these binaries per call
+_FFMPEG = shutil.which("ffmpeg") or "ffmpeg"
+_FFPROBE = shutil.which("ffprobe") or "ffprobe"
+
+# H.264 encoding on NVIDIA NVENC instead of libx264: 'auto' uses it when the
+# local ffmpeg can actually encode a test frame with h264_nvenc, 'true'/'false'
+# force it on or off
+FFMPEG_NVENC = os.getenv('FFMPEG_NVENC', 'auto').lower()
+
+
+@functools.lru_cache(maxsize=1)
+def _nvenc_available() -> bool:
+    """Whether ffmpeg should encode H.264 with h264_nvenc"""
+    if FFMPEG_NVENC in ('true', 'false'):
+        return FFMPEG_NVENC == 'true'
+    # Distro ffmpeg builds list h264_nvenc under -encoders even without an
+    # NVIDIA GPU or driver, so only a real one-frame encode proves that the
+    # driver (and with it the montage's -hwaccel cuda decode) works
+    try:
+        result = subprocess.run(
+            [_FFMPEG, "-hide_banner", "-v", "error",
+             "-f", "lavfi", "-i", "color=s=64x64", "-frames:v", "1",
+             "-c:v", "h264_nvenc", "-f", "null", "-"],
+            capture_output=True, timeout=30
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    if result.returncode != 0:
+        logger.info("ℹ️ h264_nvenc unavailable, encoding with libx264")
+    return result.returncode == 0
+
+
+# Concurrent ffmpeg jobs in extract_multiple_clips, each limited to
+# CLIP_FFMPEG_THREADS encoder threads so the jobs don't oversubscribe the CPUs
+CLIP_FFMPEG_THREADS = int(os.getenv('CLIP_FFMPEG_THREADS', '2'))
+CLIP_EXTRACT_WORKERS = int(os.getenv(
+    'CLIP_EXTRACT_WORKERS', str(max(1, (os.cpu_count() or 1) // CLIP_FFMPEG_THREADS))
+))
+
+# extract_clip stream-copies (no re-encode) when the source has a keyframe
+# within this many seconds of the requested start
+CLIP_COPY_KEYFRAME_TOLERANCE = float(os.getenv('CLIP_COPY_KEYFRAME_TOLERANCE', '0.1'))
+
+# Output frame rate of photo slideshows; every frame of a photo is identical,
+# so a lower rate cuts encode work proportionally
+SLIDESHOW_FPS = int(os.getenv('SLIDESHOW_FPS', '30'))
+
+# Cross-fade length between montage clips (transition='fade')
+MONTAGE_FADE_SECONDS = float(os.getenv('MONTAGE_FADE_SECONDS', '0.5'))
+
+
+@functools.lru_cache(maxsize=256)
+def _has_audio(media_path: str) -> bool:
+    """Whether a media file has an audio stream (ffprobe)"""
+    result = subprocess.run(
+        [_FFPROBE, "-v", "error", "-select_streams", "a",
+         "-show_entries", "stream=index", "-of", "csv=p=0", media_path],
+        capture_output=True, text=True
+    )
+    return bool(result.stdout.strip())
+
+
+@functools.lru_cache(maxsize=256)
+def _media_duration(media_path: str) -> Optional[float]:
+    """Container duration of a media file in seconds (ffprobe), None if unknown"""
+    result = subprocess.run(
+        [_FFPROBE, "-v", "error", "-show_entries", "format=duration",
+         "-of", "csv=p=0", media_path],
+        capture_output=True, text=True
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+def _keyframe_near(video_path: str, time: float, tolerance: float) -> bool:
+    """Whether the first video stream has a keyframe within tolerance of time"""
+    result = subprocess.run(
+        [_FFPROBE, "-v", "error", "-select_streams", "v:0", "-skip_frame", "nokey",
+         "-read_intervals", f"{max(0.0, time - tolerance)}%{time + tolerance}",
+         "-show_entries", "frame=pts_time", "-of", "csv=p=0", video_path],
+        capture_output=True, text=True
+    )
+    for line in result.stdout.split():
+        try:
+            if abs(float(line.strip(',')) - time) <= tolerance:
+                return True
+        except ValueError:
+            continue
+    return False
+
+
+def _fit_frame(width: int, height: int) -> str:
+    """Filter chain letterboxing a video stream into width x height with square pixels"""
+    return (f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1")
+
+
+def _h264_args(use_nvenc: bool, *x264_args: str) -> List[str]:
+    """ffmpeg video codec arguments: NVENC, or libx264 with x264_args"""
+    if use_nvenc:
+        return ["-c:v", "h264_nvenc", "-preset", "p4", "-tune", "hq", "-b:v", "8M"]
+    return ["-c:v", "libx264", *x264_args]
+
 
 class VideoMontageGenerator:
     """Create video montages from multiple clips"""
@@ -33,15 +145,21 @@ class VideoMontageGenerator:
     def __init__(self, output_dir: str = None):
         self.output_dir = output_dir or tempfile.gettempdir()
         Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+        self.use_nvenc = _nvenc_available()
         
     def create_montage(self, video_clips: List[Dict[str, Any]], 
                       output_filename: str,
                       transition: str = "fade",
                       duration_per_clip: float = 5.0,
                       add_music: bool = False,
-                      music_file: str = None) -> Dict[str, Any]:
+                      music_file: str = None,
+                      resolution: Tuple[int, int] = (1920, 1080)) -> Dict[str, Any]:
         """Create a video montage from multiple clips
         
+        The clips are cut, joined and encoded by a single ffmpeg run: each clip
+        is its own input seeked with -ss/-t, and one filter graph concatenates
+        them (or cross-fades them for transition='fade').
+        
         Args:
             video_clips: List of dicts with 'file_path', 'start_time', 'end_time'
             output_filename: Name for output montage file
@@ -49,6 +167,8 @@ class VideoMontageGenerator:
             duration_per_clip: Max duration for each clip in seconds
             add_music: Whether to add background music
             music_file: Path to music file (if add_music=True)
+            resolution: Output video resolution (width, height); clips are
+                scaled and letterboxed to it
             
         Returns:
             Dict with success status and output file path
@@ -56,71 +176,56 @@ class VideoMontageGenerator:
         try:
             output_path = os.path.join(self.output_dir, output_filename)
             
-            # Create a text file with input clips for ffmpeg
-            concat_file = os.path.join(self.output_dir, "concat_list.txt")
-            processed_clips = []
-            
             logger.info(f"🎬 Creating montage with {len(video_clips)} clips")
             
-            # Extract and process each clip
-            for i, clip in enumerate(video_clips):
-                clip_output = os.path.join(self.output_dir, f"clip_{i}.mp4")
-                
-                # Extract clip segment
+            # With NVENC, decode on the GPU too (frames are copied back for the filters)
+            hwaccel = ["-hwaccel", "cuda"] if self.use_nvenc else []
+            crossfade = transition == "fade"
+            cmd = [_FFMPEG, "-y"]
+            durations = []
+            for clip in video_clips:
                 start_time = clip.get("start_time", 0)
                 duration = min(
                     clip.get("end_time", start_time + duration_per_clip) - start_time,
                     duration_per_clip
                 )
-                
-                cmd = [
-                    "ffmpeg", "-y",
-                    "-i", clip["file_path"],
-                    "-ss", str(start_time),
-                    "-t", str(duration),
-                    "-c:v", "libx264",
-                    "-c:a", "aac",
-                    "-strict", "experimental",
-                    clip_output
-                ]
-                
-                subprocess.run(cmd, check=True, capture_output=True)
-                processed_clips.append(clip_output)
-                
-                logger.info(f"  ✓ Processed clip {i+1}/{len(video_clips)}")
-            
-            # Create concat file
-            with open(concat_file, 'w') as f:
-                for clip_path in processed_clips:
-                    f.write(f"file '{clip_path}'\n")
-            
-            # Concatenate clips with transitions
-            if transition == "fade":
-                # Use xfade filter for smooth transitions
-                self._create_with_fade(processed_clips, output_path, add_music, music_file)
-            else:
-                # Simple concatenation
-                concat_cmd = [
-                    "ffmpeg", "-y",
-                    "-f", "concat",
-                    "-safe", "0",
-                    "-i", concat_file,
-                    "-c", "copy",
-                    output_path
-                ]
-                subprocess.run(concat_cmd, check=True, capture_output=True)
+                if crossfade:
+                    # xfade offsets are cumulative, so a clip cut short by the end
+                    # of its source would shift every later transition
+                    source_duration = _media_duration(clip["file_path"])
+                    if source_duration is not None:
+                        duration = min(duration, source_duration - start_time)
+                durations.append(duration)
+                # -ss before -i seeks the input instead of decoding up to start_time
+                cmd += [*hwaccel, "-ss", str(start_time), "-t", str(duration), "-i", clip["file_path"]]
+            
+            use_music = add_music and music_file
+            if use_music:
+                cmd += ["-i", music_file]
+            clip_audio = not use_music and all(_has_audio(clip["file_path"]) for clip in video_clips)
+            
+            filter_graph, total_duration = self._montage_filter(
+                durations, clip_audio, crossfade=crossfade, resolution=resolution
+            )
+            cmd += ["-filter_complex", filter_graph, "-map", "[vout]"]
+            if use_music:
+                cmd += ["-map", f"{len(video_clips)}:a", "-shortest"]
+            elif clip_audio:
+                cmd += ["-map", "[aout]"]
+            cmd += [
+                *_h264_args(self.use_nvenc, "-preset", "medium", "-crf", "23"),
+                "-c:a", "aac",
+                output_path
+            ]
             
-            # Cleanup temporary files
-            for clip_path in processed_clips:
-                os.remove(clip_path)
-            os.remove(concat_file)
+            subprocess.run(cmd, check=True, capture_output=True)
             
             logger.info(f"✅ Montage created: {output_path}")
             
             return {
                 "success": True,
                 "output_path": output_path,
-                "duration": len(video_clips) * duration_per_clip,
+                "duration": total_duration,
                 "num_clips": len(video_clips)
             }
             
@@ -128,44 +233,50 @@ class VideoMontageGenerator:
             logger.error(f"❌ Error creating montage: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def _create_with_fade(self, clips: List[str], output_path: str,
-                         add_music: bool = False, music_file: str = None):
-        """Create montage with fade transitions"""
-        # For simplicity, use basic concat - xfade requires complex filter graphs
-        concat_file = os.path.join(self.output_dir, "concat_fade.txt")
-        
-        with open(concat_file, 'w') as f:
-            for clip_path in clips:
-                f.write(f"file '{clip_path}'\n")
+    @staticmethod
+    def _montage_filter(durations: List[float], with_audio: bool, crossfade: bool,
+                        resolution: Tuple[int, int] = (1920, 1080)) -> Tuple[str, float]:
+        """filter_complex joining inputs 0..n-1 into [vout] (and [aout])
         
-        cmd = [
-            "ffmpeg", "-y",
-            "-f", "concat",
-            "-safe", "0",
-            "-i", concat_file,
-            "-c:v", "libx264",
-            "-preset", "medium",
-            "-crf", "23",
-            "-c:a", "aac",
-            output_path
+        Returns:
+            (filter graph, output duration in seconds)
+        """
+        n = len(durations)
+        # concat and xfade need the same resolution, SAR and frame rate (and
+        # xfade the same timebase) on every input, and clips may be any mix of
+        # sizes and orientations
+        fit = _fit_frame(*resolution)
+        parts = [
+            f"[{i}:v]setpts=PTS-STARTPTS,{fit},fps=30,format=yuv420p,settb=AVTB[v{i}]"
+            for i in range(n)
         ]
-        
-        if add_music and music_file:
-            # Add background music
-            cmd = [
-                "ffmpeg", "-y",
-                "-f", "concat",
-                "-safe", "0",
-                "-i", concat_file,
-                "-i", music_file,
-                "-c:v", "libx264",
-                "-c:a", "aac",
-                "-shortest",  # Stop when shortest input ends
-                output_path
+        if with_audio:
+            parts += [
+                f"[{i}:a]asetpts=PTS-STARTPTS,"
+                f"aformat=sample_rates=48000:channel_layouts=stereo[a{i}]"
+                for i in range(n)
             ]
         
-        subprocess.run(cmd, check=True, capture_output=True)
-        os.remove(concat_file)
+        if not crossfade or n < 2:
+            streams = "".join(f"[v{i}][a{i}]" if with_audio else f"[v{i}]" for i in range(n))
+            outputs = "[vout][aout]" if with_audio else "[vout]"
+            parts.append(f"{streams}concat=n={n}:v=1:a={int(with_audio)}{outputs}")
+            return ";".join(parts), sum(durations)
+        
+        # Each cross-fade overlaps the running output's tail with the next clip
+        fade = min(MONTAGE_FADE_SECONDS, min(durations) / 2)
+        video, audio, length = "[v0]", "[a0]", durations[0]
+        for i in range(1, n):
+            last = i == n - 1
+            parts.append(
+                f"{video}[v{i}]xfade=transition=fade:duration={fade}:offset={length - fade}"
+                f"{'[vout]' if last else f'[vx{i}]'}"
+            )
+            if with_audio:
+                parts.append(f"{audio}[a{i}]acrossfade=d={fade}{'[aout]' if last else f'[ax{i}]'}")
+            video, audio = f"[vx{i}]", f"[ax{i}]"
+            length += durations[i] - fade
+        return ";".join(parts), length
 
 
 class SlideshowCreator:
@@ -174,6 +285,7 @@ class SlideshowCreator:
     def __init__(self, output_dir: str = None):
         self.output_dir = output_dir or tempfile.gettempdir()
         Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+        self.use_nvenc = _nvenc_available()
         
     def create_slideshow(self, photo_paths: List[str],
                         output_filename: str,
@@ -201,58 +313,37 @@ class SlideshowCreator:
             
             logger.info(f"📸 Creating slideshow with {len(photo_paths)} photos")
             
-            # Create temporary video clips from each photo
-            temp_clips = []
-            for i, photo_path in enumerate(photo_paths):
-                clip_output = os.path.join(self.output_dir, f"photo_clip_{i}.mp4")
-                
-                # Convert photo to video clip
-                cmd = [
-                    "ffmpeg", "-y",
-                    "-loop", "1",
-                    "-i", photo_path,
-                    "-t", str(duration_per_photo),
-                    "-vf", f"scale={resolution[0]}:{resolution[1]}:force_original_aspect_ratio=decrease,pad={resolution[0]}:{resolution[1]}:(ow-iw)/2:(oh-ih)/2",
-                    "-c:v", "libx264",
-                    "-pix_fmt", "yuv420p",
-                    clip_output
-                ]
-                
-                subprocess.run(cmd, check=True, capture_output=True)
-                temp_clips.append(clip_output)
-                
-                logger.info(f"  ✓ Processed photo {i+1}/{len(photo_paths)}")
-            
-            # Concatenate clips
-            concat_file = os.path.join(self.output_dir, "slideshow_concat.txt")
-            with open(concat_file, 'w') as f:
-                for clip_path in temp_clips:
-                    f.write(f"file '{clip_path}'\n")
-            
-            # Build final slideshow
-            cmd = [
-                "ffmpeg", "-y",
-                "-f", "concat",
-                "-safe", "0",
-                "-i", concat_file,
-                "-c:v", "libx264",
-                "-preset", "medium",
-                "-crf", "23"
-            ]
+            # One ffmpeg run: each photo is a looped still input (so albums may
+            # mix JPEG, PNG and WebP), decoded once and scaled to a common
+            # frame, then joined by the concat filter at SLIDESHOW_FPS
+            width, height = resolution
+            cmd = [_FFMPEG, "-y"]
+            for photo_path in photo_paths:
+                cmd += ["-loop", "1", "-framerate", str(SLIDESHOW_FPS),
+                        "-t", str(duration_per_photo), "-i", photo_path]
             
             # Add music if requested
-            if add_music and music_file:
-                cmd.extend(["-i", music_file, "-c:a", "aac", "-shortest"])
-            
-            cmd.append(output_path)
+            use_music = add_music and music_file
+            if use_music:
+                cmd.extend(["-i", music_file])
+            
+            n = len(photo_paths)
+            parts = [f"[{i}:v]{_fit_frame(width, height)},format=yuv420p[v{i}]" for i in range(n)]
+            parts.append(f"{''.join(f'[v{i}]' for i in range(n))}concat=n={n}:v=1:a=0[vout]")
+            cmd.extend([
+                "-filter_complex", ";".join(parts),
+                "-map", "[vout]",
+                # stillimage tunes x264's rate control for repeated still frames
+                *_h264_args(self.use_nvenc, "-preset", "veryfast", "-tune", "stillimage", "-crf", "23")
+            ])
+            if use_music:
+                cmd.extend(["-map", f"{n}:a", "-c:a", "aac", "-shortest"])
+            else:
+                cmd.append("-an")
+            cmd.extend(["-movflags", "+faststart", output_path])
             
             subprocess.run(cmd, check=True, capture_output=True)
             
-            # Cleanup
-            for clip_path in temp_clips:
-                os.remove(clip_path)
-            os.remove(concat_file)
-            
             total_duration = len(photo_paths) * duration_per_photo
             logger.info(f"✅ Slideshow created: {output_path} ({total_duration}s)")
             
@@ -273,15 +364,21 @@ class ClipExtractor:
     """Extract specific segments from videos"""
     
     def extract_clip(self, video_path: str, start_time: float, end_time: float,
-                    output_filename: str, output_dir: str = None) -> Dict[str, Any]:
+                    output_filename: str, output_dir: str = None,
+                    threads: int = 0, fast_copy: bool = True) -> Dict[str, Any]:
         """Extract a clip from a video
         
+        With fast_copy, a clip that starts on a source keyframe is cut by
+        stream copy (demux/remux only); otherwise it is re-encoded.
+        
         Args:
             video_path: Path to source video
             start_time: Start time in seconds
             end_time: End time in seconds
             output_filename: Name for extracted clip
             output_dir: Output directory (default: temp)
+            threads: ffmpeg thread limit (0 = ffmpeg's default)
+            fast_copy: Stream-copy when start_time is on a keyframe
             
         Returns:
             Dict with success status and clip info
@@ -295,19 +392,35 @@ class ClipExtractor:
             
             logger.info(f"✂️ Extracting clip: {start_time}s - {end_time}s ({duration}s)")
             
-            # Extract clip with re-encoding for accuracy
-            cmd = [
-                "ffmpeg", "-y",
-                "-i", video_path,
-                "-ss", str(start_time),
-                "-t", str(duration),
-                "-c:v", "libx264",
-                "-c:a", "aac",
-                "-strict", "experimental",
-                output_path
-            ]
+            stream_copy = False
+            if fast_copy and _keyframe_near(video_path, start_time, CLIP_COPY_KEYFRAME_TOLERANCE):
+                # -ss before -i seeks straight to the keyframe; nothing is decoded
+                cmd = [
+                    _FFMPEG, "-y",
+                    "-ss", str(start_time),
+                    "-i", video_path,
+                    "-t", str(duration),
+                    "-c", "copy",
+                    "-avoid_negative_ts", "make_zero",
+                    output_path
+                ]
+                stream_copy = subprocess.run(cmd, capture_output=True).returncode == 0
             
-            subprocess.run(cmd, check=True, capture_output=True)
+            if not stream_copy:
+                # Extract clip with re-encoding for accuracy
+                cmd = [
+                    _FFMPEG, "-y",
+                    "-i", video_path,
+                    "-ss", str(start_time),
+                    "-t", str(duration),
+                    "-c:v", "libx264",
+                    "-c:a", "aac",
+                    "-strict", "experimental",
+                    "-threads", str(threads),
+                    output_path
+                ]
+                
+                subprocess.run(cmd, check=True, capture_output=True)
             
             # Get file size
             file_size = os.path.getsize(output_path)
@@ -320,7 +433,8 @@ class ClipExtractor:
                 "start_time": start_time,
                 "end_time": end_time,
                 "duration": duration,
-                "file_size_mb": file_size / 1024 / 1024
+                "file_size_mb": file_size / 1024 / 1024,
+                "stream_copy": stream_copy
             }
             
         except Exception as e:
@@ -340,14 +454,18 @@ class ClipExtractor:
         Returns:
             Dict with list of extracted clips
         """
-        clips = []
-        
-        for i, (start, end) in enumerate(time_ranges):
-            output_name = f"clip_{i+1}_{start:.0f}_{end:.0f}.mp4"
-            result = self.extract_clip(video_path, start, end, output_name, output_dir)
-            
-            if result["success"]:
-                clips.append(result)
+        # Each extraction is an independent ffmpeg process, so threads suffice
+        # to keep several running; results stay in time_ranges order
+        workers = max(1, min(len(time_ranges), CLIP_EXTRACT_WORKERS))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='clip_extract') as executor:
+            futures = [
+                executor.submit(self.extract_clip, video_path, start, end,
+                                f"clip_{i+1}_{start:.0f}_{end:.0f}.mp4", output_dir,
+                                threads=CLIP_FFMPEG_THREADS)
+                for i, (start, end) in enumerate(time_ranges)
+            ]
+            results = [future.result() for future in futures]
+        clips = [result for result in results if result["success"]]
         
         return {
             "success": True,
@@ -375,61 +493,64 @@ class ThumbnailSuggester:
             Dict with suggested timestamps for thumbnails
         """
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                # Get video chapters to find key moments
-                response = await client.post(
-                    f"{self.base_url}/generate",
-                    headers={
-                        "x-api-key": self.api_key,
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "video_id": video_id,
-                        "types": ["chapter", "highlight"]
-                    }
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Extract key timestamps from chapters and highlights
-                    suggestions = []
-                    
-                    # Get chapter start times
-                    chapters = data.get("chapters", [])
-                    for chapter in chapters[:num_suggestions]:
-                        suggestions.append({
-                            "timestamp": chapter.get("start", 0),
-                            "reason": "Chapter start",
-                            "description": chapter.get("chapter_title", "")
-                        })
-                    
-                    # Get highlight timestamps
-                    highlights = data.get("highlights", [])
-                    for highlight in highlights[:num_suggestions]:
-                        suggestions.append({
-                            "timestamp": highlight.get("start", 0),
-                            "reason": "Key moment",
-                            "description": highlight.get("highlight", "")
-                        })
-                    
-                    # Sort by timestamp and limit
-                    suggestions = sorted(suggestions, key=lambda x: x["timestamp"])[:num_suggestions]
-                    
-                    logger.info(f"✅ Generated {len(suggestions)} thumbnail suggestions")
-                    
-                    return {
-                        "success": True,
-                        "video_id": video_id,
-                        "suggestions": suggestions
-                    }
-                else:
+            # Chapters and highlights are generated concurrently
+            chapters_response, highlights_response = await asyncio.gather(
+                self._generate(video_id, "chapter"),
+                self._generate(video_id, "highlight")
+            )
+            
+            for response in (chapters_response, highlights_response):
+                if response.status_code != 200:
                     logger.error(f"❌ Failed to generate suggestions: {response.text}")
                     return {"success": False, "error": response.text}
+            
+            # Extract key timestamps from chapters and highlights as
+            # (timestamp, reason, description); the API returns both in time order
+            chapters = chapters_response.json().get("chapters", [])
+            chapter_list = [
+                (chapter.get("start", 0), "Chapter start", chapter.get("chapter_title", ""))
+                for chapter in chapters[:num_suggestions]
+            ]
+            highlights = highlights_response.json().get("highlights", [])
+            highlight_list = [
+                (highlight.get("start", 0), "Key moment", highlight.get("highlight", ""))
+                for highlight in highlights[:num_suggestions]
+            ]
+            
+            # Merge the two timelines and keep the earliest num_suggestions
+            suggestions = [
+                {"timestamp": timestamp, "reason": reason, "description": description}
+                for timestamp, reason, description in itertools.islice(
+                    heapq.merge(chapter_list, highlight_list, key=lambda item: item[0]),
+                    num_suggestions
+                )
+            ]
+            
+            logger.info(f"✅ Generated {len(suggestions)} thumbnail suggestions")
+            
+            return {
+                "success": True,
+                "video_id": video_id,
+                "suggestions": suggestions
+            }
                     
         except Exception as e:
             logger.error(f"❌ Error generating thumbnail suggestions: {str(e)}")
             return {"success": False, "error": str(e)}
+    
+    async def _generate(self, video_id: str, generate_type: str) -> httpx.Response:
+        """POST /generate for a single result type"""
+        return await get_async_client().post(
+            f"{self.base_url}/generate",
+            headers={
+                "x-api-key": self.api_key,
+                "Content-Type": "application/json"
+            },
+            json={
+                "video_id": video_id,
+                "types": [generate_type]
+            }
+        )
 
 
 # Convenience functions
@@ -459,8 +580,6 @@ async def suggest_video_thumbnails(video_id: str, num: int = 5) -> Dict[str, Any
 
 
 if __name__ == "__main__":
-    import asyncio
-    
     print("🎨 Creative Tools Module")
     print("=" * 50)
     
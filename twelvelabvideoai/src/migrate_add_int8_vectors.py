@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Migration script to add an INT8 copy of album_media embeddings
+
+Adds embedding_int8 VECTOR(1024, INT8) next to the FP32 embedding_vector,
+backfills it with quantize_int8() and builds a COSINE vector index on it.
+Once it has run, set ALBUM_VECTORS_INT8=true: new rows then get both
+columns and similar-media searches scan the INT8 copy, a quarter of the
+bytes per vector. The FP32 column is kept as the source of truth.
+Safe to re-run: only rows with a missing INT8 copy are backfilled.
+"""
+import sys
+import logging
+import argparse
+from dotenv import load_dotenv
+from utils.db_utils_vector import get_db_connection, validate_db_config, quantize_int8
+
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def add_int8_column() -> bool:
+    """Add album_media.embedding_int8 if it does not exist yet"""
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            SELECT COUNT(*) FROM user_tab_columns
+            WHERE table_name = 'ALBUM_MEDIA' AND column_name = 'EMBEDDING_INT8'
+        """)
+        if cursor.fetchone()[0]:
+            logger.info("EMBEDDING_INT8 column already exists")
+            return True
+        
+        cursor.execute("ALTER TABLE album_media ADD embedding_int8 VECTOR(1024, INT8)")
+        logger.info("✅ EMBEDDING_INT8 column added")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Failed to add EMBEDDING_INT8 column: {e}")
+        return False
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def backfill_int8(batch_size: int = 500) -> int:
+    """Quantize every FP32 embedding that has no INT8 copy yet
+    
+    Args:
+        batch_size: Rows fetched and updated per round trip
+        
+    Returns:
+        int: Number of rows backfilled
+    """
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    cursor.arraysize = batch_size
+    
+    last_id = 0
+    backfilled = 0
+    try:
+        while True:
+            cursor.execute("""
+                SELECT id, embedding_vector
+                FROM album_media
+                WHERE id > :last_id
+                  AND embedding_vector IS NOT NULL
+                  AND embedding_int8 IS NULL
+                ORDER BY id
+                FETCH FIRST :batch_size ROWS ONLY
+            """, {"last_id": last_id, "batch_size": batch_size})
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            
+            cursor.executemany("""
+                UPDATE album_media
+                SET embedding_int8 = :embedding_int8
+                WHERE id = :id
+            """, [{"id": media_id, "embedding_int8": quantize_int8(vector)} for media_id, vector in rows])
+            connection.commit()
+            
+            backfilled += len(rows)
+            logger.info(f"Processed up to id {last_id}: {backfilled} rows backfilled so far")
+        
+        return backfilled
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def create_int8_index() -> bool:
+    """Create the COSINE vector index used by INT8 similarity searches"""
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            CREATE VECTOR INDEX idx_album_media_int8
+            ON album_media (embedding_int8)
+            ORGANIZATION NEIGHBOR PARTITIONS
+            DISTANCE COSINE
+            WITH TARGET ACCURACY 95
+        """)
+        logger.info("✅ Created idx_album_media_int8")
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Vector index creation warning: {e}")
+        return False
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add and backfill INT8 album_media embeddings')
+    parser.add_argument('--batch-size', type=int, default=500, help='Rows per batch')
+    parser.add_argument('--skip-index', action='store_true', help='Do not create the INT8 vector index')
+    
+    args = parser.parse_args()
+    
+    try:
+        validate_db_config()
+    except Exception as e:
+        logger.error(f"❌ Database configuration invalid: {e}")
+        sys.exit(1)
+    
+    if not add_int8_column():
+        sys.exit(1)
+    
+    count = backfill_int8(args.batch_size)
+    print(f"✅ Backfilled {count} INT8 embeddings")
+    
+    if not args.skip_index:
+        create_int8_index()
+    
+    print("Set ALBUM_VECTORS_INT8=true to search the INT8 embeddings")
+
+
+if __name__ == "__main__":
+    main()
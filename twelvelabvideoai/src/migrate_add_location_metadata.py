@@ -23,6 +23,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Columns added to album_media, in order (column name -> column definition)
+LOCATION_COLUMNS = {
+    # GPS coordinates
+    'LATITUDE': 'latitude NUMBER(10, 7)',
+    'LONGITUDE': 'longitude NUMBER(10, 7)',
+    'GPS_ALTITUDE': 'gps_altitude NUMBER(10, 2)',
+    # Location information
+    'CITY': 'city VARCHAR2(200)',
+    'STATE': 'state VARCHAR2(200)',
+    'COUNTRY': 'country VARCHAR2(200)',
+    'COUNTRY_CODE': 'country_code VARCHAR2(10)',
+    # Capture date and camera information
+    'CAPTURE_DATE': 'capture_date TIMESTAMP',
+    'CAMERA_MAKE': 'camera_make VARCHAR2(200)',
+    'CAMERA_MODEL': 'camera_model VARCHAR2(200)',
+    # Image orientation
+    'ORIENTATION': 'orientation NUMBER',
+}
+
 def run_migration():
     """Add GPS and location metadata columns to album_media table"""
     try:
@@ -34,112 +53,24 @@ def run_migration():
             cursor = conn.cursor()
             
             # Check if columns already exist
-            check_columns_sql = """
+            cursor.execute(f"""
             SELECT column_name 
             FROM user_tab_columns 
             WHERE table_name = 'ALBUM_MEDIA' 
-            AND column_name IN ('LATITUDE', 'LONGITUDE', 'GPS_ALTITUDE', 'CITY', 'COUNTRY', 
-                               'CAPTURE_DATE', 'CAMERA_MAKE', 'CAMERA_MODEL')
-            """
-            
-            cursor.execute(check_columns_sql)
+            AND column_name IN ({', '.join(f"'{name}'" for name in LOCATION_COLUMNS)})
+            """)
             existing_columns = {row[0] for row in cursor.fetchall()}
             
             if existing_columns:
                 logger.warning(f"⚠️ Some columns already exist: {existing_columns}")
                 logger.info("Skipping existing columns and adding only missing ones...")
             
-            # Add GPS coordinates columns
-            if 'LATITUDE' not in existing_columns:
-                logger.info("Adding LATITUDE column...")
-                cursor.execute("""
-                    ALTER TABLE album_media 
-                    ADD latitude NUMBER(10, 7)
-                """)
-                logger.info("✅ LATITUDE column added")
-            
-            if 'LONGITUDE' not in existing_columns:
-                logger.info("Adding LONGITUDE column...")
-                cursor.execute("""
-                    ALTER TABLE album_media 
-                    ADD longitude NUMBER(10, 7)
-                """)
-                logger.info("✅ LONGITUDE column added")
-            
-            if 'GPS_ALTITUDE' not in existing_columns:
-                logger.info("Adding GPS_ALTITUDE column...")
-                cursor.execute("""
-                    ALTER TABLE album_media 
-                    ADD gps_altitude NUMBER(10, 2)
-                """)
-                logger.info("✅ GPS_ALTITUDE column added")
-            
-            # Add location information columns
-            if 'CITY' not in existing_columns:
-                logger.info("Adding CITY column...")
-                cursor.execute("""
-                    ALTER TABLE album_media 
-                    ADD city VARCHAR2(200)
-                """)
-                logger.info("✅ CITY column added")
-            
-            if 'STATE' not in existing_columns:
-                logger.info("Adding STATE column...")
-                cursor.execute("""
-                    ALTER TABLE album_media 
-                    ADD state VARCHAR2(200)
-                """)
-                logger.info("✅ STATE column added")
-            
-            if 'COUNTRY' not in existing_columns:
-                logger.info("Adding COUNTRY column...")
-                cursor.execute("""
-                    ALTER TABLE album_media 
-                    ADD country VARCHAR2(200)
-                """)
-                logger.info("✅ COUNTRY column added")
-            
-            if 'COUNTRY_CODE' not in existing_columns:
-                logger.info("Adding COUNTRY_CODE column...")
-                cursor.execute("""
-                    ALTER TABLE album_media 
-                    ADD country_code VARCHAR2(10)
-                """)
-                logger.info("✅ COUNTRY_CODE column added")
-            
-            # Add capture date and camera information
-            if 'CAPTURE_DATE' not in existing_columns:
-                logger.info("Adding CAPTURE_DATE column...")
-                cursor.execute("""
-                    ALTER TABLE album_media 
-                    ADD capture_date TIMESTAMP
-                """)
-                logger.info("✅ CAPTURE_DATE column added")
-            
-            if 'CAMERA_MAKE' not in existing_columns:
-                logger.info("Adding CAMERA_MAKE column...")
-                cursor.execute("""
-                    ALTER TABLE album_media 
-                    ADD camera_make VARCHAR2(200)
-                """)
-                logger.info("✅ CAMERA_MAKE column added")
-            
-            if 'CAMERA_MODEL' not in existing_columns:
-                logger.info("Adding CAMERA_MODEL column...")
-                cursor.execute("""
-                    ALTER TABLE album_media 
-                    ADD camera_model VARCHAR2(200)
-                """)
-                logger.info("✅ CAMERA_MODEL column added")
-            
-            # Add image orientation
-            if 'ORIENTATION' not in existing_columns:
-                logger.info("Adding ORIENTATION column...")
-                cursor.execute("""
-                    ALTER TABLE album_media 
-                    ADD orientation NUMBER
-                """)
-                logger.info("✅ ORIENTATION column added")
+            # Add every missing column in one ALTER TABLE (one DDL, one dictionary update)
+            missing = {name: ddl for name, ddl in LOCATION_COLUMNS.items() if name not in existing_columns}
+            if missing:
+                logger.info(f"Adding columns: {', '.join(missing)}...")
+                cursor.execute(f"ALTER TABLE album_media ADD ({', '.join(missing.values())})")
+                logger.info(f"✅ {len(missing)} columns added")
             
             # Commit changes
             conn.commit()
@@ -152,6 +83,7 @@ def run_migration():
             logger.info("   - orientation (image orientation)")
             
             # Show updated table structure
+            cursor.arraysize = 200
             cursor.execute("""
                 SELECT column_name, data_type, data_length, nullable 
                 FROM user_tab_columns 
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Migration script to L2-normalize album_media embeddings
+
+New embeddings are written unit-length by unified_album_manager. This script
+normalizes rows stored before that (or by other tools) and rebuilds the
+album_media vector index for DOT distance. Once it has run, set
+ALBUM_VECTORS_NORMALIZED=true so similar-media queries use DOT instead of
+COSINE. Safe to re-run: rows that are already unit-length are skipped.
+"""
+import sys
+import array
+import logging
+import argparse
+import numpy as np
+from dotenv import load_dotenv
+from utils.db_utils_vector import get_db_connection, validate_db_config
+
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+NORM_TOLERANCE = 1e-3
+
+
+def normalize_vectors(batch_size: int = 500, dry_run: bool = False) -> int:
+    """Rewrite every non-unit embedding in album_media as a unit vector
+    
+    Args:
+        batch_size: Rows fetched and updated per round trip
+        dry_run: Count rows that need normalizing without updating them
+        
+    Returns:
+        int: Number of rows normalized (or that would be)
+    """
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    cursor.arraysize = batch_size
+    
+    last_id = 0
+    normalized = 0
+    try:
+        while True:
+            cursor.execute("""
+                SELECT id, embedding_vector
+                FROM album_media
+                WHERE id > :last_id AND embedding_vector IS NOT NULL
+                ORDER BY id
+                FETCH FIRST :batch_size ROWS ONLY
+            """, {"last_id": last_id, "batch_size": batch_size})
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            
+            updates = []
+            for media_id, vector in rows:
+                vec = np.asarray(vector, dtype=np.float32)
+                norm = np.linalg.norm(vec)
+                if norm and abs(norm - 1.0) > NORM_TOLERANCE:
+                    unit = array.array('f')
+                    unit.frombytes((vec / norm).astype(np.float32).tobytes())
+                    updates.append({"id": media_id, "embedding_vector": unit})
+            
+            if updates and not dry_run:
+                cursor.executemany("""
+                    UPDATE album_media
+                    SET embedding_vector = :embedding_vector
+                    WHERE id = :id
+                """, updates)
+                connection.commit()
+            
+            normalized += len(updates)
+            logger.info(f"Processed up to id {last_id}: {normalized} rows normalized so far")
+        
+        return normalized
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def rebuild_vector_index() -> bool:
+    """Recreate idx_album_media_vector with DOT distance"""
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    try:
+        try:
+            cursor.execute("DROP INDEX idx_album_media_vector")
+            logger.info("Dropped idx_album_media_vector")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not drop existing vector index: {e}")
+        
+        cursor.execute("""
+            CREATE VECTOR INDEX idx_album_media_vector
+            ON album_media (embedding_vector)
+            ORGANIZATION NEIGHBOR PARTITIONS
+            DISTANCE DOT
+            WITH TARGET ACCURACY 95
+        """)
+        logger.info("✅ Created idx_album_media_vector with DOT distance")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Failed to rebuild vector index: {e}")
+        return False
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='L2-normalize album_media embeddings for DOT similarity')
+    parser.add_argument('--batch-size', type=int, default=500, help='Rows per batch')
+    parser.add_argument('--dry-run', action='store_true', help='Count rows to normalize without updating')
+    parser.add_argument('--skip-index', action='store_true', help='Do not rebuild the vector index')
+    
+    args = parser.parse_args()
+    
+    try:
+        validate_db_config()
+    except Exception as e:
+        logger.error(f"❌ Database configuration invalid: {e}")
+        sys.exit(1)
+    
+    count = normalize_vectors(args.batch_size, args.dry_run)
+    if args.dry_run:
+        print(f"🔍 DRY RUN - {count} embeddings would be normalized")
+        return
+    
+    print(f"✅ Normalized {count} embeddings")
+    
+    if not args.skip_index:
+        if not rebuild_vector_index():
+            sys.exit(1)
+    
+    print("Set ALBUM_VECTORS_NORMALIZED=true to use DOT similarity")
+
+
+if __name__ == "__main__":
+    main()
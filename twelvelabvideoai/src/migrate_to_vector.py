@@ -158,7 +158,7 @@ def create_new_vector_tables() -> bool:
         
         # Create photo embeddings table with VECTOR
         from create_schema_photo_embeddings_vector import create_photo_embeddings_table_vector
-        if not create_photo_embeddings_table_vector():
+        if not create_photo_embeddings_table_vector(force=True):
             logger.error("Failed to create photo embeddings VECTOR table")
             return False
         
@@ -13,6 +13,7 @@ from twelvelabs import TwelveLabs
 from utils.db_utils_vector import (
     get_db_connection, 
     vector_similarity_search,
+    vector_similarity_search_batch,
     create_vector_from_list,
     get_health_status
 )
@@ -91,7 +92,8 @@ def search_photos_vector(query_text: str,
                         album_name: str = None,
                         top_k: int = None,
                         similarity_type: str = 'COSINE',
-                        min_similarity: float = None) -> List[Dict[str, Any]]:
+                        min_similarity: float = None,
+                        max_distance: float = None) -> List[Dict[str, Any]]:
     """Search photos using Oracle VECTOR similarity search
     
     Args:
@@ -100,6 +102,7 @@ def search_photos_vector(query_text: str,
         top_k: Number of top results to return
         similarity_type: 'COSINE', 'DOT', or 'EUCLIDEAN'
         min_similarity: Minimum similarity threshold
+        max_distance: Maximum VECTOR_DISTANCE, filtered in SQL
         
     Returns:
         List[Dict]: Search results with similarity scores
@@ -123,6 +126,10 @@ def search_photos_vector(query_text: str,
         
         additional_filters = " AND ".join(filters) if filters else None
         
+        # For cosine distance, lower values = more similar, so the threshold becomes a SQL cutoff
+        if min_similarity is not None and similarity_type == 'COSINE' and max_distance is None:
+            max_distance = 1.0 - min_similarity
+        
         # Perform vector similarity search
         results = vector_similarity_search(
             connection=connection,
@@ -130,17 +137,13 @@ def search_photos_vector(query_text: str,
             query_vector=query_embedding,
             top_k=top_k,
             similarity_type=similarity_type,
-            additional_filters=additional_filters
+            additional_filters=additional_filters,
+            max_distance=max_distance
         )
         
-        # Apply similarity threshold if specified
-        if min_similarity is not None:
-            if similarity_type == 'COSINE':
-                # For cosine distance, lower values = more similar
-                results = [r for r in results if r['similarity_score'] <= (1.0 - min_similarity)]
-            else:
-                # For other metrics, adapt as needed
-                results = [r for r in results if r['similarity_score'] >= min_similarity]
+        # Apply similarity threshold for other metrics (adapt as needed)
+        if min_similarity is not None and similarity_type != 'COSINE':
+            results = [r for r in results if r['similarity_score'] >= min_similarity]
         
         connection.close()
         
@@ -155,7 +158,8 @@ def search_photos_vector(query_text: str,
 def search_photos_multiple_enhanced(query_texts: List[str], 
                                    album_name: str = None,
                                    top_k: int = None,
-                                   similarity_type: str = 'COSINE') -> Dict[str, List[Dict[str, Any]]]:
+                                   similarity_type: str = 'COSINE',
+                                   max_distance: float = None) -> Dict[str, List[Dict[str, Any]]]:
     """Search photos for multiple queries with enhanced performance
     
     Args:
@@ -163,6 +167,7 @@ def search_photos_multiple_enhanced(query_texts: List[str],
         album_name: Optional album name to filter results
         top_k: Number of top results per query
         similarity_type: Similarity metric to use
+        max_distance: Optional VECTOR_DISTANCE cutoff, filtered in SQL
         
     Returns:
         Dict: Results keyed by query text
@@ -170,12 +175,43 @@ def search_photos_multiple_enhanced(query_texts: List[str],
     if top_k is None:
         top_k = DEFAULT_TOP_K
     
-    results = {}
+    results = {query: [] for query in query_texts}
     
+    # Embed every query, then run all vector searches in a single SQL round trip
+    embedded = []
     for query in query_texts:
         logger.info(f"Searching photos for: {query}")
-        query_results = search_photos_vector(query, album_name, top_k, similarity_type)
-        results[query] = query_results
+        query_embedding = create_query_embedding_enhanced(query)
+        if query_embedding:
+            embedded.append((query, query_embedding))
+        else:
+            logger.error(f"Failed to create query embedding for: {query}")
+    
+    if not embedded:
+        return results
+    
+    try:
+        connection = get_db_connection()
+        try:
+            additional_filters = f"album_name = '{album_name}'" if album_name else None
+            batches = vector_similarity_search_batch(
+                connection=connection,
+                table='photo_embeddings',
+                query_vectors=[embedding for _, embedding in embedded],
+                top_k=top_k,
+                similarity_type=similarity_type,
+                additional_filters=additional_filters,
+                max_distance=max_distance
+            )
+        finally:
+            connection.close()
+        
+        for (query, _), query_results in zip(embedded, batches):
+            results[query] = query_results
+            logger.info(f"Found {len(query_results)} photos for query: {query}")
+        
+    except Exception as e:
+        logger.error(f"Photo search failed: {e}")
     
     return results
 
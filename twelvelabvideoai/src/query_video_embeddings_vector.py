@@ -13,6 +13,7 @@ from twelvelabs import TwelveLabs
 from utils.db_utils_vector import (
     get_db_connection, 
     vector_similarity_search,
+    vector_similarity_search_batch,
     create_vector_from_list,
     get_health_status
 )
@@ -157,13 +158,15 @@ def search_videos_vector(query_text: str,
 
 def search_videos_multiple_enhanced(query_texts: List[str], 
                                    top_k: int = None,
-                                   similarity_type: str = 'COSINE') -> Dict[str, List[Dict[str, Any]]]:
+                                   similarity_type: str = 'COSINE',
+                                   max_distance: float = None) -> Dict[str, List[Dict[str, Any]]]:
     """Search videos for multiple queries with enhanced performance
     
     Args:
         query_texts: List of text queries
         top_k: Number of top results per query
         similarity_type: Similarity metric to use
+        max_distance: Optional VECTOR_DISTANCE cutoff, filtered in SQL
         
     Returns:
         Dict: Results keyed by query text
@@ -171,12 +174,41 @@ def search_videos_multiple_enhanced(query_texts: List[str],
     if top_k is None:
         top_k = DEFAULT_TOP_K
     
-    results = {}
+    results = {query: [] for query in query_texts}
     
+    # Embed every query, then run all vector searches in a single SQL round trip
+    embedded = []
     for query in query_texts:
         logger.info(f"Searching for: {query}")
-        query_results = search_videos_vector(query, top_k, similarity_type)
-        results[query] = query_results
+        query_embedding = create_query_embedding_enhanced(query)
+        if query_embedding:
+            embedded.append((query, query_embedding))
+        else:
+            logger.error(f"Failed to create query embedding for: {query}")
+    
+    if not embedded:
+        return results
+    
+    try:
+        connection = get_db_connection()
+        try:
+            batches = vector_similarity_search_batch(
+                connection=connection,
+                table='video_embeddings',
+                query_vectors=[embedding for _, embedding in embedded],
+                top_k=top_k,
+                similarity_type=similarity_type,
+                max_distance=max_distance
+            )
+        finally:
+            connection.close()
+        
+        for (query, _), query_results in zip(embedded, batches):
+            results[query] = query_results
+            logger.info(f"Found {len(query_results)} video segments for query: {query}")
+        
+    except Exception as e:
+        logger.error(f"Video search failed: {e}")
     
     return results
 
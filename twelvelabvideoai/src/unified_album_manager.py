@@ -6,16 +6,36 @@ automatically detecting file types and processing embeddings accordingly.
 """
 import os
 import sys
+import array
 import mimetypes
 from pathlib import Path
+import numpy as np
 import oracledb
 from dotenv import load_dotenv
-from utils.db_utils_vector import get_db_connection
+from utils.db_utils_vector import get_db_connection, quantize_int8, ALBUM_VECTORS_INT8
 import logging
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Columns written by UnifiedAlbumManager.store_media_batch
+_MEDIA_BATCH_COLUMNS = (
+    'album_name', 'file_name', 'file_path', 'file_type', 'mime_type', 'file_size',
+    'start_time', 'end_time', 'duration', 'width', 'height',
+    'oci_namespace', 'oci_bucket', 'oci_object_path',
+    'embedding_vector', 'embedding_model'
+)
+
+def _unit_vector(values):
+    """L2-normalize an embedding into a float32 array.array for VECTOR binds"""
+    vec = np.asarray(values, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    if norm:
+        vec = vec / norm
+    out = array.array('f')
+    out.frombytes(vec.astype(np.float32).tobytes())
+    return out
+
 class UnifiedAlbumManager:
     """Manages unified album operations for both photos and videos"""
     
@@ -139,25 +159,103 @@ class UnifiedAlbumManager:
             logger.error(f"❌ Error updating embedding: {e}")
             return False
     
-    def get_album_contents(self, album_name):
-        """Get all media (photos and videos) in an album"""
+    def store_media_batch(self, rows):
+        """Insert media rows together with their embeddings in one executemany
+        
+        Each row is a dict keyed by _MEDIA_BATCH_COLUMNS (missing keys are NULL).
+        Returns the new ids aligned with rows, None where a row was rejected.
+        """
+        if not rows:
+            return []
         
         try:
             connection = get_db_connection()
             cursor = connection.cursor()
             
-            sql = """
-            SELECT id, file_name, file_path, file_type, mime_type, file_size,
+            binds = []
+            for row in rows:
+                bind = {col: row.get(col) for col in _MEDIA_BATCH_COLUMNS}
+                # Stored unit-length so similarity can be computed as a dot product
+                bind['embedding_vector'] = _unit_vector(bind['embedding_vector'])
+                bind['embedding_model'] = bind['embedding_model'] or 'Marengo-retrieval-2.7'
+                binds.append(bind)
+            
+            batch_columns = _MEDIA_BATCH_COLUMNS
+            if ALBUM_VECTORS_INT8:
+                # Keep the INT8 search copy in step with the FP32 embedding
+                batch_columns = _MEDIA_BATCH_COLUMNS + ('embedding_int8',)
+                for bind in binds:
+                    bind['embedding_int8'] = quantize_int8(bind['embedding_vector'])
+            
+            id_var = cursor.var(oracledb.DB_TYPE_NUMBER, arraysize=len(binds))
+            cursor.setinputsizes(new_id=id_var)
+            
+            columns = ", ".join(batch_columns)
+            values = ", ".join(f":{col}" for col in batch_columns)
+            cursor.executemany(f"""
+            INSERT INTO album_media ({columns})
+            VALUES ({values})
+            RETURNING id INTO :new_id
+            """, binds, batcherrors=True)
+            
+            rejected = set()
+            for error in cursor.getbatcherrors():
+                rejected.add(error.offset)
+                logger.error(f"❌ Error storing {rows[error.offset].get('file_name')}: {error.message}")
+            
+            media_ids = []
+            for i in range(len(binds)):
+                value = None if i in rejected else id_var.getvalue(i)
+                media_ids.append(int(value[0]) if value else None)
+            
+            connection.commit()
+            cursor.close()
+            connection.close()
+            
+            logger.info(f"✅ Stored {len(binds) - len(rejected)} media rows with embeddings")
+            return media_ids
+            
+        except Exception as e:
+            logger.error(f"❌ Error storing media batch: {e}")
+            return [None] * len(rows)
+    
+    def get_album_contents(self, album_name, file_type=None, pending_only=False):
+        """Get all media (photos and videos) in an album
+        
+        Args:
+            album_name: Album to list
+            file_type: Optional 'photo' or 'video' filter
+            pending_only: Only return media that has no embedding yet
+        """
+        
+        try:
+            connection = get_db_connection()
+            cursor = connection.cursor()
+            
+            where_conditions = ["album_name = :album_name"]
+            params = {'album_name': album_name}
+            
+            if file_type:
+                where_conditions.append("file_type = :file_type")
+                params['file_type'] = file_type
+            
+            if pending_only:
+                where_conditions.append("embedding_vector IS NULL")
+            
+            where_clause = " AND ".join(where_conditions)
+            
+            sql = f"""
+            SELECT id, album_name, file_name, file_path, file_type, mime_type, file_size,
                    start_time, end_time, duration, width, height,
                    oci_namespace, oci_bucket, oci_object_path,
                    created_at, updated_at,
                    CASE WHEN embedding_vector IS NOT NULL THEN 'Y' ELSE 'N' END as has_embedding
             FROM album_media 
-            WHERE album_name = :album_name
+            WHERE {where_clause}
             ORDER BY created_at DESC
             """
             
-            cursor.execute(sql, {'album_name': album_name})
+            cursor.execute(sql, params)
             results = cursor.fetchall()
             
             # Convert to list of dictionaries
@@ -291,6 +389,137 @@ def create_unified_embedding(file_path, file_type, album_name, **kwargs):
         logger.error(f"❌ Error creating unified embedding: {e}")
         return None
 
+def create_unified_embeddings_batch(items):
+    """Embed a chunk of album items and store all resulting rows in one insert
+    
+    TwelveLabs embeds one media file per request, so the API calls stay
+    per item; the client is shared and every row lands in a single
+    executemany instead of an insert + update per row.
+    
+    Args:
+        items: dicts with file_path, file_type and album_name
+        
+    Returns:
+        List aligned with items: media id (photo), list of ids (video), or None on failure
+    """
+    from twelvelabs import TwelveLabs
+    
+    client = TwelveLabs(api_key=os.getenv("TWELVE_LABS_API_KEY"))
+    
+    rows = []
+    owners = []
+    for idx, item in enumerate(items):
+        try:
+            if item['file_type'] == 'photo':
+                item_rows = _photo_rows(item['file_path'], item['album_name'],
+                                        _embed_photo(client, item['file_path']))
+            elif item['file_type'] == 'video':
+                item_rows = _video_rows(item['file_path'], item['album_name'],
+                                        _embed_video(client, item['file_path']))
+            else:
+                logger.error(f"Unsupported file type: {item['file_type']}")
+                item_rows = []
+        except Exception as e:
+            logger.error(f"❌ Error creating embedding for {item.get('file_path')}: {e}")
+            item_rows = []
+        rows.extend(item_rows)
+        owners.extend([idx] * len(item_rows))
+    
+    results = [None] * len(items)
+    for idx, media_id in zip(owners, album_manager.store_media_batch(rows)):
+        if media_id is None:
+            continue
+        if items[idx]['file_type'] == 'photo':
+            results[idx] = media_id
+        else:
+            results[idx] = (results[idx] or []) + [media_id]
+    return results
+
+def _embed_photo(client, file_path):
+    """Run a TwelveLabs image embedding and return the float vector (or None)"""
+    
+    # Create embedding task for photo using embed.create (not embed.tasks.create)
+    task = client.embed.create(
+        model_name="Marengo-retrieval-2.7",
+        image_url=file_path
+    )
+    
+    # Wait for completion
+    task_id = getattr(task, 'id', None) or getattr(task, 'task_id', None)
+    
+    if hasattr(client.embed, 'tasks') and hasattr(client.embed.tasks, 'wait_for_done') and task_id:
+        status = client.embed.tasks.wait_for_done(sleep_interval=2, task_id=task_id)
+        final = client.embed.tasks.retrieve(task_id=task_id)
+    elif hasattr(task, 'wait_for_done'):
+        task.wait_for_done(sleep_interval=2)
+        final = task
+    else:
+        final = task
+    
+    # Extract embedding
+    embedding_vector = None
+    if hasattr(final, 'image_embedding') and getattr(final.image_embedding, 'float', None) is not None:
+        embedding_vector = final.image_embedding.float
+    elif getattr(final, 'image_embedding', None) is not None and hasattr(final.image_embedding, 'float_'):
+        embedding_vector = final.image_embedding.float_
+    elif getattr(final, 'image_embedding', None) is not None and getattr(final.image_embedding, 'segments', None):
+        seg0 = final.image_embedding.segments[0]
+        if hasattr(seg0, 'float_'):
+            embedding_vector = seg0.float_
+        elif hasattr(seg0, 'float'):
+            embedding_vector = seg0.float
+    
+    return embedding_vector
+
+def _embed_video(client, file_path, clip_length=10):
+    """Run a TwelveLabs video embedding and return the finished task"""
+    
+    # Create embedding task for video using embed.create (not embed.tasks.create)
+    task = client.embed.create(
+        model_name="Marengo-retrieval-2.7",
+        video_url=file_path,
+        video_clip_length=clip_length
+    )
+    
+    # Wait for completion
+    task_id = getattr(task, 'id', None) or getattr(task, 'task_id', None)
+    
+    if hasattr(client.embed, 'tasks') and hasattr(client.embed.tasks, 'wait_for_done') and task_id:
+        status = client.embed.tasks.wait_for_done(sleep_interval=2, task_id=task_id)
+        return client.embed.tasks.retrieve(task_id=task_id, embedding_option=["visual-text", "audio"])
+    elif hasattr(task, 'wait_for_done'):
+        task.wait_for_done(sleep_interval=2)
+    return task
+
+def _photo_rows(file_path, album_name, embedding_vector, **kwargs):
+    """album_media row for an embedded photo ([] when there is no embedding)"""
+    if not embedding_vector:
+        return []
+    return [dict(kwargs,
+                 album_name=album_name,
+                 file_name=Path(file_path).name,
+                 file_path=file_path,
+                 file_type='photo',
+                 embedding_vector=embedding_vector)]
+
+def _video_rows(file_path, album_name, final, **kwargs):
+    """album_media rows for every embedded segment of a video"""
+    rows = []
+    for segment in final.segments:
+        if hasattr(segment, 'embedding_scope') and segment.embedding_scope:
+            for scope in segment.embedding_scope:
+                if hasattr(scope, 'embedding') and scope.embedding:
+                    rows.append(dict(kwargs,
+                                     album_name=album_name,
+                                     file_name=f"{Path(file_path).stem}_seg_{segment.start_time}_{segment.end_time}.mp4",
+                                     file_path=file_path,
+                                     file_type='video',
+                                     start_time=segment.start_time,
+                                     end_time=segment.end_time,
+                                     duration=segment.end_time - segment.start_time,
+                                     embedding_vector=scope.embedding.float))
+    return rows
+
 def create_photo_embedding_unified(file_path, album_name, **kwargs):
     """Create photo embedding using TwelveLabs and store in unified table"""
     
@@ -299,51 +528,10 @@ def create_photo_embedding_unified(file_path, album_name, **kwargs):
         
         client = TwelveLabs(api_key=os.getenv("TWELVE_LABS_API_KEY"))
         
-        # Create embedding task for photo using embed.create (not embed.tasks.create)
-        task = client.embed.create(
-            model_name="Marengo-retrieval-2.7",
-            image_url=file_path
-        )
-        
-        # Wait for completion
-        task_id = getattr(task, 'id', None) or getattr(task, 'task_id', None)
-        
-        if hasattr(client.embed, 'tasks') and hasattr(client.embed.tasks, 'wait_for_done') and task_id:
-            status = client.embed.tasks.wait_for_done(sleep_interval=2, task_id=task_id)
-            final = client.embed.tasks.retrieve(task_id=task_id)
-        elif hasattr(task, 'wait_for_done'):
-            task.wait_for_done(sleep_interval=2)
-            final = task
-        else:
-            final = task
-        
-        # Extract embedding
-        embedding_vector = None
-        if hasattr(final, 'image_embedding') and getattr(final.image_embedding, 'float', None) is not None:
-            embedding_vector = final.image_embedding.float
-        elif getattr(final, 'image_embedding', None) is not None and hasattr(final.image_embedding, 'float_'):
-            embedding_vector = final.image_embedding.float_
-        elif getattr(final, 'image_embedding', None) is not None and getattr(final.image_embedding, 'segments', None):
-            seg0 = final.image_embedding.segments[0]
-            if hasattr(seg0, 'float_'):
-                embedding_vector = seg0.float_
-            elif hasattr(seg0, 'float'):
-                embedding_vector = seg0.float
-        
-        if embedding_vector:
-            # Store metadata first
-            media_id = album_manager.store_media_metadata(
-                album_name=album_name,
-                file_name=Path(file_path).name,
-                file_path=file_path,
-                file_type='photo',
-                **kwargs
-            )
-            
-            if media_id:
-                # Update with embedding
-                album_manager.update_media_embedding(media_id, embedding_vector)
-                return media_id
+        rows = _photo_rows(file_path, album_name, _embed_photo(client, file_path), **kwargs)
+        if rows:
+            # Store metadata and embedding in one insert
+            return album_manager.store_media_batch(rows)[0]
         
         return None
         
@@ -359,52 +547,11 @@ def create_video_embedding_unified(file_path, album_name, **kwargs):
         
         client = TwelveLabs(api_key=os.getenv("TWELVE_LABS_API_KEY"))
         
-        # Create embedding task for video using embed.create (not embed.tasks.create)
-        task = client.embed.create(
-            model_name="Marengo-retrieval-2.7",
-            video_url=file_path,
-            video_clip_length=kwargs.get('clip_length', 10)
-        )
-        
-        # Wait for completion
-        task_id = getattr(task, 'id', None) or getattr(task, 'task_id', None)
-        
-        if hasattr(client.embed, 'tasks') and hasattr(client.embed.tasks, 'wait_for_done') and task_id:
-            status = client.embed.tasks.wait_for_done(sleep_interval=2, task_id=task_id)
-            final = client.embed.tasks.retrieve(task_id=task_id, embedding_option=["visual-text", "audio"])
-        elif hasattr(task, 'wait_for_done'):
-            task.wait_for_done(sleep_interval=2)
-            final = task
-        else:
-            final = task
-        
-        media_ids = []
-        
-        # Process each segment
-        for segment in final.segments:
-            if hasattr(segment, 'embedding_scope') and segment.embedding_scope:
-                for scope in segment.embedding_scope:
-                    if hasattr(scope, 'embedding') and scope.embedding:
-                        embedding_vector = scope.embedding.float
-                        
-                        # Store metadata for each segment
-                        media_id = album_manager.store_media_metadata(
-                            album_name=album_name,
-                            file_name=f"{Path(file_path).stem}_seg_{segment.start_time}_{segment.end_time}.mp4",
-                            file_path=file_path,
-                            file_type='video',
-                            start_time=segment.start_time,
-                            end_time=segment.end_time,
-                            duration=segment.end_time - segment.start_time,
-                            **kwargs
-                        )
-                        
-                        if media_id:
-                            # Update with embedding
-                            album_manager.update_media_embedding(media_id, embedding_vector)
-                            media_ids.append(media_id)
+        final = _embed_video(client, file_path, kwargs.get('clip_length', 10))
         
-        return media_ids
+        # Store every segment with its embedding in one insert
+        rows = _video_rows(file_path, album_name, final, **kwargs)
+        return [media_id for media_id in album_manager.store_media_batch(rows) if media_id]
         
     except Exception as e:
         logger.error(f"❌ Error creating video embedding: {e}")
@@ -167,6 +167,13 @@ def unified_search_enhanced(query_texts: List[str],
         return results
 
 
+def _cosine_max_distance(similarity_type: str, min_similarity: float = None) -> Optional[float]:
+    """For cosine distance, lower values = more similar; map the threshold to a SQL cutoff"""
+    if min_similarity is None or similarity_type != 'COSINE':
+        return None
+    return 1.0 - min_similarity
+
+
 def _search_photos_with_timing(query_texts: List[str], 
                               album_name: str = None,
                               top_k: int = None,
@@ -177,23 +184,17 @@ def _search_photos_with_timing(query_texts: List[str],
     
     try:
         photo_results = search_photos_multiple_enhanced(
-            query_texts, album_name, top_k, similarity_type
+            query_texts, album_name, top_k, similarity_type,
+            max_distance=_cosine_max_distance(similarity_type, min_similarity)
         )
         
-        # Apply similarity filter if specified
-        if min_similarity is not None:
+        # Apply similarity filter for non-cosine metrics (cosine is filtered in SQL)
+        if min_similarity is not None and similarity_type != 'COSINE':
             for query in photo_results:
-                if similarity_type == 'COSINE':
-                    # For cosine distance, lower values = more similar
-                    photo_results[query] = [
-                        r for r in photo_results[query] 
-                        if r['similarity_score'] <= (1.0 - min_similarity)
-                    ]
-                else:
-                    photo_results[query] = [
-                        r for r in photo_results[query] 
-                        if r['similarity_score'] >= min_similarity
-                    ]
+                photo_results[query] = [
+                    r for r in photo_results[query] 
+                    if r['similarity_score'] >= min_similarity
+                ]
         
         search_time = time.time() - start_time
         logger.info(f"Photo search completed in {search_time:.3f}s")
@@ -214,23 +215,17 @@ def _search_videos_with_timing(query_texts: List[str],
     
     try:
         video_results = search_videos_multiple_enhanced(
-            query_texts, top_k, similarity_type
+            query_texts, top_k, similarity_type,
+            max_distance=_cosine_max_distance(similarity_type, min_similarity)
         )
         
-        # Apply similarity filter if specified
-        if min_similarity is not None:
+        # Apply similarity filter for non-cosine metrics (cosine is filtered in SQL)
+        if min_similarity is not None and similarity_type != 'COSINE':
             for query in video_results:
-                if similarity_type == 'COSINE':
-                    # For cosine distance, lower values = more similar
-                    video_results[query] = [
-                        r for r in video_results[query] 
-                        if r['similarity_score'] <= (1.0 - min_similarity)
-                    ]
-                else:
-                    video_results[query] = [
-                        r for r in video_results[query] 
-                        if r['similarity_score'] >= min_similarity
-                    ]
+                video_results[query] = [
+                    r for r in video_results[query] 
+                    if r['similarity_score'] >= min_similarity
+                ]
         
         search_time = time.time() - start_time
         logger.info(f"Video search completed in {search_time:.3f}s")
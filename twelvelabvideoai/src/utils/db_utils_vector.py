@@ -7,6 +7,7 @@ import os
 import logging
 import signal
 import sys
+import array
 import struct
 import numpy as np
 from dotenv import load_dotenv
@@ -38,10 +39,20 @@ DB_CONFIG = {
     'wallet_password': os.getenv('ORACLE_DB_WALLET_PASSWORD')
 }
 
-# DISABLED: Connection pools cause hanging - use direct connections only
+# Shared pool for short request-scoped queries (see pooled_connection).
+# The earlier pool hung because it was guarded with SIGALRM, which only works
+# on the main thread, and waited without a bound; direct connections remain
+# the fallback whenever the pool cannot be created.
 _connection_pool = None
 _pool_lock = threading.Lock()
 
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', '2'))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', '16'))
+DB_POOL_WAIT_MS = int(os.getenv('DB_POOL_WAIT_MS', '5000'))
+# Per-connection statement cache; pooled connections serve many distinct
+# queries (auth, search, albums), more than oracledb's default of 20
+DB_STMT_CACHE_SIZE = int(os.getenv('DB_STMT_CACHE_SIZE', '64'))
+
 
 def validate_db_config():
     """Validate that all required database configuration is present"""
@@ -55,7 +66,13 @@ def validate_db_config():
 
 
 def create_connection_pool():
-    """Create and return a new Oracle connection pool with timeout protection"""
+    """Create (once) and return the shared Oracle connection pool
+    
+    Acquires use a timed wait so a saturated pool fails fast instead of hanging.
+    
+    Returns:
+        oracledb.ConnectionPool, or None if the pool could not be created
+    """
     global _connection_pool
     
     with _pool_lock:
@@ -63,42 +80,29 @@ def create_connection_pool():
             return _connection_pool
             
         try:
+            import oracledb
             validate_db_config()
             
-            # Add connection timeout to prevent hanging
-            import signal
-            
-            def timeout_handler(signum, frame):
-                raise Exception("Connection pool creation timed out")
-            
-            # Set 15 second timeout for pool creation
-            old_handler = signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(15)
+            _connection_pool = oracledb.create_pool(
+                user=DB_CONFIG['user'],
+                password=DB_CONFIG['password'],
+                dsn=DB_CONFIG['dsn'],
+                config_dir=DB_CONFIG['config_dir'],
+                wallet_location=DB_CONFIG['wallet_location'],
+                wallet_password=DB_CONFIG['wallet_password'],
+                min=DB_POOL_MIN,
+                max=DB_POOL_MAX,
+                increment=2,
+                getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+                wait_timeout=DB_POOL_WAIT_MS,  # milliseconds
+                timeout=300,  # Close idle sessions after 5 minutes
+                max_lifetime_session=1800,
+                tcp_connect_timeout=10,
+                stmtcachesize=DB_STMT_CACHE_SIZE
+            )
             
-            try:
-                # Set shorter timeouts to prevent hanging
-                _connection_pool = oracledb.create_pool(
-                    user=DB_CONFIG['user'],
-                    password=DB_CONFIG['password'],
-                    dsn=DB_CONFIG['dsn'],
-                    config_dir=DB_CONFIG['config_dir'],
-                    wallet_location=DB_CONFIG['wallet_location'],
-                    wallet_password=DB_CONFIG['wallet_password'],
-                    min=1,  # Reduced min connections
-                    max=3,  # Reduced max connections  
-                    increment=1,
-                    getmode=POOL_CONFIG['getmode'],
-                    timeout=5,  # Shorter timeout
-                    wait_timeout=3,  # Shorter wait
-                    max_lifetime_session=1800  # Shorter lifetime
-                )
-                
-                logger.info(f"Created Oracle connection pool: min=1, max=3")
-                return _connection_pool
-                
-            finally:
-                signal.alarm(0)
-                signal.signal(signal.SIGALRM, old_handler)
+            logger.info(f"Created Oracle connection pool: min={DB_POOL_MIN}, max={DB_POOL_MAX}")
+            return _connection_pool
             
         except Exception as e:
             logger.error(f"Failed to create connection pool: {e}")
@@ -107,6 +111,24 @@ def create_connection_pool():
             return None
 
 
+@contextmanager
+def pooled_connection():
+    """Acquire a connection from the shared pool and release it on exit
+    
+    Falls back to a direct connection when the pool is unavailable.
+    
+    Yields:
+        oracledb.Connection: Database connection
+    """
+    pool = create_connection_pool()
+    connection = pool.acquire() if pool is not None else get_db_connection()
+    try:
+        yield connection
+    finally:
+        # Returns pooled connections to the pool
+        connection.close()
+
+
 def get_db_connection(timeout=10):
     """SAFE database connection without pools - direct connection only
     
@@ -275,8 +297,8 @@ def get_connection(timeout=10):
                 logger.debug(f"Error closing connection: {e}")
 
 
-# CONNECTION POOL FUNCTIONS REMOVED - THEY CAUSED SYSTEM HANGS
-# All database connections now use SAFE direct connections with timeout protection
+# get_connection/get_db_connection open SAFE direct connections with timeout
+# protection; use pooled_connection for frequent short queries
 
 
 def test_db_connectivity(timeout=5):
@@ -318,7 +340,47 @@ def test_db_connectivity(timeout=5):
         return False
 
 
+# Optional INT8 copy of album_media embeddings in an embedding_int8 column
+# (see migrate_add_int8_vectors.py); enable once the column is populated
+ALBUM_VECTORS_INT8 = os.getenv('ALBUM_VECTORS_INT8', 'false').lower() == 'true'
+
+# album_media embeddings are all unit-length (see migrate_normalize_album_vectors.py)
+# and idx_album_media_vector is built for DOT distance
+ALBUM_VECTORS_NORMALIZED = os.getenv('ALBUM_VECTORS_NORMALIZED', 'false').lower() == 'true'
+
+# Storage format of photo_embeddings.embedding_vector: FLOAT32 (default) or
+# INT8, a quarter of the bytes per row; must match create_schema_photo_embeddings_vector.py
+PHOTO_VECTOR_FORMAT = os.getenv('PHOTO_VECTOR_FORMAT', 'FLOAT32').upper()
+
+
 # Oracle VECTOR utilities
+def quantize_int8(embedding_list: List[float]) -> array.array:
+    """Quantize an embedding to INT8 for a VECTOR(n, INT8) column
+    
+    Each vector is scaled by 127 / max(|v|). The scale is not stored: cosine
+    distance is scale-invariant, so INT8 columns must be searched with COSINE.
+    
+    Args:
+        embedding_list: List of float values
+        
+    Returns:
+        array.array: signed 8-bit values, bindable as an Oracle INT8 VECTOR
+    """
+    vec = np.asarray(embedding_list, dtype=np.float32)
+    peak = float(np.max(np.abs(vec))) if vec.size else 0.0
+    scale = 127.0 / peak if peak else 0.0
+    out = array.array('b')
+    out.frombytes(np.clip(np.rint(vec * scale), -127, 127).astype(np.int8).tobytes())
+    return out
+
+
+def photo_vector_bind(embedding_list: List[float]):
+    """Bind value for photo_embeddings.embedding_vector in PHOTO_VECTOR_FORMAT"""
+    if PHOTO_VECTOR_FORMAT == 'INT8':
+        return quantize_int8(embedding_list)
+    return create_vector_from_list(embedding_list)
+
+
 def create_vector_from_list(embedding_list: List[float], dimension: int = None) -> str:
     """Convert a Python list to Oracle VECTOR format
     
@@ -339,7 +401,8 @@ def create_vector_from_list(embedding_list: List[float], dimension: int = None)
 
 def vector_similarity_search(connection, table: str, query_vector: List[float], 
                            top_k: int = 10, similarity_type: str = 'COSINE',
-                           additional_filters: str = None) -> List[Dict]:
+                           additional_filters: str = None,
+                           max_distance: float = None) -> List[Dict]:
     """Perform vector similarity search using Oracle VECTOR functions
     
     Args:
@@ -349,6 +412,7 @@ def vector_similarity_search(connection, table: str, query_vector: List[float],
         top_k: Number of top results to return
         similarity_type: 'COSINE', 'DOT', or 'EUCLIDEAN'
         additional_filters: Optional WHERE clause filters
+        max_distance: Optional distance cutoff applied in SQL
         
     Returns:
         List[Dict]: Search results with similarity scores
@@ -376,8 +440,16 @@ def vector_similarity_search(connection, table: str, query_vector: List[float],
             raise ValueError(f"Unknown table: {table}")
         
         # Add filters if provided
+        filters = []
+        binds = {'query_vector': query_vector_str}
         if additional_filters:
-            base_query += f" WHERE {additional_filters}"
+            filters.append(additional_filters)
+        if max_distance is not None:
+            # Prune in the database so rows past the threshold are never fetched
+            filters.append("VECTOR_DISTANCE(embedding_vector, :query_vector, {similarity_type}) <= :max_distance")
+            binds['max_distance'] = max_distance
+        if filters:
+            base_query += " WHERE " + " AND ".join(filters)
         
         # Add ordering and limit
         base_query += f"""
@@ -389,26 +461,11 @@ def vector_similarity_search(connection, table: str, query_vector: List[float],
         query = base_query.format(similarity_type=similarity_type)
         
         # Execute query
-        cursor.execute(query, {'query_vector': query_vector_str})
+        cursor.execute(query, binds)
         results = cursor.fetchall()
         
         # Format results
-        formatted_results = []
-        for row in results:
-            if table == 'video_embeddings':
-                formatted_results.append({
-                    'video_file': row[0],
-                    'start_time': row[1],
-                    'end_time': row[2],
-                    'similarity_score': float(row[3])
-                })
-            else:  # photo_embeddings
-                formatted_results.append({
-                    'id': row[0],
-                    'album_name': row[1],
-                    'photo_file': row[2],
-                    'similarity_score': float(row[3])
-                })
+        formatted_results = [_format_similarity_row(table, row) for row in results]
         
         cursor.close()
         return formatted_results
@@ -418,6 +475,106 @@ def vector_similarity_search(connection, table: str, query_vector: List[float],
         raise
 
 
+def _format_similarity_row(table: str, row) -> Dict:
+    if table == 'video_embeddings':
+        return {
+            'video_file': row[0],
+            'start_time': row[1],
+            'end_time': row[2],
+            'similarity_score': float(row[3])
+        }
+    # photo_embeddings
+    return {
+        'id': row[0],
+        'album_name': row[1],
+        'photo_file': row[2],
+        'similarity_score': float(row[3])
+    }
+
+
+def vector_similarity_search_batch(connection, table: str, query_vectors: List[List[float]],
+                                   top_k: int = 10, similarity_type: str = 'COSINE',
+                                   additional_filters: str = None,
+                                   max_distance: float = None) -> List[List[Dict]]:
+    """Run several top-k similarity searches in a single round trip
+    
+    Each query vector gets its own ranked sub-select; the sub-selects are
+    combined with UNION ALL and the rows are regrouped per query in Python.
+    If the combined statement fails, each query is retried on its own with
+    vector_similarity_search, so one bad query only loses its own results.
+    
+    Args:
+        connection: Database connection
+        table: Table name (video_embeddings or photo_embeddings)
+        query_vectors: Query embeddings, one list of floats per query
+        top_k: Number of top results to return per query
+        similarity_type: 'COSINE', 'DOT', or 'EUCLIDEAN'
+        additional_filters: Optional WHERE clause filters (applied to every query)
+        max_distance: Optional distance cutoff applied in SQL
+        
+    Returns:
+        List[List[Dict]]: Search results for each query vector, in input order
+    """
+    if not query_vectors:
+        return []
+    
+    if table == 'video_embeddings':
+        columns = "video_file, start_time, end_time"
+    elif table == 'photo_embeddings':
+        columns = "id, album_name, photo_file"
+    else:
+        raise ValueError(f"Unknown table: {table}")
+    
+    try:
+        cursor = connection.cursor()
+        
+        binds = {}
+        selects = []
+        for idx, query_vector in enumerate(query_vectors):
+            distance = f"VECTOR_DISTANCE(embedding_vector, :qv{idx}, {similarity_type})"
+            binds[f'qv{idx}'] = create_vector_from_list(query_vector)
+            filters = []
+            if additional_filters:
+                filters.append(additional_filters)
+            if max_distance is not None:
+                filters.append(f"{distance} <= :max_distance")
+            where = (" WHERE " + " AND ".join(filters)) if filters else ""
+            selects.append(f"""
+                SELECT * FROM (
+                    SELECT {idx} AS q_idx, {columns}, {distance} AS similarity_score
+                    FROM {table}{where}
+                    ORDER BY similarity_score ASC
+                    FETCH FIRST {int(top_k)} ROWS ONLY
+                )""")
+        if max_distance is not None:
+            binds['max_distance'] = max_distance
+        
+        query = "\nUNION ALL".join(selects) + "\nORDER BY q_idx, similarity_score ASC"
+        cursor.execute(query, binds)
+        
+        grouped = [[] for _ in query_vectors]
+        for row in cursor.fetchall():
+            grouped[row[0]].append(_format_similarity_row(table, row[1:]))
+        
+        cursor.close()
+        return grouped
+        
+    except Exception as e:
+        logger.warning(f"Batched vector similarity search failed, searching per query: {e}")
+    
+    grouped = []
+    for query_vector in query_vectors:
+        try:
+            grouped.append(vector_similarity_search(
+                connection, table, query_vector, top_k=top_k, similarity_type=similarity_type,
+                additional_filters=additional_filters, max_distance=max_distance
+            ))
+        except Exception:
+            # Already logged by vector_similarity_search
+            grouped.append([])
+    return grouped
+
+
 def insert_vector_embedding(connection, table: str, embedding_data: Dict[str, Any]) -> bool:
     """Insert embedding data with Oracle VECTOR type
     
@@ -453,8 +610,8 @@ def insert_vector_embedding(connection, table: str, embedding_data: Dict[str, An
                 (album_name, photo_file, embedding_vector) 
                 VALUES (:album_name, :photo_file, :embedding_vector)
             """
-            # Convert embedding list to VECTOR format
-            vector_str = create_vector_from_list(embedding_data['embedding_vector'])
+            # Convert embedding list to the column's VECTOR format
+            vector_str = photo_vector_bind(embedding_data['embedding_vector'])
             params = {
                 'album_name': embedding_data['album_name'],
                 'photo_file': embedding_data['photo_file'],
@@ -512,7 +669,10 @@ def batch_insert_vector_embeddings(connection, table: str, embeddings_list: List
         batch_data = []
         for embedding_data in embeddings_list:
             try:
-                vector_str = create_vector_from_list(embedding_data['embedding_vector'])
+                if table == 'photo_embeddings':
+                    vector_str = photo_vector_bind(embedding_data['embedding_vector'])
+                else:
+                    vector_str = create_vector_from_list(embedding_data['embedding_vector'])
                 
                 if table == 'video_embeddings':
                     params = {
@@ -592,6 +752,57 @@ def get_health_status() -> Dict[str, Any]:
     return status
 
 
+# DDL helpers shared by the create_schema_* scripts
+# Runs one DDL statement, handing back its error text instead of raising
+_EXEC_DDL_PLSQL = """
+BEGIN
+    EXECUTE IMMEDIATE :ddl;
+    :error := NULL;
+EXCEPTION
+    WHEN OTHERS THEN :error := SQLERRM;
+END;"""
+
+
+def recreate_table_plsql(table: str, create_table_sql: str) -> str:
+    """PL/SQL block that drops table (if present) and runs create_table_sql in one round trip"""
+    return f"""
+BEGIN
+    BEGIN
+        EXECUTE IMMEDIATE 'DROP TABLE {table}';
+    EXCEPTION
+        WHEN OTHERS THEN
+            IF SQLCODE != -942 THEN RAISE; END IF;  -- table does not exist
+    END;
+    EXECUTE IMMEDIATE q'[{create_table_sql}]';
+END;
+"""
+
+
+def execute_ddl_ignore_errors(cursor, sqls: List[str]) -> int:
+    """Execute DDL statements in order in one round trip, logging failures
+    
+    batcherrors only covers DML, so each statement's error comes back
+    through an OUT bind of the PL/SQL wrapper instead.
+    
+    Returns:
+        int: Number of statements that succeeded
+    """
+    if not sqls:
+        return 0
+    error_var = cursor.var(str, 512, arraysize=len(sqls))
+    cursor.setinputsizes(error=error_var)
+    cursor.executemany(_EXEC_DDL_PLSQL, [{"ddl": sql} for sql in sqls])
+    
+    executed = 0
+    for i, sql in enumerate(sqls):
+        error = error_var.getvalue(i)
+        if error:
+            logger.warning(f"⚠️ DDL warning ({' '.join(sql.split()[:4])}): {error}")
+        else:
+            executed += 1
+    return executed
+
+
 # Migration utilities for BLOB to VECTOR conversion
 def migrate_blob_to_vector(connection, table: str, batch_size: int = 1000) -> Dict[str, int]:
     """Migrate existing BLOB embeddings to VECTOR format
@@ -613,6 +824,14 @@ def migrate_blob_to_vector(connection, table: str, batch_size: int = 1000) -> Di
         cursor.execute(f"SELECT COUNT(*) FROM {table}")
         stats['total'] = cursor.fetchone()[0]
         
+        # The embeddings tables have no updated_at trigger, so the UPDATE sets
+        # it itself where the column exists (legacy BLOB tables lack it)
+        cursor.execute(
+            "SELECT COUNT(*) FROM user_tab_columns WHERE table_name = :table_name AND column_name = 'UPDATED_AT'",
+            {'table_name': table.upper()}
+        )
+        touch_updated_at = ", updated_at = CURRENT_TIMESTAMP" if cursor.fetchone()[0] else ""
+        
         if stats['total'] == 0:
             logger.info(f"No records to migrate in {table}")
             return stats
@@ -658,7 +877,7 @@ def migrate_blob_to_vector(connection, table: str, batch_size: int = 1000) -> Di
                             vector_str = create_vector_from_list(embedding_array)
                             
                             # Update record
-                            update_query = f"UPDATE {table} SET embedding_vector = :vector WHERE id = :id"
+                            update_query = f"UPDATE {table} SET embedding_vector = :vector{touch_updated_at} WHERE id = :id"
                             cursor.execute(update_query, {'vector': vector_str, 'id': row[0]})
                             
                             stats['migrated'] += 1
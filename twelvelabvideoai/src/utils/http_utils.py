@@ -1,8 +1,61 @@
-"""HTTP utilities: download helper using httpx and small path helpers."""
+"""HTTP utilities: download helper using httpx, the shared async client and small path helpers."""
 import os
 import shutil
+import asyncio
+import weakref
 import httpx
 
+try:
+    import h2  # noqa: F401 - enables HTTP/2 on the shared client
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+# One keep-alive async client per event loop (httpx connections are
+# loop-bound): loop -> (client, closer)
+_async_clients = weakref.WeakKeyDictionary()
+
+
+async def _close_with_loop(loop, client):
+    """Parked on the client's loop; loop shutdown (asyncio.run) closes it"""
+    try:
+        yield
+    finally:
+        if _async_clients.get(loop, (None,))[0] is client:
+            del _async_clients[loop]
+        await client.aclose()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Shared async HTTP client for the running event loop
+
+    The client is closed when its loop shuts down (asyncio.run finalizes the
+    loop's async generators), so callers that asyncio.run() per call do not
+    leak connections. Loops closed without shutting down their async
+    generators should call close_async_client() first.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None or entry[0].is_closed:
+        client = httpx.AsyncClient(
+            http2=_HTTP2,
+            timeout=60.0,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+        )
+        closer = _close_with_loop(loop, client)
+        # Started as a task so the loop tracks it; the strong reference kept
+        # here stops it from being finalized before the loop shuts down
+        asyncio.ensure_future(closer.__anext__())
+        entry = _async_clients[loop] = (client, closer)
+    return entry[0]
+
+
+async def close_async_client():
+    """Close the shared async HTTP client for the running event loop"""
+    entry = _async_clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[0].aclose()
+
 
 def download_url_to_file(url, dst_path, timeout=60):
     # file:// handling
@@ -3,11 +3,19 @@
 Image resizing utility for TwelveLabs embedding compatibility
 Ensures images are under size limit while preserving quality
 """
+import io
 import os
+import math
 import logging
 import tempfile
 from PIL import Image
 
+try:
+    # Optional: libvips bindings for faster, lower-memory photo resizing
+    import pyvips
+except Exception:
+    pyvips = None
+
 logger = logging.getLogger(__name__)
 
 def resize_image_for_embedding(input_path, max_size_mb=5.0, preserve_original=True):
@@ -108,6 +116,54 @@ def resize_image_for_embedding(input_path, max_size_mb=5.0, preserve_original=Tr
         logger.error(f"Error resizing image: {e}")
         raise
 
+def resize_to_jpeg_bytes(path, max_bytes):
+    """Downscale the image at `path` to a JPEG no larger than `max_bytes`.
+
+    Runs inside agent_playback_app's Pillow process pool, so arguments and
+    results stay picklable and this module keeps its imports light.
+    Returns (jpeg_bytes, (width, height), quality); jpeg_bytes is None if the
+    target could not be met. Uses libvips (SIMD resampling, streamed strips)
+    when pyvips is installed, otherwise Pillow.
+    """
+    # Derive one scale factor from the byte ratio instead of trial-and-error resizing
+    scale_factor = min(1.0, math.sqrt(max_bytes / os.path.getsize(path)) * 0.95)
+
+    if pyvips is not None:
+        header = pyvips.Image.new_from_file(path, access='sequential')
+        new_width = max(1, int(header.width * scale_factor))
+        new_height = max(1, int(header.height * scale_factor))
+        thumb = pyvips.Image.thumbnail(path, new_width, height=new_height, size='down')
+        if thumb.hasalpha():
+            thumb = thumb.flatten()
+        for quality in (85, 70):
+            data = thumb.write_to_buffer(f'.jpg[Q={quality},optimize_coding,strip]')
+            if len(data) <= max_bytes:
+                return data, (thumb.width, thumb.height), quality
+        return None, (thumb.width, thumb.height), None
+
+    with Image.open(path) as img:
+        original_size = img.size
+        new_width = max(1, int(original_size[0] * scale_factor))
+        new_height = max(1, int(original_size[1] * scale_factor))
+
+        # For JPEGs let the decoder downscale via DCT scaling (never below the target size)
+        if img.format == 'JPEG':
+            img.draft('RGB', (new_width, new_height))
+
+        # Convert to RGB if necessary (for PNG with alpha channel, etc.)
+        if img.mode in ('RGBA', 'P'):
+            img = img.convert('RGB')
+
+        resized_img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+
+    # One encode at normal quality, one fallback at lower quality
+    for quality in (85, 70):
+        buf = io.BytesIO()
+        resized_img.save(buf, 'JPEG', quality=quality, optimize=True)
+        if buf.tell() <= max_bytes:
+            return buf.getvalue(), (new_width, new_height), quality
+    return None, (new_width, new_height), None
+
 def get_image_info(image_path):
     """Get basic information about an image file"""
     try:
@@ -2,6 +2,8 @@
 import os
 import time
 import json
+import functools
+import threading
 try:
     import oci
 except Exception:
@@ -9,8 +11,18 @@ except Exception:
 
 PAR_CACHE_FILE = os.path.join(os.path.dirname(__file__), '..', '..', '.par_cache.json')
 PAR_TTL_SECONDS_DEFAULT = int(os.getenv('PAR_TTL_SECONDS', '3600'))
+# Stop handing out a cached PAR this many seconds before it actually expires
+PAR_REFRESH_MARGIN_SECONDS = int(os.getenv('PAR_REFRESH_MARGIN_SECONDS', '300'))
 
 _par_cache = {}
+_par_cache_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _object_storage_client():
+    """Return a process-wide (ObjectStorageClient, namespace) pair."""
+    obj_client = oci.object_storage.ObjectStorageClient(oci.config.from_file())
+    return obj_client, obj_client.get_namespace().data
 
 def load_par_cache():
     global _par_cache
@@ -26,7 +38,8 @@ def load_par_cache():
 def save_par_cache():
     try:
         path = os.path.abspath(PAR_CACHE_FILE)
-        serializable = {('|'.join(k)): [v[0], int(v[1])] for k, v in _par_cache.items()}
+        with _par_cache_lock:
+            serializable = {('|'.join(k)): [v[0], int(v[1])] for k, v in _par_cache.items()}
         os.makedirs(os.path.dirname(path), exist_ok=True)
         with open(path, 'w') as f:
             json.dump(serializable, f)
@@ -37,6 +50,7 @@ def get_par_url_for_oci(vf, ttl_seconds=None):
     """Create or reuse a PAR URL for an oci:// path. Returns a HTTP URL or fallback proxy path.
 
     This helper manages an internal cache and persists it to PAR_CACHE_FILE.
+    Cache hits return without constructing a client or making any OCI call.
     """
     if not oci:
         return f'/object_proxy?path={vf}'
@@ -44,26 +58,28 @@ def get_par_url_for_oci(vf, ttl_seconds=None):
     try:
         path = vf[len('oci://'):]
         parts = path.split('/', 2)
-        config = oci.config.from_file()
-        obj_client = oci.object_storage.ObjectStorageClient(config)
+        now_ts = int(time.time())
 
-        if len(parts) == 2:
-            namespace = obj_client.get_namespace().data
-            bucket = parts[0]
-            object_name = parts[1]
-        elif len(parts) == 3:
+        if len(parts) == 3:
+            cache_key = (parts[0], parts[1], parts[2])
+            cached = _par_cache.get(cache_key)
+            if cached and cached[1] - PAR_REFRESH_MARGIN_SECONDS > now_ts:
+                return cached[0]
+
+        obj_client, default_namespace = _object_storage_client()
+
+        if len(parts) == 3:
             namespace = parts[0]
             bucket = parts[1]
             object_name = parts[2]
         else:
-            namespace = obj_client.get_namespace().data
+            namespace = default_namespace
             bucket = parts[0]
             object_name = parts[1]
 
         cache_key = (namespace, bucket, object_name)
-        now_ts = int(time.time())
         cached = _par_cache.get(cache_key)
-        if cached and cached[1] > now_ts:
+        if cached and cached[1] - PAR_REFRESH_MARGIN_SECONDS > now_ts:
             return cached[0]
 
         expiry_ts = int(time.time()) + ttl
@@ -79,7 +95,8 @@ def get_par_url_for_oci(vf, ttl_seconds=None):
         base_url = obj_client.base_client.endpoint
         if access_uri:
             url = base_url.rstrip('/') + access_uri
-            _par_cache[cache_key] = (url, now_ts + ttl)
+            with _par_cache_lock:
+                _par_cache[cache_key] = (url, now_ts + ttl)
             try:
                 save_par_cache()
             except Exception: